@@ -0,0 +1,144 @@
+"""
+Seeded synthetic columns for the benchmarks.
+
+Every generator takes (rows, seed) and returns a list of rows; the same
+arguments always give the same column, so runs are comparable across
+releases and machines.
+"""
+
+import random
+import re
+from string import ascii_uppercase
+from typing import Any, Callable, Dict, List
+
+# --- Values ---
+
+_FIRST = ["alice", "bob", "carol", "dave", "erin", "frank", "grace", "heidi", "ivan", "judy"]
+_DOMAINS = ["example.com", "mail.org", "corp.co.uk", "uni.edu", "shop.io"]
+_SYMBOLS = ["$", "£", "€", "¥"]
+_WORDS = ["red", "green", "blue", "north", "south", "alpha", "beta", "delta", "open", "closed"]
+
+
+def _email(rng: random.Random) -> str:
+    return f"{rng.choice(_FIRST)}.{rng.randrange(100000)}@{rng.choice(_DOMAINS)}"
+
+
+def _currency(rng: random.Random) -> str:
+    amount = f"{rng.randrange(1, 1000000):,}.{rng.randrange(100):02d}"
+    symbol = rng.choice(_SYMBOLS)
+    return f"{symbol}{amount}" if rng.random() < 0.8 else f"{amount} {symbol}"
+
+
+def _integer(rng: random.Random) -> str:
+    return str(rng.randrange(-10 ** 9, 10 ** 9))
+
+
+def _string(rng: random.Random) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randrange(1, 4)))
+
+
+def _dirt(rng: random.Random) -> Any:
+    """A value no built-in type accepts, or that breaks naive parsers."""
+    return rng.choice([None, "", "   ", "N/A", "n/a", "-", "NULL", "#REF!", float("nan"), 42, "\x00"])
+
+
+def _distinct(make: Callable[[random.Random], str], rows: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return [make(rng) for _ in range(rows)]
+
+
+def _repeated(make: Callable[[random.Random], str], rows: int, seed: int, cardinality: int) -> List[str]:
+    rng = random.Random(seed)
+    values = [make(rng) for _ in range(cardinality)]
+    return [values[rng.randrange(cardinality)] for _ in range(rows)]
+
+
+# --- Columns ---
+
+def email(rows: int, seed: int = 0) -> List[str]:
+    return _distinct(_email, rows, seed)
+
+
+def currency(rows: int, seed: int = 0) -> List[str]:
+    return _distinct(_currency, rows, seed)
+
+
+def integer(rows: int, seed: int = 0) -> List[str]:
+    return _distinct(_integer, rows, seed)
+
+
+def string(rows: int, seed: int = 0) -> List[str]:
+    return _distinct(_string, rows, seed)
+
+
+def mixed(rows: int, seed: int = 0) -> List[str]:
+    """60% emails, the rest split between the other built-in types."""
+    rng = random.Random(seed)
+    makers = [_email] * 6 + [_currency, _integer, _string, _string]
+    return [rng.choice(makers)(rng) for _ in range(rows)]
+
+
+def dirty(rows: int, seed: int = 0) -> List[Any]:
+    """Currency with 10% nulls, placeholders, non-strings and stray whitespace."""
+    rng = random.Random(seed)
+    column = []
+    for _ in range(rows):
+        roll = rng.random()
+        if roll < 0.1:
+            column.append(_dirt(rng))
+        elif roll < 0.2:
+            column.append(f"  {_currency(rng)} ")
+        else:
+            column.append(_currency(rng))
+    return column
+
+
+def low_cardinality(rows: int, seed: int = 0) -> List[str]:
+    """Emails drawn from 50 distinct values (dictionary encoding applies)."""
+    return _repeated(_email, rows, seed, 50)
+
+
+def high_cardinality(rows: int, seed: int = 0) -> List[str]:
+    """Currency where nearly every row is distinct (dictionary encoding doesn't pay)."""
+    rng = random.Random(seed)
+    return [f"${rng.randrange(10 ** 9):,}.{rng.randrange(100):02d}" for _ in range(rows)]
+
+
+# Column name -> generator
+COLUMNS: Dict[str, Callable[[int, int], List[Any]]] = {
+    "email": email,
+    "currency": currency,
+    "integer": integer,
+    "string": string,
+    "mixed": mixed,
+    "dirty": dirty,
+    "low_cardinality": low_cardinality,
+    "high_cardinality": high_cardinality,
+}
+
+
+# --- Many Registered Types ---
+
+def register_many_types(count: int, seed: int = 0) -> List[type]:
+    """
+    Registers `count` regex types that look like ID formats ('ABC-1234'
+    with random prefixes), as a large deployment's custom types would.
+    None of them match the generated columns, so inference has to rule
+    every one of them out. Registration is permanent, so call this in a
+    process of its own (as `run.py` does).
+    """
+    import percipio
+
+    rng = random.Random(seed)
+    types = []
+    for i in range(count):
+        prefix = "".join(rng.choice(ascii_uppercase) for _ in range(3))
+        digits = rng.randrange(4, 9)
+        cls = type(f"Bench{i}Type", (percipio.BaseSemanticType,), {
+            "name": f"Bench{i}_{prefix}",
+            "specificity": 0.9,
+            "regex": re.compile(rf"^{prefix}-(?P<number>\d{{{digits}}})$"),
+        })
+        types.append(percipio.register_type(cls))
+    return types
+
@@ -0,0 +1,80 @@
+"""
+Checks that `import percipio` stays cheap, for short-lived processes that
+pay for it on every cold start.
+
+    python benchmarks/import_time.py             # exit 1 if over budget
+    python benchmarks/import_time.py --budget 80
+
+Measures the median wall time of `import percipio` in fresh interpreters
+(interpreter startup excluded), and checks that modules which should
+only load on first use (worker pools, the built-in types, the model
+engine) were not imported.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Milliseconds `import percipio` may take
+IMPORT_BUDGET_MS = 50.0
+
+# Modules `import percipio` must not load
+DEFERRED_MODULES = [
+    "concurrent.futures.process",
+    "multiprocessing",
+    "importlib.metadata",
+    "percipio.built_in_types",
+    "percipio.llm_engine",
+    "percipio.sandbox",
+]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import percipio
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "modules": sorted(sys.modules)}))
+"""
+
+
+def measure(runs: int) -> dict:
+    """Median import time over `runs` fresh interpreters, and the modules loaded."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    timings, modules = [], []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", _PROBE], check=True, capture_output=True,
+                                text=True, env=env).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["ms"])
+        modules = result["modules"]
+    return {"median_ms": statistics.median(timings), "min_ms": min(timings), "modules": modules}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the cost of `import percipio`.")
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET_MS, help="Milliseconds allowed.")
+    parser.add_argument("--runs", type=int, default=11)
+    args = parser.parse_args(argv)
+
+    result = measure(args.runs)
+    print(f"import percipio: median {result['median_ms']:.1f} ms, min {result['min_ms']:.1f} ms "
+          f"(budget {args.budget:g} ms), {len(result['modules'])} modules loaded")
+
+    failures = []
+    if result["median_ms"] > args.budget:
+        failures.append(f"median import time {result['median_ms']:.1f} ms is over the {args.budget:g} ms budget")
+    loaded = set(result["modules"])
+    failures.extend(f"{name} is imported eagerly" for name in DEFERRED_MODULES if name in loaded)
+    for failure in failures:
+        print(f"  {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
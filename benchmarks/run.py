@@ -0,0 +1,233 @@
+"""
+Benchmarks `infer` and `clean` on synthetic columns and gates regressions.
+
+    python benchmarks/run.py                     # quick profile: 1K-100K rows
+    python benchmarks/run.py --profile full      # 1K-10M rows
+    python benchmarks/run.py --save              # record benchmarks/baseline.json
+    python benchmarks/run.py --check             # exit 1 on a regression vs the baseline
+
+Each scenario and size runs in a fresh process, so caches, registered
+types and memory don't leak between cases. For each operation it reports
+latency percentiles over the repeats, throughput at the median and peak
+memory (traced in a separate, untimed run).
+
+A case regresses when its median latency grows by more than
+--threshold, or its peak memory by more than --memory-threshold, over
+the baseline. Baselines are only comparable on the same (quiet) machine:
+record one before a change and check after it.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+# Runnable as a script from anywhere
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.generators import COLUMNS, register_many_types  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+PROFILES = {
+    "quick": [1_000, 10_000, 100_000],
+    "full": [1_000, 10_000, 100_000, 1_000_000, 10_000_000],
+}
+
+# Scenario -> (column generator, extra registered types)
+SCENARIOS = {name: (name, 0) for name in COLUMNS}
+SCENARIOS["many_types"] = ("mixed", 200)
+
+OPERATIONS = ("infer", "clean")
+
+# Stop repeating once an operation has used this many seconds
+_TIME_PER_OPERATION = 5.0
+
+# Growth below these never counts as a regression (timer and allocator noise)
+_LATENCY_SLACK = 0.001
+_MEMORY_SLACK = 256 * 1024
+
+
+# --- Measuring (in the case's own process) ---
+
+def _percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of `samples`."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def _peak_memory(func: Callable[[], Any]) -> int:
+    """Peak bytes allocated while func() runs (what it returns included)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak - before
+
+
+def _measure(func: Callable[[], Any], rows: int, repeat: int) -> Dict[str, float]:
+    func()  # Warm up pools, caches of compiled regexes, etc.
+    samples = []
+    spent = 0.0
+    while len(samples) < repeat and (len(samples) < 3 or spent < _TIME_PER_OPERATION):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        spent += elapsed
+    p50 = _percentile(samples, 50)
+    return {
+        "runs": len(samples),
+        "p50": p50,
+        "p90": _percentile(samples, 90),
+        "p99": _percentile(samples, 99),
+        "rows_per_second": rows / p50 if p50 > 0 else float("inf"),
+        "peak_bytes": _peak_memory(func),
+    }
+
+
+def run_case(scenario: str, rows: int, repeat: int, seed: int) -> Dict[str, Dict[str, float]]:
+    """Measures every operation for one scenario and size."""
+    import percipio
+
+    column, extra_types = SCENARIOS[scenario]
+    if extra_types:
+        register_many_types(extra_types, seed)
+    data = COLUMNS[column](rows, seed)
+    schema = percipio.infer(data)
+    operations = {
+        "infer": lambda: percipio.infer(data),
+        "clean": lambda: schema.clean(data),
+    }
+    results = {op: _measure(operations[op], rows, repeat) for op in OPERATIONS}
+    results["infer"]["type"] = schema.name
+    return results
+
+
+# --- Driving ---
+
+def _run_isolated(scenario: str, rows: int, repeat: int, seed: int) -> Dict[str, Dict[str, float]]:
+    command = [sys.executable, os.path.abspath(__file__), "--case", scenario, str(rows),
+               "--repeat", str(repeat), "--seed", str(seed)]
+    # Same hashes every run, so set and dict orders can't vary between runs
+    env = dict(os.environ, PYTHONHASHSEED=str(seed))
+    # The library prints; the result is the last line
+    output = subprocess.run(command, check=True, capture_output=True, text=True, env=env).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _machine() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run_all(scenarios: List[str], sizes: List[int], repeat: int, seed: int) -> Dict[str, Any]:
+    results = {}
+    for scenario in scenarios:
+        for rows in sizes:
+            case = f"{scenario}/{rows}"
+            results[case] = measured = _run_isolated(scenario, rows, repeat, seed)
+            for op in OPERATIONS:
+                m = measured[op]
+                print(f"{case:<28} {op:<6} p50 {m['p50'] * 1000:10.2f} ms  p90 {m['p90'] * 1000:10.2f} ms  "
+                      f"p99 {m['p99'] * 1000:10.2f} ms  {m['rows_per_second']:>13,.0f} rows/s  "
+                      f"peak {m['peak_bytes'] / 2 ** 20:8.2f} MiB", flush=True)
+    return {"machine": _machine(), "seed": seed, "repeat": repeat, "results": results}
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+            memory_threshold: float) -> List[str]:
+    """Human-readable regressions of `report` against `baseline` (empty if none)."""
+    if baseline.get("machine") != report["machine"]:
+        print(f"Warning: the baseline was recorded on a different machine ({baseline.get('machine')}).")
+    regressions = []
+    for case, measured in report["results"].items():
+        before = baseline["results"].get(case)
+        if before is None:
+            continue
+        for op in OPERATIONS:
+            new, old = measured[op], before.get(op)
+            if old is None:
+                continue
+            if new["p50"] > old["p50"] * (1 + threshold) + _LATENCY_SLACK:
+                regressions.append(f"{case} {op}: median {old['p50'] * 1000:.2f} ms -> {new['p50'] * 1000:.2f} ms "
+                                   f"({new['p50'] / old['p50'] - 1:+.0%}, limit {threshold:+.0%})")
+            if new["peak_bytes"] > old["peak_bytes"] * (1 + memory_threshold) + _MEMORY_SLACK:
+                regressions.append(f"{case} {op}: peak memory {old['peak_bytes'] / 2 ** 20:.2f} MiB -> "
+                                   f"{new['peak_bytes'] / 2 ** 20:.2f} MiB "
+                                   f"({new['peak_bytes'] / max(1, old['peak_bytes']) - 1:+.0%}, "
+                                   f"limit {memory_threshold:+.0%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark percipio's infer and clean.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--sizes", help="Comma-separated row counts (overrides --profile).")
+    parser.add_argument("--scenarios", help=f"Comma-separated subset of: {', '.join(SCENARIOS)}.")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed runs per operation (at least 3).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", nargs="?", const=BASELINE_PATH, metavar="PATH",
+                        help="Write the results as the baseline.")
+    parser.add_argument("--check", nargs="?", const=BASELINE_PATH, metavar="PATH",
+                        help="Compare against the baseline; exit 1 on a regression.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed growth of median latency (0.25 = 25%%).")
+    parser.add_argument("--memory-threshold", type=float, default=0.25,
+                        help="Allowed growth of peak memory.")
+    parser.add_argument("--case", nargs=2, metavar=("SCENARIO", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        scenario, rows = args.case
+        print(json.dumps(run_case(scenario, int(rows), max(3, args.repeat), args.seed)))
+        return 0
+
+    sizes = [int(float(size)) for size in args.sizes.split(",")] if args.sizes else PROFILES[args.profile]
+    scenarios = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    report = run_all(scenarios, sizes, max(3, args.repeat), args.seed)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+        print(f"Saved baseline to {args.save}.")
+
+    if args.check:
+        with open(args.check) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.memory_threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s):")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import percipio
+from percipio.signature import ALPHA, DIGIT, OTHER
 import re
 
 # --- Problem: 'percipio' doesn't know our company's Employee ID format ---
@@ -23,24 +24,32 @@ class EmployeeIDType(percipio.BaseSemanticType):
     name: str = "EmployeeID"
     specificity: float = 0.9 # Very specific!
     
-    # 2. Add a regex for fast validation
-    regex: re.Pattern = re.compile(r"^EMP-\d{5}$")
+    # 2. Add a regex for fast validation. With just a regex, percipio
+    # accepts the strings it matches (no 'validate_item' needed).
+    regex: re.Pattern = re.compile(r"^EMP-(?P<id_number>\d{5})$")
+
+    # 2b. (Optional) Cheap constraints that let inference skip the regex
+    # entirely for items that can't possibly match
+    prefilter = percipio.SignatureFilter(
+        required=ALPHA | DIGIT | OTHER,
+        allowed=ALPHA | DIGIT | OTHER,
+        min_length=9,
+        max_length=9,
+    )
+
+    # 2c. (Optional) A broader type that accepts every Employee ID.
+    # Inference then only tries this type on the items String accepted.
+    parent = "String"
     
-    # 3. Implement the class-level validation
-    @classmethod
-    def validate_item(cls, item: any) -> bool:
-        return isinstance(item, str) and bool(cls.regex.match(item))
-        
-    # 4. Implement the instance-level cleaning
-    def _clean_item(self, item: any) -> dict | None:
-        if not self.validate_item(item):
-            return None
-        
+    # 3. Implement the instance-level cleaning. '_clean_parsed' receives
+    # the regex match from validation, so each item is only parsed once.
+    # (Types with custom validation can override 'parse_item' to return
+    # their own token, or implement 'validate_item' and '_clean_item'.)
+    def _clean_parsed(self, token: re.Match, item: any) -> dict | None:
         # Transform the string into a structured dict
-        id_num = int(item.split('-')[1])
         return {
             "prefix": "EMP",
-            "id_number": id_num,
+            "id_number": int(token.group("id_number")),
             "raw": item
         }
 
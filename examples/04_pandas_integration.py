@@ -52,29 +52,33 @@ try:
                 "raw": item
             }
 
-    # 3. Infer the schema for the entire DataFrame
+    # 3. Infer the schema for the entire DataFrame in one call
     print("--- Inferring DataFrame Schema ---")
-    # In a real version, `percipio.infer` might take a DataFrame directly.
-    # For now, we do it column by column.
-    schema_report = {}
-    for col in df.columns:
-        schema_report[col] = percipio.infer(df[col].tolist())
+    # Columns are read straight from the DataFrame (no .tolist() copies).
+    # Pass workers=-1 to infer several columns at once.
+    schema_report = percipio.infer_frame(df)
     
     for col, schema in schema_report.items():
         print(f"Column '{col}': Inferred Type = {schema.name} (Confidence: {schema.stats.confidence*100:.0f}%)")
 
     # 4. Create a new, clean DataFrame
     print("\n--- Creating Cleaned DataFrame ---")
-    clean_df = pd.DataFrame()
-    for col, schema in schema_report.items():
-        # Use the inferred schema's .clean() method for each column
-        clean_df[f"clean_{col}"] = schema.clean(df[col].tolist())
+    # Structured types become one typed column per field, e.g.
+    # 'transaction.amount' (float64) and 'transaction.currency_code'
+    # (category). Built-in types clean with vectorised string operations.
+    clean_df = percipio.clean_frame(df, schema_report)
 
     print(clean_df)
-    print("\n--- Data in 'clean_transaction' column ---")
+    print("\n--- Data in the 'transaction' columns ---")
     
-    # The 'clean_transaction' column now contains structured dicts
-    for item in clean_df['clean_transaction']:
+    transaction_cols = [col for col in clean_df.columns if col.startswith("transaction.")]
+    for row in clean_df[transaction_cols].to_dict(orient="records"):
+        print(json.dumps(row, indent=2, default=str))
+
+    # 5. Custom types without vectorised cleaning still work: they are
+    # cleaned row by row into a column of dicts.
+    print("\n--- Data in the 'id_code' column ---")
+    for item in clean_df['id_code']:
         print(json.dumps(item, indent=2))
 
 except ImportError:
@@ -45,6 +45,14 @@ schema = percipio.infer(data, engine='llm')
 #    using the 'parse' code from Gemini as its '_clean_item' method.
 # 8. This new, dynamic type is returned as the 'schema'.
 
+# For a whole table, infer_frame(df, engine='llm') does the same for
+# every low-confidence column at once, batching several columns into
+# one prompt:
+#
+#     from percipio.llm_async import AsyncLLMEngine
+#     engine = AsyncLLMEngine(max_concurrency=8, requests_per_second=5)
+#     schema = percipio.infer_frame(df, engine='llm', llm_engine=engine)
+
 # --- The result ---
 print(f"Inferred Type: {schema.name}") # e.g., "Dynamic_PersonName"
 print(f"Valid: {schema.stats.valid_count} / {schema.stats.total_count}\n")
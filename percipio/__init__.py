@@ -21,16 +21,36 @@ Usage:
 """
 
 # Public API
-from .core import infer
-from .types import register_type, BaseSemanticType, SemanticTypeStats
-from . import built_in_types # This import triggers registration of built-in types
+from .core import infer, infer_counts, infer_and_clean
+from .frame import infer_frame, clean_frame
+from .files import infer_file, clean_file
+from .streaming import Inferrer, infer_iter
+from .mixed import infer_mixed, MixedColumn, TypeMatch
+from .monitor import SchemaMonitor, DriftEvent
+from .types import register_type, register_lazy_type, TypeDescriptor, BaseSemanticType, SemanticTypeStats
+from .signature import SignatureFilter
+# Built-in types are registered by percipio.types and imported on first use
 
 __version__ = "0.1.0"
 __all__ = [
     "infer", 
+    "infer_counts",
+    "infer_and_clean",
+    "infer_mixed",
+    "infer_iter",
+    "infer_frame",
+    "clean_frame",
+    "infer_file",
+    "clean_file",
+    "Inferrer",
+    "MixedColumn",
+    "TypeMatch",
+    "SchemaMonitor",
+    "DriftEvent",
     "register_type", 
+    "register_lazy_type",
+    "TypeDescriptor",
     "BaseSemanticType", 
-    "SemanticTypeStats"
+    "SemanticTypeStats",
+    "SignatureFilter",
 ]
-
-print("percipio: Registered built-in types.")
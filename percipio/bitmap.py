@@ -0,0 +1,98 @@
+"""
+Row bitmaps as Python ints.
+
+Bit `i` of a bitmap is set when row `i` is in it (LSB first, the same
+order as `ColumnarResult.validity`). An int stores one bit per row, and
+set operations (`a & ~b`, `a | b`) and counting (`bit_count()`) run in C
+over machine words, so comparing which rows several types accepted costs
+a few passes over n/64 words.
+
+Converting to and from per-row truth values goes through one byte per
+row, which only ever exists for one block (or one bitmap) at a time.
+"""
+
+from itertools import compress
+from typing import Any, Dict, Iterable, List, Union
+
+# b"\x00"/b"\x01" <-> b"0"/b"1"
+_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_TO_FLAGS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def pack(values: Iterable[Any]) -> int:
+    """The bitmap of a sequence of truth values."""
+    return _pack_flags(bytes(map(bool, values)))
+
+
+def _pack_flags(flags: bytes) -> int:
+    if not flags:
+        return 0
+    return int(flags[::-1].translate(_TO_DIGITS), 2)
+
+
+def unpack(bitmap: int, length: int) -> bytes:
+    """The first `length` bits of a bitmap, as one 0/1 byte per row."""
+    if length <= 0:
+        return b""
+    return format(bitmap, f"0{length}b")[::-1][:length].encode("ascii").translate(_TO_FLAGS)
+
+
+def positions(bitmap: int) -> List[int]:
+    """The rows in a bitmap, in order."""
+    length = bitmap.bit_length()
+    return list(compress(range(length), unpack(bitmap, length)))
+
+
+def full(length: int) -> int:
+    """The bitmap of all `length` rows."""
+    return (1 << length) - 1
+
+
+def expand(bitmap: int, codes: Union[bytes, List[int]], distinct: int) -> int:
+    """
+    Maps a bitmap over `distinct` values to one over rows, where row `i`
+    holds value `codes[i]` (see `dictionary_encode`). With at most 256
+    values, passing the codes as bytes maps every row in C.
+    """
+    flags = unpack(bitmap, distinct)
+    if isinstance(codes, bytes):
+        return _pack_flags(codes.translate(flags.ljust(256, b"\0")))
+    return _pack_flags(bytes(map(flags.__getitem__, codes)))
+
+
+class BitmapBuilder:
+    """
+    Collects a bitmap a block at a time. Blocks that have no row set
+    take no memory, so a type that rejects most of a column costs far
+    less than a bit per row until `bitmap()` is called.
+    """
+
+    def __init__(self):
+        # Offset of the block's first row -> its bits
+        self.blocks: Dict[int, int] = {}
+
+    def __repr__(self):
+        return f"<BitmapBuilder: {len(self.blocks)} non-empty blocks>"
+
+    def add(self, start: int, values: Iterable[Any]):
+        """Sets the block's rows (starting at row `start`) that have a true value."""
+        bits = pack(values)
+        if bits:
+            self.blocks[start] = bits
+
+    def bitmap(self) -> int:
+        """The whole bitmap."""
+        if not self.blocks:
+            return 0
+        end = max(start + bits.bit_length() for start, bits in self.blocks.items())
+        if all(not start & 7 for start in self.blocks):
+            # Byte-aligned blocks are copied into place rather than shifted
+            buffer = bytearray((end + 7) >> 3)
+            for start, bits in self.blocks.items():
+                data = bits.to_bytes((bits.bit_length() + 7) >> 3, "little")
+                buffer[start >> 3:(start >> 3) + len(data)] = data
+            return int.from_bytes(buffer, "little")
+        bitmap = 0
+        for start, bits in self.blocks.items():
+            bitmap |= bits << start
+        return bitmap
@@ -0,0 +1,161 @@
+"""
+Per-type time budgets and quarantine for inference.
+
+`infer(..., type_budget=0.5)` gives every type half a second of
+validation time per call. Time is checked after each block of items, so
+a type that runs over is dropped within a block of its budget (a single
+call that never returns cannot be interrupted in-process; generated
+parsers run in `percipio.sandbox` for that reason).
+
+Types that run over budget `strikes` calls in a row are quarantined:
+QUARANTINE leaves them out of inference until `cooldown` seconds have
+passed. Either way, why each type was dropped ends up in the winner's
+`stats.dropped`, and the time each type took in `stats.timings`.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from .types import BaseSemanticType
+
+
+class TypeBudgets:
+    """
+    Validation time per type for one inference run, and the reason each
+    type was dropped (raised, or ran out of time).
+
+    Args:
+        budget: Seconds each type may spend validating (None for no limit).
+    """
+
+    def __init__(self, budget: Optional[float] = None):
+        if budget is not None and budget <= 0:
+            raise ValueError("type_budget must be positive.")
+        self.budget = budget
+        self.elapsed: Dict[Type[BaseSemanticType], float] = {}
+        # Items each type was run on
+        self.rows: Dict[Type[BaseSemanticType], int] = {}
+        self.dropped: Dict[Type[BaseSemanticType], str] = {}
+        self.over_budget = set()
+
+    def run(self, TypeClass, func: Callable[..., Any], *args, rows: int = 0) -> Optional[Any]:
+        """
+        func(*args) on `rows` items, timed against the type's budget. None
+        if it raised or the type is now over budget; the reason is recorded.
+        """
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except Exception as e:
+            # Validation function might fail on weird data
+            self.charge(TypeClass, time.perf_counter() - start, rows)
+            self.drop(TypeClass, f"raised {type(e).__name__}: {e}")
+            return None
+        if not self.charge(TypeClass, time.perf_counter() - start, rows):
+            return None
+        return result
+
+    def charge(self, TypeClass, seconds: float, rows: int = 0) -> bool:
+        """Adds to the type's time. False (and the type dropped) once it is over budget."""
+        self.rows[TypeClass] = self.rows.get(TypeClass, 0) + rows
+        elapsed = self.elapsed.get(TypeClass, 0.0) + seconds
+        self.elapsed[TypeClass] = elapsed
+        if self.budget is not None and elapsed > self.budget and TypeClass not in self.dropped:
+            self.over_budget.add(TypeClass)
+            self.drop(TypeClass, f"exceeded its time budget ({elapsed:.3g}s > {self.budget:g}s)")
+            return False
+        return TypeClass not in self.dropped
+
+    def drop(self, TypeClass, reason: str):
+        self.dropped.setdefault(TypeClass, reason)
+
+    def timings(self) -> Dict[str, float]:
+        """Type name -> seconds spent validating, slowest first."""
+        return {TypeClass.name: seconds for TypeClass, seconds
+                in sorted(self.elapsed.items(), key=lambda entry: -entry[1])}
+
+
+class TypeQuarantine:
+    """
+    Keeps repeatedly slow types out of inference for a while. Thread-safe.
+
+    Args:
+        strikes: Consecutive over-budget runs before a type is quarantined.
+        cooldown: Seconds a quarantined type is left out.
+    """
+
+    def __init__(self, strikes: int = 3, cooldown: float = 300.0):
+        if strikes < 1 or cooldown < 0:
+            raise ValueError("strikes must be at least 1 and cooldown non-negative.")
+        self.strikes = strikes
+        self.cooldown = cooldown
+        self._strikes: Dict[str, int] = {}
+        # Type name -> (release time, reason)
+        self._quarantined: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"TypeQuarantine(strikes={self.strikes}, cooldown={self.cooldown}, quarantined={list(self._quarantined)})"
+
+    def admit(self, types: List[Type[BaseSemanticType]]
+              ) -> Tuple[List[Type[BaseSemanticType]], Dict[str, str]]:
+        """Splits `types` into those allowed to run and (name -> reason) for those quarantined."""
+        if not self._quarantined:
+            return types, {}
+        now = time.monotonic()
+        admitted, held = [], {}
+        with self._lock:
+            for TypeClass in types:
+                entry = self._quarantined.get(TypeClass.name)
+                if entry is not None and entry[0] <= now:
+                    # Cooldown over: on probation, one more overrun re-quarantines
+                    del self._quarantined[TypeClass.name]
+                    self._strikes[TypeClass.name] = self.strikes - 1
+                    entry = None
+                if entry is None:
+                    admitted.append(TypeClass)
+                else:
+                    held[TypeClass.name] = f"quarantined for {entry[0] - now:.0f}s more: {entry[1]}"
+        return admitted, held
+
+    def record(self, budgets: TypeBudgets):
+        """Counts this run's overruns against each type that ran."""
+        with self._lock:
+            for TypeClass in budgets.elapsed:
+                name = TypeClass.name
+                if TypeClass not in budgets.over_budget:
+                    self._strikes.pop(name, None)
+                    continue
+                strikes = self._strikes.get(name, 0) + 1
+                self._strikes[name] = strikes
+                if strikes >= self.strikes and name not in self._quarantined:
+                    reason = f"over its time budget in {strikes} consecutive runs"
+                    self._quarantined[name] = (time.monotonic() + self.cooldown, reason)
+                    print(f"percipio: Quarantined type '{name}' for {self.cooldown:.0f}s ({reason}).")
+
+    def release(self, name: Optional[str] = None):
+        """Lets a quarantined type (or all of them) back in, with a clean slate."""
+        with self._lock:
+            if name is None:
+                self._quarantined.clear()
+                self._strikes.clear()
+            else:
+                self._quarantined.pop(name, None)
+                self._strikes.pop(name, None)
+
+    def info(self) -> Dict[str, Any]:
+        """Quarantined types (name -> seconds left and reason) and pending strikes."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "quarantined": {name: {"seconds_left": max(0.0, until - now), "reason": reason}
+                                for name, (until, reason) in self._quarantined.items()},
+                "strikes": dict(self._strikes),
+                "max_strikes": self.strikes,
+                "cooldown": self.cooldown,
+            }
+
+
+# The quarantine `infer` consults
+QUARANTINE = TypeQuarantine()
@@ -1,12 +1,14 @@
 """
 This module defines the built-in SemanticTypes for percipio.
-Importing this module (which __init__.py does) will automatically
-register them with the inference engine.
+`percipio.types` registers them lazily, and this module is imported
+(binding the classes to their registrations) on first use.
 """
 
 import re
-from .types import BaseSemanticType, register_type
-from typing import Any, Optional, Dict
+from .types import BaseSemanticType, register_type, regex_mask, regex_tokens
+from .signature import CURRENCY_PREFILTER, EMAIL_PREFILTER, INTEGER_PREFILTER, NUMERIC_PREFILTER
+from itertools import repeat
+from typing import Any, Dict, List, Optional
 
 # --- Base Generic Types ---
 
@@ -15,21 +17,73 @@ class StringType(BaseSemanticType):
     """The most generic type. Matches any string."""
     name: str = "String"
     specificity: float = 0.1 # Very low, a "catch-all"
+    output_fields = {"value": "str"}
     
     @classmethod
     def validate_item(cls, item: Any) -> bool:
         return isinstance(item, str)
+
+    @classmethod
+    def validate_batch(cls, items: List[Any]) -> List[bool]:
+        return list(map(isinstance, items, repeat(str)))
         
     def _clean_item(self, item: Any) -> Optional[str]:
         if isinstance(item, str):
             return item.strip()
         return None
 
+    def clean_series(self, series: Any) -> Any:
+        import numpy as np
+        import pandas as pd
+        from .frame import string_rows
+        positions, strings = string_rows(series)
+        value = np.full(len(series), None, dtype=object)
+        value[positions] = strings.str.strip().to_numpy(dtype=object)
+        return pd.DataFrame({"value": value}, index=series.index)
+
+@register_type
+class NumericType(BaseSemanticType):
+    """
+    Any number: ints, floats, and strings of digits or decimals like
+    "-1.5e3". Virtual: it is never inferred itself, only narrows the
+    items numeric types below it (Integer, and plugins' Float or
+    Percentage types) are tried on.
+    """
+    name: str = "Numeric"
+    specificity: float = 0.0
+    virtual: bool = True
+    regex: re.Pattern = re.compile(r"^[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?$")
+    prefilter = NUMERIC_PREFILTER
+    output_fields = {"value": "float64"}
+
+    @classmethod
+    def validate_item(cls, item: Any) -> bool:
+        if isinstance(item, (int, float)):
+            return True
+        if isinstance(item, str):
+            text = item.strip()
+            # isdigit() also covers the non-ASCII digits Integer accepts
+            return text.isdigit() or cls.regex.match(text) is not None
+        return False
+
+    @classmethod
+    def validate_batch(cls, items: List[Any]) -> List[bool]:
+        return list(map(cls.validate_item, items))
+
+    def _clean_item(self, item: Any) -> Optional[float]:
+        try:
+            return float(item)
+        except (ValueError, TypeError):
+            return None
+
 @register_type
 class IntegerType(BaseSemanticType):
     """Matches integers, including as strings."""
     name: str = "Integer"
     specificity: float = 0.5
+    parent = "Numeric"
+    prefilter = INTEGER_PREFILTER
+    output_fields = {"value": "int64"}
     
     @classmethod
     def validate_item(cls, item: Any) -> bool:
@@ -38,6 +92,17 @@ class IntegerType(BaseSemanticType):
         if isinstance(item, str):
             return item.strip().isdigit()
         return False
+
+    @classmethod
+    def validate_batch(cls, items: List[Any]) -> List[bool]:
+        try:
+            return list(map(str.isdigit, map(str.strip, items)))
+        except TypeError:
+            # Not all strings
+            pass
+        if all(map(isinstance, items, repeat(int))):
+            return [True] * len(items)
+        return list(map(cls.validate_item, items))
         
     def _clean_item(self, item: Any) -> Optional[int]:
         try:
@@ -45,6 +110,18 @@ class IntegerType(BaseSemanticType):
         except (ValueError, TypeError):
             return None
 
+    def clean_series(self, series: Any) -> Any:
+        import pandas as pd
+        # Only integer and boolean columns: int() on strings and floats has
+        # edge cases (whitespace, '_' separators, truncation) that pandas'
+        # parsers don't share, so those are cleaned row by row.
+        dtype = series.dtype
+        if not (pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype)):
+            return None
+        if getattr(dtype, "kind", None) == "u" and dtype.itemsize == 8:
+            return None  # May not fit in int64
+        return pd.DataFrame({"value": series.astype("Int64")}, index=series.index)
+
 # --- Specific Semantic Types ---
 
 @register_type
@@ -52,24 +129,47 @@ class EmailType(BaseSemanticType):
     """Matches email addresses."""
     name: str = "Email"
     specificity: float = 0.8 # High specificity
-    # A simple but effective regex for validation
-    regex: re.Pattern = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+    parent = "String"
+    # A simple but effective regex for validation. The groups let
+    # cleaning reuse the match instead of splitting the string again.
+    regex: re.Pattern = re.compile(r"^(?P<username>[a-zA-Z0-9_.+-]+)@(?P<domain>[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+)$")
+    prefilter = EMAIL_PREFILTER
+    output_fields = {"username": "str", "domain": "category", "raw": "str"}
     
+    # parse_item/parse_batch are the defaults: the regex match (None
+    # for non-strings)
+
     @classmethod
-    def validate_item(cls, item: Any) -> bool:
-        return isinstance(item, str) and bool(cls.regex.match(item))
+    def validate_batch(cls, items: List[Any]) -> List[bool]:
+        return regex_mask(cls.regex, items)
         
-    def _clean_item(self, item: Any) -> Optional[Dict[str, str]]:
-        if not self.validate_item(item):
-            return None
-        
-        username, domain = item.strip().lower().split('@')
+    def _clean_parsed(self, token: re.Match, item: Any) -> Dict[str, str]:
+        # The groups hold no whitespace ('$' may leave a final newline
+        # outside them), so they need no strip()
+        username, domain = token.group("username", "domain")
         return {
-            "username": username,
-            "domain": domain,
+            "username": username.lower(),
+            "domain": domain.lower(),
             "raw": item
         }
 
+    def clean_series(self, series: Any) -> Any:
+        import numpy as np
+        import pandas as pd
+        from .frame import string_rows
+        positions, strings = string_rows(series)
+        valid = strings.str.match(self.regex.pattern).to_numpy(dtype=bool)
+        emails = strings[valid]
+        parts = emails.str.strip().str.lower().str.split("@", n=1)
+        rows = positions[valid]
+
+        fields = {field: np.full(len(series), None, dtype=object) for field in self.output_fields}
+        fields["username"][rows] = parts.str[0].to_numpy(dtype=object)
+        fields["domain"][rows] = parts.str[1].to_numpy(dtype=object)
+        fields["raw"][rows] = emails.to_numpy(dtype=object)
+        fields["domain"] = pd.Categorical(fields["domain"])
+        return pd.DataFrame(fields, index=series.index)
+
 @register_type
 class CurrencyType(BaseSemanticType):
     """
@@ -78,12 +178,20 @@ class CurrencyType(BaseSemanticType):
     """
     name: str = "Currency"
     specificity: float = 0.7
+    parent = "String"
     
     # Regex to find currency symbols and amounts
     # It allows symbols before or after, and handles commas.
     regex: re.Pattern = re.compile(
         r"^(?P<symbol>[$\£\€\¥])?\s*(?P<amount>[\d,]+(?:\.\d{1,2})?)\s*(?P<symbol_post>[$\£\€\¥])?$"
     )
+    prefilter = CURRENCY_PREFILTER
+    output_fields = {
+        "amount": "float64",
+        "currency_symbol": "category",
+        "currency_code": "category",
+        "raw": "str",
+    }
     
     # Mapping of symbols to standard codes
     SYMBOL_MAP = {
@@ -94,19 +202,20 @@ class CurrencyType(BaseSemanticType):
     }
     
     @classmethod
-    def validate_item(cls, item: Any) -> bool:
-        return isinstance(item, str) and bool(cls.regex.match(item.strip()))
-        
-    def _clean_item(self, item: Any) -> Optional[Dict[str, Any]]:
-        if not isinstance(item, str):
-            return None
-            
-        match = self.regex.match(item.strip())
-        if not match:
-            return None
+    def parse_item(cls, item: Any) -> Optional[re.Match]:
+        return cls.regex.match(item.strip()) if isinstance(item, str) else None
+
+    @classmethod
+    def parse_batch(cls, items: List[Any]) -> List[Optional[re.Match]]:
+        return regex_tokens(cls.regex, items, str.strip)
+
+    @classmethod
+    def validate_batch(cls, items: List[Any]) -> List[bool]:
+        return regex_mask(cls.regex, items, str.strip)
         
+    def _clean_parsed(self, token: re.Match, item: Any) -> Optional[Dict[str, Any]]:
         try:
-            parts = match.groupdict()
+            parts = token.groupdict()
             symbol = parts.get("symbol") or parts.get("symbol_post")
             amount_str = parts.get("amount", "0").replace(",", "")
             amount_float = float(amount_str)
@@ -119,3 +228,40 @@ class CurrencyType(BaseSemanticType):
             }
         except (ValueError, TypeError):
             return None
+
+
+    def clean_series(self, series: Any) -> Any:
+        import numpy as np
+        import pandas as pd
+        from .frame import string_rows
+        positions, strings = string_rows(series)
+        # search() with the '^' anchor behaves like match()
+        parts = strings.str.strip().str.extract(self.regex.pattern)
+        matched = parts["amount"].notna().to_numpy(dtype=bool)
+        parts = parts[matched]
+        amount_strs = parts["amount"].str.replace(",", "", regex=False).to_numpy(dtype=object)
+        try:
+            # Casting str objects to float calls float() on each
+            amounts = amount_strs.astype(np.float64)
+        except ValueError:
+            amounts = np.array([_float_or_nan(amount) for amount in amount_strs], dtype=np.float64)
+        ok = ~np.isnan(amounts)
+        rows = positions[matched][ok]
+        symbols = parts["symbol"].fillna(parts["symbol_post"])[ok]
+
+        fields = {field: np.full(len(series), None, dtype=object) for field in self.output_fields}
+        fields["amount"] = np.full(len(series), np.nan)
+        fields["amount"][rows] = amounts[ok]
+        fields["currency_symbol"][rows] = symbols.to_numpy(dtype=object)
+        fields["currency_code"][rows] = symbols.map(self.SYMBOL_MAP).fillna("UNKNOWN").to_numpy(dtype=object)
+        fields["raw"][rows] = strings.to_numpy(dtype=object)[matched][ok]
+        fields["currency_symbol"] = pd.Categorical(fields["currency_symbol"])
+        fields["currency_code"] = pd.Categorical(fields["currency_code"])
+        return pd.DataFrame(fields, index=series.index)
+
+
+def _float_or_nan(text: str) -> float:
+    try:
+        return float(text)
+    except ValueError:
+        return float("nan")
@@ -0,0 +1,152 @@
+"""
+A bounded LRU cache for inference results.
+
+`core.infer(..., cache=True)` looks results up here by a digest of the
+column's contents plus the engine options. The whole cache is
+dropped as soon as the type registry changes, since a newly registered
+type can change any column's winner.
+"""
+
+import copy
+import datetime
+import decimal
+import hashlib
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Type
+
+from .types import BaseSemanticType, SemanticTypeStats, registry_version
+
+# Item types whose repr identifies the value -> their name in fingerprints
+_STABLE_TYPES = {item_type: item_type.__name__ for item_type in (
+    str, int, float, complex, bool, bytes, type(None), decimal.Decimal,
+    datetime.date, datetime.datetime, datetime.time, datetime.timedelta)}
+
+
+def column_fingerprint(data: List[Any]) -> Optional[Hashable]:
+    """
+    A content digest of a column (BLAKE2b over each item's type and
+    repr), or None if it holds items without a stable repr (anything but
+    strings, numbers, bytes, None and dates), in which case it cannot be
+    cached.
+
+    Item types are part of the digest because equal values of
+    different types (1, 1.0 and True) can infer differently.
+    """
+    item_types = set(map(type, data))
+    if not item_types <= _STABLE_TYPES.keys():
+        return None
+    digest = hashlib.blake2b(digest_size=32)
+    if len(item_types) == 1:
+        digest.update(_STABLE_TYPES[item_types.pop()].encode())
+    else:
+        digest.update("\n".join(map(_STABLE_TYPES.__getitem__, map(type, data))).encode())
+    texts = [item if type(item) is str else repr(item) for item in data]
+    # The lengths keep the concatenation unambiguous
+    digest.update(array("q", map(len, texts)).tobytes())
+    digest.update("".join(texts).encode("utf-8", "surrogatepass"))
+    return digest.digest()
+
+
+def _entry_size(key: Hashable, stats: SemanticTypeStats) -> int:
+    """Rough memory footprint of one cache entry, in bytes."""
+    return (sys.getsizeof(key) + sys.getsizeof(stats) + sys.getsizeof(stats.__dict__)
+            + sum(sys.getsizeof(value) for value in stats.__dict__.values()))
+
+
+class InferenceCache:
+    """
+    A thread-safe LRU cache of (winning type, stats) per column.
+
+    Args:
+        max_entries: The most results to keep.
+        max_bytes: The most (approximate) memory the entries may use.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Type[BaseSemanticType], SemanticTypeStats, int]]" = OrderedDict()
+        self._size = 0
+        self._version = registry_version()
+        self._lock = threading.Lock()
+
+        # --- Counters ---
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return (f"InferenceCache(entries={len(self._entries)}, hits={self.hits}, "
+                f"misses={self.misses}, evictions={self.evictions})")
+
+    def _check_registry(self):
+        # Caller holds the lock
+        version = registry_version()
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._size = 0
+            self._version = version
+
+    def get(self, key: Hashable) -> Optional[BaseSemanticType]:
+        """
+        Returns a fresh instance of the cached winning type, with its own
+        copy of the stats, or None on a miss.
+        """
+        with self._lock:
+            self._check_registry()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        TypeClass, stats, _ = entry
+        return TypeClass(stats=copy.deepcopy(stats))
+
+    def put(self, key: Hashable, result: BaseSemanticType):
+        """Stores an inference result, evicting least recently used ones."""
+        stats = copy.deepcopy(result.stats)
+        size = _entry_size(key, stats)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._check_registry()
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[2]
+            self._entries[key] = (type(result), stats, size)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Drops every entry. The counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def info(self) -> Dict[str, Any]:
+        """Counters and usage, e.g. for logging cache effectiveness."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
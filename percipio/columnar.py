@@ -0,0 +1,234 @@
+"""
+Columnar (struct-of-arrays) output for `BaseSemanticType.clean_columnar`.
+
+Instead of one dict per row, the cleaned data is returned as one typed
+array per output field plus a validity bitmap. Types opt in by declaring
+their fields and kinds in `output_fields`:
+
+    output_fields = {"amount": "float64", "currency_code": "category"}
+
+Numeric fields are `array.array`s, so NumPy and pandas can wrap their
+buffers without copying (see `ColumnarResult.to_numpy`/`to_pandas`).
+"""
+
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+# --- Field Kinds ---
+FLOAT64 = "float64"    # array('d'); NaN where missing
+INT64 = "int64"        # array('q'); 0 where missing (see the validity bitmap)
+BOOL = "bool"          # array('b'); 0 where missing
+CATEGORY = "category"  # Dictionary-encoded: int32 codes, -1 where missing
+STRING = "str"         # A list of str / None
+FIELD_KINDS = (FLOAT64, INT64, BOOL, CATEGORY, STRING)
+
+# Output field name used for types whose _clean_item returns a scalar
+VALUE_FIELD = "value"
+# Conventional name of the field holding the unparsed input
+RAW_FIELD = "raw"
+
+# Rows collected in plain lists before being moved into the typed arrays
+_BATCH_SIZE = 65536
+
+# What a missing value is stored as, per kind (None for the others)
+_MISSING = {FLOAT64: float("nan"), INT64: 0, BOOL: 0}
+
+
+class CategoricalColumn:
+    """A dictionary-encoded column: int32 codes into `categories`."""
+
+    def __init__(self, codes: Optional[array] = None, categories: Optional[List[Any]] = None):
+        self.codes = codes if codes is not None else array("i")
+        self.categories: List[Any] = categories if categories is not None else []
+
+    @classmethod
+    def from_values(cls, values: List[Any]) -> "CategoricalColumn":
+        index: Dict[Any, int] = {}
+        codes = array("i", [-1 if value is None else index.setdefault(value, len(index))
+                            for value in values])
+        return cls(codes, list(index))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, row: int) -> Any:
+        code = self.codes[row]
+        return None if code < 0 else self.categories[code]
+
+    def __repr__(self):
+        return f"<CategoricalColumn: {len(self.codes)} rows, {len(self.categories)} categories>"
+
+
+class _FieldBuffer:
+    """Accumulates one field in its columnar form, a batch of values at a time."""
+
+    def __init__(self, kind: str):
+        if kind not in FIELD_KINDS:
+            raise ValueError(f"Unknown field kind '{kind}'. Use one of {FIELD_KINDS}.")
+        self.kind = kind
+        self.index: Dict[Any, int] = {}
+        if kind == FLOAT64:
+            self.column = array("d")
+        elif kind == INT64:
+            self.column = array("q")
+        elif kind == BOOL:
+            self.column = array("b")
+        elif kind == CATEGORY:
+            self.column = CategoricalColumn()
+        else:
+            self.column = []
+
+    def extend(self, values: List[Any]):
+        if self.kind == CATEGORY:
+            index = self.index
+            self.column.codes.extend([-1 if value is None else index.setdefault(value, len(index))
+                                      for value in values])
+            self.column.categories = list(index)
+        elif self.kind == INT64 and isinstance(self.column, array):
+            length = len(self.column)
+            try:
+                self.column.extend(values)
+            except OverflowError:
+                # Python ints beyond 64 bits: keep the field as a plain list
+                self.column = self.column[:length].tolist() + values
+        else:
+            self.column.extend(values)
+
+
+class ColumnarResult:
+    """
+    The cleaned column as one array per field.
+
+    Attributes:
+        columns: Field name -> array.array, CategoricalColumn or list.
+        kinds: Field name -> field kind.
+        validity: A bitmap with one bit per row (LSB first, as in Apache
+                  Arrow), set where the row was cleaned successfully.
+    """
+
+    def __init__(self, columns: Dict[str, Any], kinds: Dict[str, str], validity: bytearray, length: int):
+        self.columns = columns
+        self.kinds = kinds
+        self.validity = validity
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __repr__(self):
+        return f"<ColumnarResult: {self.length} rows, fields={list(self.columns)}>"
+
+    def __getitem__(self, field: str) -> Any:
+        return self.columns[field]
+
+    def is_valid(self, row: int) -> bool:
+        return bool(self.validity[row >> 3] & (1 << (row & 7)))
+
+    @property
+    def valid_count(self) -> int:
+        return sum(bin(byte).count("1") for byte in self.validity)
+
+    def row(self, row: int) -> Optional[Dict[str, Any]]:
+        """Rebuilds a single row as a dict (None for invalid rows)."""
+        if not self.is_valid(row):
+            return None
+        return {field: column[row] for field, column in self.columns.items()}
+
+    # --- Hand-off ---
+
+    def validity_mask(self):
+        """The validity bitmap expanded to a NumPy bool array (one byte per row)."""
+        import numpy as np
+        bits = np.unpackbits(np.frombuffer(self.validity, dtype=np.uint8), bitorder="little")
+        return bits[:self.length].astype(bool)
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        NumPy arrays per field. Numeric fields and category codes share
+        memory with this result; string fields become object arrays.
+        Categories are returned as (codes, categories) pairs.
+        """
+        import numpy as np
+        arrays = {}
+        for field, column in self.columns.items():
+            kind = self.kinds[field]
+            if kind == CATEGORY:
+                arrays[field] = (np.frombuffer(column.codes, dtype=np.int32), column.categories)
+            elif kind == STRING or isinstance(column, list):
+                arrays[field] = np.array(column, dtype=object)
+            else:
+                arrays[field] = np.frombuffer(column, dtype={FLOAT64: np.float64, INT64: np.int64,
+                                                             BOOL: np.int8}[kind])
+        return arrays
+
+    def to_pandas(self):
+        """
+        A pandas DataFrame with one column per field. Float columns and
+        category codes are wrapped without copying; int64/bool fields
+        become nullable columns masked by the validity bitmap.
+        """
+        import pandas as pd
+        arrays = self.to_numpy()
+        invalid = ~self.validity_mask()
+        frame = {}
+        for field, values in arrays.items():
+            kind = self.kinds[field]
+            if kind == CATEGORY:
+                codes, categories = values
+                frame[field] = pd.Categorical.from_codes(codes, categories=categories)
+            elif kind == INT64 and values.dtype != object:
+                frame[field] = pd.arrays.IntegerArray(values, invalid)
+            elif kind == BOOL:
+                frame[field] = pd.arrays.BooleanArray(values.view(bool), invalid)
+            else:
+                frame[field] = values
+        return pd.DataFrame(frame, copy=False)
+
+
+def build_columns(results: Iterable[Any], output_fields: Dict[str, str],
+                  include_raw: bool = False) -> ColumnarResult:
+    """
+    Collects `_clean_item` results (dicts, scalars or None) into a
+    ColumnarResult with the declared fields.
+    """
+    fields = {field: kind for field, kind in output_fields.items()
+              if include_raw or field != RAW_FIELD}
+    buffers = {field: _FieldBuffer(kind) for field, kind in fields.items()}
+    batches = {field: [] for field in fields}
+    # (field, list.append, stand-in for a missing value)
+    appenders = [(field, values.append, _MISSING.get(fields[field]))
+                 for field, values in batches.items()]
+    validity = bytearray()
+    scalar = list(output_fields) == [VALUE_FIELD]
+
+    def flush():
+        for field, values in batches.items():
+            buffers[field].extend(values)
+            values.clear()
+
+    length = 0
+    byte = 0
+    for result in results:
+        if result is None:
+            for _, append, missing in appenders:
+                append(missing)
+        elif scalar:
+            byte |= 1 << (length & 7)
+            appenders[0][1](result)
+        else:
+            byte |= 1 << (length & 7)
+            for field, append, missing in appenders:
+                value = result.get(field)
+                append(missing if value is None else value)
+        length += 1
+        if not length & 7:
+            validity.append(byte)
+            byte = 0
+            if not length % _BATCH_SIZE:
+                flush()
+    if length & 7:
+        validity.append(byte)
+    flush()
+
+    columns = {field: buffer.column for field, buffer in buffers.items()}
+    return ColumnarResult(columns, fields, validity, length)
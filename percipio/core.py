@@ -1,10 +1,729 @@
-from .types import get_registered_types, BaseSemanticType, SemanticTypeStats
-from typing import List, Any, Optional
+from .types import get_registered_types, BaseSemanticType, SemanticTypeStats, TypeDescriptor
+from .signature import signatures_of
+from .cache import InferenceCache, column_fingerprint
+from .budget import QUARANTINE, TypeBudgets
+from .encoding import dictionary_encode, expand_distinct, should_encode
+from .lattice import TypeLattice
+from .memo import VALUE_MEMO, VALIDATE
+from .parallel import get_executor, is_picklable, is_sendable, pool_errors, resolve_workers, split
+from . import instrumentation
+from typing import List, Any, Optional, Dict, Tuple, Type
+from itertools import compress, repeat
+import math
+import random
+import time
 
-# A cache for inference results could be added here
-INFERENCE_CACHE = {}
+# Results of `infer(..., cache=True)`, keyed by column content and options
+INFERENCE_CACHE = InferenceCache()
 
-def infer(data: List[Any], engine: str = 'default') -> BaseSemanticType:
+# How many items every still-viable type validates before the bounds
+# are re-checked. Small enough that hopeless types are dropped early,
+# large enough that the bookkeeping stays negligible next to validation.
+_BLOCK_SIZE = 1024
+
+# --- Sampling Settings ---
+# z-value of the confidence intervals used by sampled inference (~99%).
+_SAMPLE_Z = 2.576
+# Size of the first sampling round; each further round doubles it.
+_SAMPLE_START = 1024
+# Number of contiguous segments a 'stratified' sample is spread over.
+_SAMPLE_STRATA = 32
+SAMPLE_STRATEGIES = ('random', 'stratified')
+
+# engine='llm' falls back to a generative model when the winning type's
+# confidence is below this, or when only the catch-all type won.
+LLM_CONFIDENCE_THRESHOLD = 0.5
+# Winning with this type means no specific type fits the column
+_CATCH_ALL_TYPE = "String"
+
+# --- Parallel Settings ---
+# Columns (or their distinct values) shorter than this are scored
+# in-process; shipping them to workers would cost more than it saves.
+_PARALLEL_MIN_ITEMS = 10_000
+# Shards per worker, so one slow shard doesn't leave the others idle.
+_SHARDS_PER_WORKER = 4
+
+# Computing an item's signature costs about as much as four or five short
+# regex matches, so signatures are only computed for a block when at least
+# this many of the still-viable types declare a prefilter that can use them.
+_SIGNATURE_MIN_TYPES = 5
+
+
+def wilson_interval(valid_count: int, sample_size: int) -> Tuple[float, float, float]:
+    """
+    Wilson score interval (low, estimate, high) for a confidence measured
+    on a uniform sample, at the _SAMPLE_Z level.
+    """
+    n = sample_size
+    p = valid_count / n
+    z2 = _SAMPLE_Z ** 2
+    denominator = 1 + z2 / n
+    center = (p + z2 / (2 * n)) / denominator
+    half_width = _SAMPLE_Z * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / denominator
+    return max(0.0, center - half_width), p, min(1.0, center + half_width)
+
+
+def _block_signatures(viable, block):
+    """
+    Signatures for a block, or None if too few types would use them (and
+    none of those is a TypeDescriptor that might not need importing).
+    """
+    prefiltered = [TypeClass for TypeClass in viable if TypeClass.prefilter is not None]
+    if (len(prefiltered) < _SIGNATURE_MIN_TYPES
+            and not any(isinstance(TypeClass, TypeDescriptor) for TypeClass in prefiltered)):
+        return None
+    return signatures_of(block)
+
+
+def _count_valid(TypeClass, items, signatures=None, weights=None) -> int:
+    """
+    Counts the valid items of a block. With `weights` (from dictionary
+    encoding), each distinct item counts as often as it occurs.
+    """
+    if signatures is not None and TypeClass.prefilter is not None:
+        # Items that fail the prefilter never reach validation
+        if weights is None:
+            items = TypeClass.prefilter.select(items, signatures)
+        else:
+            pairs = TypeClass.prefilter.select(list(zip(items, weights)), signatures)
+            items, weights = [item for item, _ in pairs], [weight for _, weight in pairs]
+    if not len(items):
+        return 0
+    mask = _validate_batch(TypeClass, items)
+    return sum(compress(repeat(1) if weights is None else weights, mask))
+
+
+def _valid_mask(TypeClass, items, signatures=None) -> List[Any]:
+    """
+    One truth value per item of a block, for types whose children are
+    tried only on the items they accept. Items that fail the prefilter
+    are False without being validated.
+    """
+    if signatures is None or TypeClass.prefilter is None:
+        return _validate_batch(TypeClass, items)
+    positions = TypeClass.prefilter.select(range(len(items)), signatures)
+    mask = [False] * len(items)
+    if positions:
+        for position, valid in zip(positions, _validate_batch(TypeClass, [items[i] for i in positions])):
+            mask[position] = valid
+    return mask
+
+
+def _validate_batch(TypeClass, items: List[Any]) -> List[Any]:
+    """`validate_batch`, through VALUE_MEMO when it is on."""
+    if not VALUE_MEMO.enabled:
+        return TypeClass.validate_batch(items)
+    if isinstance(TypeClass, TypeDescriptor):
+        # Entries are filed under the class, before and after it is imported
+        TypeClass = TypeClass.load()
+    return VALUE_MEMO.apply(TypeClass, VALIDATE, lambda missed: list(map(bool, TypeClass.validate_batch(missed))),
+                            items)
+
+
+def _scatter(values: List[Any], accepted: List[Any], fill: Any = None) -> List[Any]:
+    """Puts the values of the accepted positions back at their places in the block."""
+    spread = [fill] * len(accepted)
+    for position, value in zip(compress(range(len(accepted)), accepted), values):
+        spread[position] = value
+    return spread
+
+
+def _validate_types(lattice: TypeLattice, types, items, signatures=None, weights=None,
+                    run=None, parsing=(), per_item=()) -> Tuple[Dict[Any, Optional[int]], Dict[Any, List[Any]]]:
+    """
+    Validates a block against `types`, trying each one only on the items
+    its nearest ancestor among them accepted (see percipio.lattice). A
+    block the ancestor rejected outright is skipped by its whole subtree.
+
+    Args:
+        lattice: The lattice of the run's types.
+        types: The types to validate (candidates and their filters).
+        items, signatures, weights: The block, as for `_count_valid`.
+        run: Calls a type's validation, as `TypeBudgets.run` does; None
+             when it raised (or ran out of time). Defaults to calling it.
+        parsing: Types validated with 'parse_batch', keeping the tokens.
+        per_item: Types whose truth value for every item is kept.
+
+    Returns:
+        (counts, results): type -> valid (weighted) count, or None if it
+        failed; and type -> one result per item of the block, for the
+        `parsing` (tokens) and `per_item` (truth values) types.
+    """
+    if run is None:
+        run = _call
+    parsing, per_item = set(parsing), set(per_item)
+    parents = lattice.parents_within(types)
+    # Parent -> the items it accepted (None for all of them)
+    masks: Dict[Any, Optional[List[Any]]] = {}
+    counts: Dict[Any, Optional[int]] = {}
+    results: Dict[Any, List[Any]] = {}
+    for TypeClass in lattice.order(types):
+        ancestor = lattice.nearest(TypeClass, masks)
+        accepted = masks[ancestor] if ancestor is not None else None
+        block, block_signatures, block_weights = items, signatures, weights
+        if accepted is not None:
+            if not any(accepted):
+                # Nothing here can be valid for the whole subtree
+                counts[TypeClass] = 0
+                if TypeClass in parsing:
+                    results[TypeClass] = [None] * len(items)
+                elif TypeClass in per_item:
+                    results[TypeClass] = accepted
+                if TypeClass in parents:
+                    masks[TypeClass] = accepted
+                continue
+            block = list(compress(items, accepted))
+            if signatures is not None:
+                block_signatures = list(compress(signatures, accepted))
+            if weights is not None:
+                block_weights = list(compress(weights, accepted))
+
+        if TypeClass not in parsing and TypeClass not in parents and TypeClass not in per_item:
+            counts[TypeClass] = run(TypeClass, _count_valid, TypeClass, block, block_signatures,
+                                    block_weights, rows=len(block))
+            continue
+        if TypeClass in parsing:
+            result = run(TypeClass, TypeClass.parse_batch, block, rows=len(block))
+            mask = None if result is None else [token is not None for token in result]
+        else:
+            result = mask = run(TypeClass, _valid_mask, TypeClass, block, block_signatures, rows=len(block))
+        if result is None:
+            counts[TypeClass] = None
+            continue
+        counts[TypeClass] = sum(compress(repeat(1) if block_weights is None else block_weights, mask))
+        if accepted is not None:
+            result, mask = _scatter(result, accepted), _scatter(mask, accepted, False)
+        if TypeClass in parsing:
+            results[TypeClass] = result
+        elif TypeClass in per_item:
+            results[TypeClass] = mask
+        if TypeClass in parents:
+            masks[TypeClass] = None if all(mask) else mask
+    return counts, results
+
+
+def _call(TypeClass, func, *args, rows: int = 0):
+    return func(*args)
+
+
+# --- Inference Engine ---
+
+class _BranchAndBound:
+    """
+    Scores every registered type in a single pass over the data.
+
+    Each block of items is validated against every type that can still
+    win. After each block, a type is dropped once its best possible score
+    (as if every remaining item were valid) can no longer beat the current
+    leader's guaranteed score. Types are visited in descending specificity
+    so a strong leader is usually found in the first block.
+
+    The winner and its stats are identical to validating the whole column
+    once per type: ties go to the earliest registered type, and a type whose
+    validation raises (or runs over its time budget) is excluded entirely.
+
+    The items may be a dictionary-encoded column (distinct values with
+    weights), in which case `total_count` is the number of rows.
+    """
+
+    def __init__(self, registered_types: List[Type[BaseSemanticType]], total_count: int,
+                 type_budget: Optional[float] = None):
+        self.total_count = total_count
+        self.order = {TypeClass: i for i, TypeClass in enumerate(registered_types)}
+        self.lattice = TypeLattice(registered_types)
+        # sorted() is stable, so equally specific types keep registry order.
+        # Virtual types only narrow their children and are never candidates.
+        self.viable = sorted((t for t in registered_types if not t.virtual), key=lambda t: -t.specificity)
+        self.valid_counts: Dict[Type[BaseSemanticType], int] = dict.fromkeys(registered_types, 0)
+        # Validation time per type, and types dropped for raising or running out of time
+        self.budgets = TypeBudgets(type_budget)
+        # TypeClass -> (position it was dropped at, its upper bound then)
+        self.pruned: Dict[Type[BaseSemanticType], Tuple[int, float]] = {}
+        self.position = 0  # Index of the next item to validate
+        self.seen = 0      # Number of rows validated so far
+
+    # --- Scoring ---
+
+    def _score(self, TypeClass, valid_count: int) -> float:
+        # Same expression as the final score, so bounds compare exactly
+        return (valid_count / self.total_count) * TypeClass.specificity
+
+    def _upper_bound(self, TypeClass) -> float:
+        valid_count = self.valid_counts[TypeClass]
+        remaining = self.total_count - self.seen
+        return max(self._score(TypeClass, valid_count),
+                   self._score(TypeClass, valid_count + remaining))
+
+    def _beats(self, TypeClass, score: float, other_score: float, OtherClass) -> bool:
+        """True if `TypeClass` at `score` wins over `OtherClass` at `other_score`."""
+        if score != other_score:
+            return score > other_score
+        return self.order[TypeClass] < self.order[OtherClass]
+
+    def _leader(self, candidates) -> Optional[Type[BaseSemanticType]]:
+        leader, leader_score = None, None
+        for TypeClass in candidates:
+            score = self._score(TypeClass, self.valid_counts[TypeClass])
+            if leader is None or self._beats(TypeClass, score, leader_score, leader):
+                leader, leader_score = TypeClass, score
+        return leader
+
+    # --- Validation ---
+
+    def _validate_block(self, TypeClass, block, signatures=None, weights=None) -> bool:
+        """Adds the block's valid items to the type. False if it raised or ran out of time."""
+        valid_count = self.budgets.run(TypeClass, _count_valid, TypeClass, block, signatures, weights,
+                                       rows=len(block))
+        if valid_count is None:
+            return False
+        self.valid_counts[TypeClass] += valid_count
+        return True
+
+    def _validate_lattice(self, block, weights=None, parsing=(), per_item=()):
+        """_validate_types on the viable types, and the ancestors worth narrowing them with."""
+        types = self.viable + self.lattice.filters(self.viable, self.budgets.dropped)
+        signatures = _block_signatures(types, block)
+        return _validate_types(self.lattice, types, block, signatures, weights, self.budgets.run,
+                               parsing, per_item)
+
+    def _validate_viable(self, block, weights=None):
+        """Validates a block against every viable type, dropping failures."""
+        counts, _ = self._validate_lattice(block, weights)
+        self._add_counts(counts)
+
+    def _add_counts(self, counts: Dict[Type[BaseSemanticType], Optional[int]]):
+        self.viable = [t for t in self.viable if counts[t] is not None]
+        for TypeClass in self.viable:
+            self.valid_counts[TypeClass] += counts[TypeClass]
+
+    def _block_size(self) -> int:
+        return _BLOCK_SIZE
+
+    # --- Search ---
+
+    def _prune(self):
+        leader = self._leader(self.viable)
+        if leader is None:
+            return
+        leader_score = self._score(leader, self.valid_counts[leader])
+        survivors = []
+        for TypeClass in self.viable:
+            bound = self._upper_bound(TypeClass)
+            if TypeClass is leader or not self._beats(leader, leader_score, bound, TypeClass):
+                survivors.append(TypeClass)
+            else:
+                self.pruned[TypeClass] = (self.position, bound)
+        self.viable = survivors
+
+    def run(self, items: List[Any], weights: Optional[List[int]] = None) -> Optional[Type[BaseSemanticType]]:
+        """Scores the items and returns the winning type (or None)."""
+        while self.position < len(items) and self.viable:
+            stop = self.position + self._block_size()
+            block = items[self.position:stop]
+            block_weights = weights[self.position:stop] if weights else None
+            self._validate_viable(block, block_weights)
+            self.position += len(block)
+            self.seen += sum(block_weights) if block_weights else len(block)
+            self._prune()
+        return self._settle(items, weights)
+
+    def _settle(self, items: List[Any], weights: Optional[List[int]]) -> Optional[Type[BaseSemanticType]]:
+        """
+        Pruning trusts the leader's score at the time. If that leader later
+        failed validation, a pruned type may be back in the running, so it
+        is finished from where it stopped until the winner is stable.
+        """
+        while True:
+            winner = self._leader(self.viable)
+            winner_score = self._score(winner, self.valid_counts[winner]) if winner else None
+            reopened = [
+                TypeClass for TypeClass, (_, bound) in self.pruned.items()
+                if winner is None or not self._beats(winner, winner_score, bound, TypeClass)
+            ]
+            if not reopened:
+                return winner
+
+            for TypeClass in reopened:
+                start, _ = self.pruned.pop(TypeClass)
+                for offset in range(start, len(items), _BLOCK_SIZE):
+                    block_weights = weights[offset:offset + _BLOCK_SIZE] if weights else None
+                    if not self._validate_block(TypeClass, items[offset:offset + _BLOCK_SIZE],
+                                                weights=block_weights):
+                        break
+                else:
+                    self.viable.append(TypeClass)
+
+    def stats_for(self, TypeClass) -> SemanticTypeStats:
+        valid_count = self.valid_counts[TypeClass]
+        return SemanticTypeStats(
+            total_count=self.total_count,
+            valid_count=valid_count,
+            invalid_count=self.total_count - valid_count,
+            confidence=valid_count / self.total_count
+        )
+
+    def dropped(self) -> Dict[str, str]:
+        """Type name -> why it lost before the end of the scan."""
+        reasons = {TypeClass.name: reason for TypeClass, reason in self.budgets.dropped.items()}
+        for TypeClass, (position, bound) in self.pruned.items():
+            reasons[TypeClass.name] = f"pruned after {position} items: could score at most {bound:.3f}"
+        return reasons
+
+
+def _parses_once(TypeClass) -> bool:
+    """True if the type validates and cleans through 'parse_item'."""
+    return (TypeClass._clean_item is BaseSemanticType._clean_item
+            and TypeClass.validate_item.__func__ is BaseSemanticType.validate_item.__func__)
+
+
+class _ParsingSearch(_BranchAndBound):
+    """
+    A _BranchAndBound that validates parse-once types with 'parse_batch'
+    and keeps their tokens, so the winner can be cleaned without parsing
+    the column again. A type's tokens are dropped as soon as it is pruned
+    or fails, so only types that can still win hold any.
+    """
+
+    def __init__(self, registered_types: List[Type[BaseSemanticType]], total_count: int,
+                 type_budget: Optional[float] = None):
+        super().__init__(registered_types, total_count, type_budget)
+        # TypeClass -> block start -> the block's tokens
+        self.tokens: Dict[Type[BaseSemanticType], Dict[int, List[Any]]] = {
+            TypeClass: {} for TypeClass in self.viable if _parses_once(TypeClass)
+        }
+
+    def _validate_viable(self, block, weights=None):
+        parsing = [t for t in self.viable if t in self.tokens]
+        counts, tokens = self._validate_lattice(block, weights, parsing)
+        for TypeClass in parsing:
+            if counts[TypeClass] is None:
+                del self.tokens[TypeClass]
+            else:
+                self.tokens[TypeClass][self.position] = tokens[TypeClass]
+        self._add_counts(counts)
+
+    def _prune(self):
+        super()._prune()
+        for TypeClass in self.pruned:
+            self.tokens.pop(TypeClass, None)
+
+    def clean(self, handler: BaseSemanticType, items: List[Any]) -> List[Optional[Any]]:
+        """
+        Cleans the items with the winning type, reusing its tokens. Blocks
+        without tokens (e.g. scored after the type was reopened) are
+        parsed again.
+        """
+        tokens_by_block = self.tokens.pop(type(handler), None)
+        if tokens_by_block is None:
+            return list(handler._clean_each(items))
+        self.tokens.clear()
+
+        build = handler._clean_parsed
+        cleaned = []
+        for start in range(0, len(items), _BLOCK_SIZE):
+            block = items[start:start + _BLOCK_SIZE]
+            # Popped, so tokens are freed as their rows are cleaned
+            tokens = tokens_by_block.pop(start, None)
+            if tokens is None:
+                tokens = handler.parse_batch(block)
+            cleaned.extend([None if token is None else build(token, item)
+                            for token, item in zip(tokens, block)])
+        return cleaned
+
+
+class _SampledSearch:
+    """
+    Estimates every type's score from a growing sample of the data.
+
+    The sample is validated in rounds of doubling size. After each round,
+    a Wilson interval is computed for every candidate's confidence; a
+    candidate is dropped once its upper score bound falls below the
+    leader's lower bound. Sampling stops when one candidate is left, when
+    every interval is narrower than `max_error`, or when the sample has
+    reached the size that guarantees that width.
+    """
+
+    def __init__(self, registered_types: List[Type[BaseSemanticType]],
+                 strategy: str, max_error: float, seed: Optional[int],
+                 type_budget: Optional[float] = None):
+        self.total_count = 0
+        self.max_error = max_error
+        self.order = {TypeClass: i for i, TypeClass in enumerate(registered_types)}
+        self.lattice = TypeLattice(registered_types)
+        self.viable = sorted((t for t in registered_types if not t.virtual), key=lambda t: -t.specificity)
+        self.valid_counts: Dict[Type[BaseSemanticType], int] = dict.fromkeys(registered_types, 0)
+        self.sample_size = 0
+        self.budgets = TypeBudgets(type_budget)
+        # TypeClass -> why sampling ruled it out
+        self.ruled_out: Dict[Type[BaseSemanticType], str] = {}
+
+        # Worst-case (p=0.5) interval half-width is z / (2 * sqrt(n))
+        self.max_sample = math.ceil((_SAMPLE_Z / (2 * max_error)) ** 2)
+        self.rng = random.Random(seed)
+        self.strategy = strategy
+
+    def worthwhile(self, total_count: int) -> bool:
+        """False if the sample would be as large as the data itself."""
+        return self.max_sample < total_count
+
+    # --- Sample Selection ---
+
+    def _indices(self) -> List[int]:
+        """
+        Sample positions, ordered so that every prefix is itself a valid
+        sample. That lets each round simply take a longer prefix.
+        """
+        total_count = self.total_count
+        if self.strategy == 'random':
+            return self.rng.sample(range(total_count), self.max_sample)
+
+        # 'stratified': an equal share from each contiguous segment,
+        # interleaved so that sorted or clustered columns stay balanced.
+        per_stratum = math.ceil(self.max_sample / _SAMPLE_STRATA)
+        strata = []
+        for i in range(_SAMPLE_STRATA):
+            start = i * total_count // _SAMPLE_STRATA
+            stop = (i + 1) * total_count // _SAMPLE_STRATA
+            strata.append(self.rng.sample(range(start, stop), min(per_stratum, stop - start)))
+        indices = [index for group in zip(*strata) for index in group]
+        # Segments longer than the shortest one contribute their tail last
+        shortest = min(len(group) for group in strata)
+        indices.extend(index for group in strata for index in group[shortest:])
+        return indices[:self.max_sample]
+
+    # --- Scoring ---
+
+    def _interval(self, TypeClass) -> Tuple[float, float, float]:
+        """Wilson interval (low, estimate, high) for the type's confidence."""
+        return wilson_interval(self.valid_counts[TypeClass], self.sample_size)
+
+    def _leader(self) -> Optional[Type[BaseSemanticType]]:
+        leader, leader_score = None, None
+        for TypeClass in self.viable:
+            score = (self.valid_counts[TypeClass] / self.sample_size) * TypeClass.specificity
+            if leader is None or score > leader_score or \
+                    score == leader_score and self.order[TypeClass] < self.order[leader]:
+                leader, leader_score = TypeClass, score
+        return leader
+
+    def _separate(self) -> bool:
+        """Drops candidates that are clearly beaten. True once settled."""
+        leader = self._leader()
+        if leader is None:
+            return True
+        leader_low = self._interval(leader)[0] * leader.specificity
+        survivors, settled = [], True
+        for TypeClass in self.viable:
+            low, _, high = self._interval(TypeClass)
+            if TypeClass is not leader and high * TypeClass.specificity < leader_low:
+                self.ruled_out[TypeClass] = (f"ruled out after {self.sample_size} sampled items: "
+                                             f"could score at most {high * TypeClass.specificity:.3f}")
+                continue
+            survivors.append(TypeClass)
+            if (high - low) / 2 > self.max_error:
+                settled = False
+        self.viable = survivors
+        return settled or len(survivors) == 1
+
+    # --- Search ---
+
+    def run(self, data: List[Any]) -> Optional[Type[BaseSemanticType]]:
+        """Scores a sample of `data` and returns the likely winner (or None)."""
+        self.total_count = len(data)
+        indices = self._indices()
+        round_size = _SAMPLE_START
+        while self.viable and self.sample_size < len(indices):
+            batch = [data[i] for i in indices[self.sample_size:self.sample_size + round_size]]
+            types = self.viable + self.lattice.filters(self.viable, self.budgets.dropped)
+            signatures = _block_signatures(types, batch)
+            counts, _ = _validate_types(self.lattice, types, batch, signatures, run=self.budgets.run)
+            self.viable = [t for t in self.viable if counts[t] is not None]
+            for TypeClass in self.viable:
+                self.valid_counts[TypeClass] += counts[TypeClass]
+            self.sample_size += len(batch)
+            round_size *= 2
+            if self._separate():
+                break
+        return self._leader()
+
+    def stats_for(self, TypeClass) -> SemanticTypeStats:
+        total_count = self.total_count
+        low, confidence, high = self._interval(TypeClass)
+        valid_count = round(confidence * total_count)
+        return SemanticTypeStats(
+            total_count=total_count,
+            valid_count=valid_count,
+            invalid_count=total_count - valid_count,
+            confidence=confidence,
+            is_exact=False,
+            confidence_low=low,
+            confidence_high=high,
+            sample_size=self.sample_size
+        )
+
+    def dropped(self) -> Dict[str, str]:
+        """Type name -> why it lost before sampling stopped."""
+        reasons = {TypeClass.name: reason for TypeClass, reason in self.ruled_out.items()}
+        reasons.update((TypeClass.name, reason) for TypeClass, reason in self.budgets.dropped.items())
+        return reasons
+
+
+def _score_shard(types: List[Type[BaseSemanticType]], items: List[Any],
+                 weights: Optional[List[int]]) -> List[Tuple[Optional[SemanticTypeStats], Optional[str], float, int]]:
+    """
+    [Worker] For every type: its exact stats on one shard of a column
+    (None if its validation raised), why it raised, and the seconds it
+    took on how many items. Budgets are enforced by the caller, on the
+    total time.
+    """
+    total_count = sum(weights) if weights else len(items)
+    signatures = _block_signatures(types, items)
+    budgets = TypeBudgets()
+    counts, _ = _validate_types(TypeLattice(types), types, items, signatures, weights, budgets.run)
+    results = []
+    for TypeClass in types:
+        valid_count = counts[TypeClass]
+        seconds, rows = budgets.elapsed.get(TypeClass, 0.0), budgets.rows.get(TypeClass, 0)
+        if valid_count is None:
+            results.append((None, budgets.dropped[TypeClass], seconds, rows))
+            continue
+        results.append((SemanticTypeStats(
+            total_count=total_count,
+            valid_count=valid_count,
+            invalid_count=total_count - valid_count,
+            confidence=valid_count / total_count
+        ), None, seconds, rows))
+    return results
+
+
+class _MapReduce(_BranchAndBound):
+    """
+    Branch-and-bound where each block is split into shards that are
+    scored in a pool of worker processes; their per-type stats are merged
+    before the bounds are checked. Blocks double in size, so hopeless
+    types are dropped after the first small rounds while most of the
+    column is scored in a few large, well-parallelised ones.
+    """
+
+    def __init__(self, registered_types: List[Type[BaseSemanticType]], total_count: int, workers: int,
+                 type_budget: Optional[float] = None):
+        super().__init__(registered_types, total_count, type_budget)
+        self.workers = workers
+        self.next_block_size = max(_PARALLEL_MIN_ITEMS, total_count // 16)
+
+    def _block_size(self) -> int:
+        size = self.next_block_size
+        self.next_block_size *= 2
+        return size
+
+    def _validate_viable(self, block, weights=None):
+        executor = get_executor(self.workers)
+        types = self.viable + self.lattice.filters(self.viable, self.budgets.dropped)
+        futures = [
+            executor.submit(_score_shard, types, block[start:stop], weights[start:stop] if weights else None)
+            for start, stop in split(len(block), self.workers * _SHARDS_PER_WORKER)
+        ]
+
+        merged: Dict[Type[BaseSemanticType], SemanticTypeStats] = {}
+        for future in futures:
+            for TypeClass, (stats, reason, seconds, rows) in zip(types, future.result()):
+                self.budgets.charge(TypeClass, seconds, rows)
+                if stats is None:
+                    self.budgets.drop(TypeClass, reason)
+                elif TypeClass in merged:
+                    merged[TypeClass] = merged[TypeClass].merge(stats)
+                else:
+                    merged[TypeClass] = stats
+
+        self.viable = [t for t in self.viable if t not in self.budgets.dropped]
+        for TypeClass in self.viable:
+            self.valid_counts[TypeClass] += merged[TypeClass].valid_count
+
+
+def _search(registered_types: List[Type[BaseSemanticType]], data: List[Any], sample: Optional[str],
+            max_error: float, seed: Optional[int], deduplicate: Optional[bool], workers: int,
+            weights: Optional[List[int]] = None, type_budget: Optional[float] = None):
+    """
+    Picks and runs a search strategy. Returns (search, winning type).
+    If `weights` is given, `data` is already dictionary encoded.
+    """
+    if weights is not None:
+        items, total_count = data, sum(weights)
+    else:
+        if sample is not None:
+            search = _SampledSearch(registered_types, sample, max_error, seed, type_budget)
+            if search.worthwhile(len(data)):
+                return search, search.run(data)
+
+        items, total_count = data, len(data)
+        if deduplicate or deduplicate is None and should_encode(data):
+            # Most frequent values first, so the bounds tighten early
+            items, weights = dictionary_encode(data) or (data, None)
+
+    if (workers != 1 and len(items) >= _PARALLEL_MIN_ITEMS and is_picklable(registered_types)
+            and is_sendable([items])):
+        search = _MapReduce(registered_types, total_count, resolve_workers(workers), type_budget)
+        try:
+            return search, search.run(items, weights)
+        except pool_errors():
+            # A worker died; score the column here
+            pass
+
+    search = _BranchAndBound(registered_types, total_count, type_budget)
+    return search, search.run(items, weights)
+
+
+def _report(stats: SemanticTypeStats, search, quarantined: Dict[str, str]):
+    """Attaches why types were dropped, and their timings, to the winner's stats."""
+    stats.dropped = {**quarantined, **search.dropped()}
+    stats.timings = search.budgets.timings()
+
+
+def _record(start: Optional[float], TypeClass: Optional[Type[BaseSemanticType]], data: List[Any],
+            weights: Optional[List[int]], search, quarantined: Dict[str, str]):
+    """Emits the inference metrics, if instrumentation was on when it started."""
+    if start is None:
+        return
+    rows = sum(weights) if weights is not None else len(data)
+    instrumentation.record_infer(TypeClass.name if TypeClass else None, rows,
+                                 time.perf_counter() - start, search.budgets, quarantined)
+
+
+def _no_type_message(search, quarantined: Dict[str, str]) -> str:
+    dropped = {**quarantined, **search.dropped()}
+    if not dropped:
+        return "Could not infer any semantic type for the data."
+    reasons = "; ".join(f"{name}: {reason}" for name, reason in dropped.items())
+    return f"Could not infer any semantic type for the data ({reasons})."
+
+
+def _score(TypeClass: Optional[Type[BaseSemanticType]], stats: Optional[SemanticTypeStats]) -> float:
+    return 0.0 if TypeClass is None else stats.confidence * TypeClass.specificity
+
+
+def needs_llm(TypeClass: Optional[Type[BaseSemanticType]], stats: Optional[SemanticTypeStats]) -> bool:
+    """
+    Whether engine='llm' should ask a generative model about a column
+    whose best registered type (None if nothing matched) has these stats.
+    """
+    return llm_reason(TypeClass, stats) is not None
+
+
+def llm_reason(TypeClass: Optional[Type[BaseSemanticType]], stats: Optional[SemanticTypeStats]) -> Optional[str]:
+    """Why `needs_llm` holds for these stats, for messages; None if it doesn't."""
+    if TypeClass is None:
+        return "no registered type matched"
+    if stats.confidence < LLM_CONFIDENCE_THRESHOLD:
+        return f"confidence is low ({stats.confidence:.2f} for {TypeClass.name})"
+    if TypeClass.name == _CATCH_ALL_TYPE:
+        return f"only the catch-all type {_CATCH_ALL_TYPE} matched"
+    return None
+
+
+def infer(data: List[Any], engine: str = 'default', sample: Optional[str] = None,
+          max_error: float = 0.01, seed: Optional[int] = None,
+          cache: bool = False, deduplicate: Optional[bool] = None,
+          workers: int = 1, type_budget: Optional[float] = None) -> BaseSemanticType:
     """
     Infers the semantic type of a list of data.
 
@@ -12,77 +731,206 @@ def infer(data: List[Any], engine: str = 'default') -> BaseSemanticType:
     and returns an instance of the *best matching* type, complete with
     statistics about the match.
 
+    The data is scanned once: every still-viable type checks each item,
+    and types that can no longer overtake the leader are dropped early
+    (see `_BranchAndBound`).
+
     Args:
         data: A list of data points (e.g., a CSV column).
         engine: The inference engine to use ('default', 'llm').
-                'llm' is reserved for generative-powered inference.
+                'llm' asks a generative model for a dynamic type when the
+                best registered type scores below 0.5 (e.g. when only the
+                catch-all String matches), and keeps it if it scores
+                higher (see `llm_engine.infer_dynamic_type`).
+        sample: Validate only a sample of the data instead of every item.
+                'random' draws uniformly; 'stratified' draws evenly from
+                contiguous segments, which is safer for sorted columns.
+                The resulting stats are estimates (`stats.is_exact` is
+                False) with confidence interval bounds. Columns too small
+                to benefit are always scored exactly.
+        max_error: The largest acceptable half-width of a sampled
+                confidence interval. Sampling stops as soon as the winner is
+                statistically separated from the runner-up, or once every
+                interval is this narrow.
+        seed: Seed for the sample selection, for reproducible results.
+        cache: Look the result up in (and store it into) INFERENCE_CACHE,
+                keyed by a digest of the column and the options above.
+                The cache is cleared whenever a new type is registered.
+        deduplicate: Validate each distinct value once and weight it by
+                its frequency. None (the default) decides from a cheap
+                estimate of the column's cardinality. The result is the
+                same either way.
+        workers: Score shards of the column in this many worker processes
+                (-1 for one per CPU) and merge their stats. The result is
+                identical to a serial scan. Small columns, sampled
+                inference and types that cannot be pickled (e.g. classes
+                defined inside a function) are scored in-process.
+        type_budget: Seconds each type may spend validating this column.
+                A type that runs over is dropped, and one that does so
+                in several calls in a row is quarantined for a while
+                (see `percipio.budget.QUARANTINE`). None for no limit.
 
     Returns:
         An *instance* of the best-matching BaseSemanticType subclass,
-        which includes match statistics and a .clean() method.
+        which includes match statistics and a .clean() method. Its
+        `stats.dropped` says why each other type lost early (raised,
+        ran out of time, quarantined or pruned), and `stats.timings`
+        how long each type spent validating.
     """
-    if not data:
+    if not len(data):
         raise ValueError("Cannot infer type from empty data list.")
-
-    best_type_class = None
-    best_score = -1.0
-    best_stats = None
+    if sample is not None and sample not in SAMPLE_STRATEGIES:
+        raise ValueError(f"Unknown sample strategy '{sample}'. Use one of {SAMPLE_STRATEGIES}.")
+    if not 0 < max_error < 1:
+        raise ValueError("max_error must be between 0 and 1.")
+    if type_budget is not None and type_budget <= 0:
+        raise ValueError("type_budget must be positive.")
 
     # Get all registered types (from types.py and built_in_types.py)
     registered_types = get_registered_types()
-    
+
     if not registered_types:
         raise ImportError("No semantic types are registered. Did percipio.built_in_types fail to import?")
 
-    total_count = len(data)
+    return _infer(registered_types, data, engine, sample, max_error, seed, cache, deduplicate, workers,
+                  type_budget=type_budget)
+
+
+def _infer(registered_types: List[Type[BaseSemanticType]], data: List[Any], engine: str = 'default',
+           sample: Optional[str] = None, max_error: float = 0.01, seed: Optional[int] = None,
+           cache: bool = False, deduplicate: Optional[bool] = None, workers: int = 1,
+           weights: Optional[List[int]] = None, type_budget: Optional[float] = None) -> BaseSemanticType:
+    """`infer` against an explicit list of types, on validated arguments."""
+    start = time.perf_counter() if instrumentation.ENABLED else None
+    cache_key = None
+    if cache and weights is None:
+        fingerprint = column_fingerprint(data)
+        if fingerprint is not None:
+            cache_key = (fingerprint, engine, sample, max_error, seed, type_budget)
+            cached = INFERENCE_CACHE.get(cache_key)
+            if cached is not None:
+                return cached
+
+    # Level 1 & 2: Use the types' built-in validation.
+    # The score is the raw confidence (ratio of valid items) times a
+    # 'specificity' bonus defined on the type class. This helps 'Email'
+    # (specificity=0.8) win against 'String' (specificity=0.1) when all
+    # data points are valid emails.
+    admitted, quarantined = QUARANTINE.admit(registered_types)
+    search, best_type_class = _search(admitted, data, sample, max_error, seed,
+                                      deduplicate, workers, weights, type_budget)
+    QUARANTINE.record(search.budgets)
+    best_stats = search.stats_for(best_type_class) if best_type_class else None
 
-    for TypeClass in registered_types:
-        valid_count = 0
-        
-        # Level 1 & 2: Use the type's built-in validation
-        try:
-            for item in data:
-                if TypeClass.validate_item(item):
-                    valid_count += 1
-        except Exception:
-            # Validation function might fail on weird data
-            continue 
-
-        if total_count == 0: continue
-        
-        # Calculate a confidence score
-        # This is a simple ratio, but could be a complex heuristic
-        confidence = (valid_count / total_count)
-        
-        # Apply a 'specificity' bonus (defined on the type class)
-        # This helps 'Email' (specificity=0.8) win against 'String' (specificity=0.1)
-        # when all data points are valid emails.
-        score = confidence * TypeClass.specificity
-
-        if score > best_score:
-            best_score = score
-            best_type_class = TypeClass
-            best_stats = SemanticTypeStats(
-                total_count=total_count,
-                valid_count=valid_count,
-                invalid_count=total_count - valid_count,
-                confidence=confidence
-            )
-            
     # Level 3: Generative AI Inference (The "Show-Off" Part)
-    # If confidence is low and engine='llm', we could query a
-    # generative model to get a "dynamic" type.
-    if engine == 'llm' and best_stats.confidence < 0.5:
-        print("Default engine confidence is low. Trying 'llm' engine...")
-        # from .llm_engine import infer_dynamic_type
-        # llm_type_class, llm_stats = infer_dynamic_type(data)
-        # if llm_type_class and llm_stats.confidence > best_stats.confidence:
-        #     return llm_type_class(stats=llm_stats)
-        # This is a placeholder for the advanced functionality.
-        pass
+    # If confidence is low and engine='llm', query a generative
+    # model for a "dynamic" type.
+    reason = llm_reason(best_type_class, best_stats) if engine == 'llm' else None
+    if reason is not None:
+        print(f"Default engine: {reason}. Trying 'llm' engine...")
+        from .llm_engine import infer_dynamic_type
+        llm_type_class, llm_stats = infer_dynamic_type(data)
+        if llm_type_class and _score(llm_type_class, llm_stats) > _score(best_type_class, best_stats):
+            best_type_class, best_stats = llm_type_class, llm_stats
 
+    _record(start, best_type_class, data, weights, search, quarantined)
     if best_type_class is None:
-        raise TypeError("Could not infer any semantic type for the data.")
+        raise TypeError(_no_type_message(search, quarantined))
 
     # Return an *instance* of the winning class, passing in the stats
-    return best_type_class(stats=best_stats)
+    _report(best_stats, search, quarantined)
+    result = best_type_class(stats=best_stats)
+    if cache_key is not None:
+        INFERENCE_CACHE.put(cache_key, result)
+    return result
+
+
+def infer_counts(values: List[Any], counts: List[int], workers: int = 1) -> BaseSemanticType:
+    """
+    Infers the semantic type of a column given as its distinct values and
+    how often each occurs, e.g. from `Series.value_counts()` or a SQL
+    `GROUP BY`. Each value is validated once, weighted by its count.
+
+    Args:
+        values: The distinct values of the column.
+        counts: How many rows hold each value (same length as `values`).
+                Listing the most frequent values first lets unlikely
+                types be ruled out sooner.
+        workers: As in `infer`.
+
+    Returns:
+        The same result as `infer` on the expanded column.
+    """
+    if len(values) != len(counts):
+        raise ValueError("values and counts must have the same length.")
+    pairs = [(value, count) for value, count in zip(values, counts) if count > 0]
+    if not pairs:
+        raise ValueError("Cannot infer type from empty data list.")
+    values, counts = [value for value, _ in pairs], [count for _, count in pairs]
+
+    registered_types = get_registered_types()
+    if not registered_types:
+        raise ImportError("No semantic types are registered. Did percipio.built_in_types fail to import?")
+
+    return _infer(registered_types, values, workers=workers, weights=counts)
+
+
+def infer_and_clean(data: List[Any], deduplicate: Optional[bool] = None, workers: int = 1,
+                    type_budget: Optional[float] = None) -> Tuple[BaseSemanticType, List[Optional[Any]]]:
+    """
+    Infers the semantic type of a column and cleans it in one go.
+
+    Types that parse once (see `BaseSemanticType.parse_item`) keep their
+    parse tokens while inference runs, for as long as they can still win,
+    so the winner's cleaning reuses them instead of parsing every row a
+    second time.
+
+    Args:
+        data: A list of data points (e.g., a CSV column).
+        deduplicate: As for `infer`: parse and clean each distinct value
+                once (rows get their own copies of mutable results).
+        workers: As for `infer` and `clean`. With more than one worker,
+                this is `infer` followed by `clean`, since tokens can't
+                be sent back from worker processes.
+        type_budget: As for `infer`.
+
+    Returns:
+        (schema, cleaned): the same as `schema = infer(data)` and
+        `schema.clean(data)`.
+    """
+    if not len(data):
+        raise ValueError("Cannot infer type from empty data list.")
+    if type_budget is not None and type_budget <= 0:
+        raise ValueError("type_budget must be positive.")
+    if workers != 1:
+        schema = infer(data, deduplicate=deduplicate, workers=workers, type_budget=type_budget)
+        return schema, schema.clean(data, deduplicate=deduplicate, workers=workers)
+
+    registered_types = get_registered_types()
+    if not registered_types:
+        raise ImportError("No semantic types are registered. Did percipio.built_in_types fail to import?")
+
+    items, weights = data, None
+    if deduplicate or deduplicate is None and should_encode(data):
+        items, weights = dictionary_encode(data) or (data, None)
+
+    start = time.perf_counter() if instrumentation.ENABLED else None
+    admitted, quarantined = QUARANTINE.admit(registered_types)
+    search = _ParsingSearch(admitted, len(data), type_budget)
+    best_type_class = search.run(items, weights)
+    QUARANTINE.record(search.budgets)
+    _record(start, best_type_class, items, weights, search, quarantined)
+    if best_type_class is None:
+        raise TypeError(_no_type_message(search, quarantined))
+
+    stats = search.stats_for(best_type_class)
+    _report(stats, search, quarantined)
+    schema = best_type_class(stats=stats)
+    start = time.perf_counter() if instrumentation.ENABLED else None
+    cleaned = search.clean(schema, items)
+    if weights is not None:
+        # `items` are the distinct values: expand back to rows
+        cleaned = expand_distinct(dict(zip(zip(map(type, items), items), cleaned)), data)
+    if start is not None:
+        instrumentation.record_clean(schema.name, "infer_and_clean", len(data), time.perf_counter() - start)
+    return schema, cleaned
@@ -0,0 +1,129 @@
+"""
+Dictionary encoding for low-cardinality columns.
+
+Columns of currency strings, status codes or email domains repeat the
+same few values over and over. Validating or cleaning each distinct
+value once, weighted by how often it occurs, gives the same answer as
+doing it row by row at a fraction of the cost.
+
+Values are keyed by (type, value), because equal values of different
+types (1, 1.0 and True) are not interchangeable to a semantic type.
+"""
+
+import copy
+from collections import Counter
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+# Columns shorter than this are cheap enough to process row by row.
+_ENCODE_MIN_ROWS = 1024
+# How many rows the cardinality estimate looks at.
+_ESTIMATE_SAMPLE = 4096
+# Encode when at most this fraction of the sampled rows are distinct.
+_ENCODE_MAX_DISTINCT_RATIO = 0.5
+
+# Results of these types can be shared between rows as they are
+_IMMUTABLE = (type(None), str, int, float, bool, complex, bytes, tuple, frozenset)
+
+
+def estimate_distinct_ratio(data: List[Any]) -> Optional[float]:
+    """
+    Estimates the fraction of distinct values from an evenly spaced
+    sample of rows. None if the column has unhashable values.
+    """
+    step = max(1, len(data) // _ESTIMATE_SAMPLE)
+    sample = data[::step]
+    if not len(sample):
+        return None
+    try:
+        return len(set(zip(map(type, sample), sample))) / len(sample)
+    except TypeError:
+        return None
+
+
+def should_encode(data: List[Any]) -> bool:
+    """True if dictionary encoding is likely to pay off for `data`."""
+    if len(data) < _ENCODE_MIN_ROWS:
+        return False
+    ratio = estimate_distinct_ratio(data)
+    return ratio is not None and ratio <= _ENCODE_MAX_DISTINCT_RATIO
+
+
+def dictionary_encode(data: List[Any]) -> Optional[Tuple[List[Any], List[int]]]:
+    """
+    Returns the distinct values of `data` and how often each occurs,
+    most frequent first. None if the column has unhashable values.
+    """
+    try:
+        counts = Counter(zip(map(type, data), data))
+    except TypeError:
+        return None
+    values, weights = [], []
+    for (_, value), count in counts.most_common():
+        values.append(value)
+        weights.append(count)
+    return values, weights
+
+
+def _fresh(value: Any) -> Any:
+    """A copy of a mutable result, so rows never share one object."""
+    if isinstance(value, _IMMUTABLE):
+        return value
+    if type(value) is dict:
+        return value.copy()
+    return copy.copy(value)
+
+
+def _distinct_results(func: Callable[[Any], Any], data: List[Any], batched: bool) -> Optional[dict]:
+    try:
+        results = dict.fromkeys(zip(map(type, data), data))
+    except TypeError:
+        return None
+    if batched:
+        for key, result in zip(list(results), func([value for _, value in results])):
+            results[key] = result
+        return results
+    for key in results:
+        results[key] = func(key[1])
+    return results
+
+
+def iter_distinct(func: Callable[[Any], Any], data: List[Any],
+                  batched: bool = False) -> Optional[Iterator[Any]]:
+    """
+    Like `map(func, data)`, calling `func` only once per distinct value.
+    Equal rows share one result object, so this is only for consumers
+    that read the results without keeping them. None if the column has
+    unhashable values.
+
+    With `batched`, `func` takes the list of distinct values and returns
+    their results in order, in one call.
+    """
+    results = _distinct_results(func, data, batched)
+    if results is None:
+        return None
+    return map(results.__getitem__, zip(map(type, data), data))
+
+
+def map_distinct(func: Callable[[Any], Any], data: List[Any],
+                 batched: bool = False) -> Optional[List[Any]]:
+    """
+    Computes `[func(item) for item in data]`, calling `func` only once
+    per distinct value. Mutable results are shallow-copied per row.
+    None if the column has unhashable values. `batched` is as for
+    `iter_distinct`.
+    """
+    results = _distinct_results(func, data, batched)
+    if results is None:
+        return None
+    return expand_distinct(results, data)
+
+
+def expand_distinct(results: dict, data: List[Any]) -> List[Any]:
+    """
+    Maps every row of `data` to the result for its (type, value) key in
+    `results`. Mutable results are shallow-copied per row.
+    """
+    keys = zip(map(type, data), data)
+    if all(isinstance(value, _IMMUTABLE) for value in results.values()):
+        return list(map(results.__getitem__, keys))
+    return [_fresh(results[key]) for key in keys]
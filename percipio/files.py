@@ -0,0 +1,439 @@
+"""
+Out-of-core profiling and cleaning of CSV and JSON Lines files.
+
+    schema = percipio.infer_file("export.csv")
+    percipio.clean_file("export.csv", "clean.jsonl", schema)
+
+Files are memory-mapped where possible and processed `chunk_size` rows
+at a time, so memory use depends on the chunk size, not the file size.
+Every column is inferred in the same single scan, either exactly (one
+streaming `Inferrer` per column) or from a fixed-size reservoir sample
+of rows.
+
+CSV files need a header row; their values are strings. JSON Lines files
+hold one object per line; a key missing from a row counts as None.
+"""
+
+import codecs
+import csv
+import io
+import json
+import math
+import mmap
+import os
+import random
+from contextlib import contextmanager
+from itertools import islice, repeat
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .columnar import RAW_FIELD, VALUE_FIELD
+from .core import _infer, wilson_interval
+from .streaming import Inferrer
+from .types import BaseSemanticType, SemanticTypeStats, get_registered_types
+
+# --- File Formats ---
+CSV = "csv"
+JSONL = "jsonl"
+FILE_FORMATS = (CSV, JSONL)
+_EXTENSIONS = {".csv": CSV, ".tsv": CSV, ".txt": CSV, ".jsonl": JSONL, ".ndjson": JSONL}
+# CSV delimiters that differ from ',' by extension
+_DELIMITERS = {".tsv": "\t"}
+
+# Rows read (and cleaned) at a time
+_CHUNK_SIZE = 65536
+# Lines decoded at a time from a memory-mapped file
+_LINE_BATCH = 4096
+# How much of a mapped file is read before its pages are released
+_RELEASE_BYTES = 16 * 1024 * 1024
+
+
+def _file_format(path: str, file_format: Optional[str]) -> str:
+    if file_format is not None:
+        if file_format not in FILE_FORMATS:
+            raise ValueError(f"Unknown file format '{file_format}'. Use one of {FILE_FORMATS}.")
+        return file_format
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in _EXTENSIONS:
+        raise ValueError(f"Cannot tell the format of '{path}' from its extension. "
+                         f"Pass file_format= (one of {FILE_FORMATS}).")
+    return _EXTENSIONS[extension]
+
+
+def _delimiter(path: str, delimiter: Optional[str]) -> str:
+    if delimiter is not None:
+        return delimiter
+    return _DELIMITERS.get(os.path.splitext(path)[1].lower(), ",")
+
+
+def _splits_on_newline_byte(encoding: str) -> bool:
+    """
+    Whether a line in this encoding ends at a b"\\n" byte, so a mapped
+    file can be split into lines before decoding. Not so for UTF-16 and
+    UTF-32, whose newline spans several bytes.
+    """
+    codecs.lookup(encoding)  # Unknown encodings raise LookupError here
+    return "a\n".encode(encoding).endswith(b"a\n")
+
+
+@contextmanager
+def _lines(path: str, encoding: str) -> Iterator[Iterator[str]]:
+    """
+    The file's lines, newlines included, memory-mapped where the
+    encoding allows it.
+    """
+    with open(path, "rb") as f:
+        mapped = None
+        if _splits_on_newline_byte(encoding):
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # Empty files and pipes can't be mapped
+                pass
+        if mapped is None:
+            text = io.TextIOWrapper(f, encoding=encoding, newline="")
+            try:
+                yield text
+            finally:
+                text.detach()
+            return
+        with mapped:
+            yield _mapped_lines(mapped, encoding)
+
+
+def _mapped_lines(mapped: mmap.mmap, encoding: str) -> Iterator[str]:
+    """
+    Decodes a mapped file line by line. Pages already read are handed
+    back to the OS as it goes, so the mapping never adds up to the
+    whole file in resident memory.
+    """
+    can_release = hasattr(mapped, "madvise") and hasattr(mmap, "MADV_DONTNEED")
+    if can_release and hasattr(mmap, "MADV_SEQUENTIAL"):
+        mapped.madvise(mmap.MADV_SEQUENTIAL)
+    lines = iter(mapped.readline, b"")
+    released = 0
+    while True:
+        batch = list(islice(lines, _LINE_BATCH))
+        if not batch:
+            return
+        yield from map(bytes.decode, batch, repeat(encoding))
+        if can_release:
+            consumed = mapped.tell() // mmap.PAGESIZE * mmap.PAGESIZE
+            if consumed - released >= _RELEASE_BYTES:
+                mapped.madvise(mmap.MADV_DONTNEED, released, consumed - released)
+                released = consumed
+
+
+def _without_bom(lines: Iterator[str]) -> Iterator[str]:
+    first = next(lines, None)
+    if first is None:
+        return
+    yield first[1:] if first.startswith("\ufeff") else first
+    yield from lines
+
+
+def _read_chunks(path: str, file_format: str, chunk_size: int, encoding: str, delimiter: str,
+                 columns: Optional[List[str]] = None) -> Iterator[Tuple[List[str], Dict[str, List[Any]], int]]:
+    """
+    Yields (column names so far, column name -> values, row count) for
+    each chunk of rows. A CSV header without all of `columns` raises
+    KeyError before any row is read (JSON Lines keys may first appear
+    in any row, so those are checked by the caller).
+    """
+    with _lines(path, encoding) as lines:
+        lines = _without_bom(iter(lines))
+        if file_format == CSV:
+            reader = csv.reader(lines, delimiter=delimiter)
+            names = next(reader, None)
+            if names is None:
+                return
+            if len(set(names)) != len(names):
+                raise ValueError(f"'{path}' has duplicate column names.")
+            if columns is not None:
+                _check_columns(path, columns, names)
+            width = len(names)
+            while True:
+                rows = list(islice(reader, chunk_size))
+                if not rows:
+                    break
+                if all(len(row) == width for row in rows):
+                    values = [list(column) for column in zip(*rows)] if width else []
+                else:
+                    # Short rows are padded with None, extra fields ignored
+                    values = [[row[i] if i < len(row) else None for row in rows] for i in range(width)]
+                yield names, dict(zip(names, values)), len(rows)
+        else:
+            names: List[str] = []
+            known = set()
+            records = (json.loads(line) for line in lines if not line.isspace())
+            while True:
+                rows = list(islice(records, chunk_size))
+                if not rows:
+                    break
+                for row in rows:
+                    if not isinstance(row, dict):
+                        raise ValueError(f"'{path}': every JSON Lines row must be an object.")
+                    if not known.issuperset(row):
+                        for key in row:
+                            if key not in known:
+                                known.add(key)
+                                names.append(key)
+                yield names, {name: [row.get(name) for row in rows] for name in names}, len(rows)
+
+
+def _check_columns(path: str, columns: List[str], names: List[str]):
+    missing = [name for name in columns if name not in names]
+    if missing:
+        raise KeyError(f"Columns not found in '{path}': {missing}")
+
+
+class _Reservoir:
+    """
+    A uniform random sample of `size` rows from a stream of unknown
+    length (Algorithm L: O(size * log(rows / size)) random draws).
+    """
+
+    def __init__(self, size: int, seed: Optional[int]):
+        self.size = size
+        self.rng = random.Random(seed)
+        self.rows: List[Dict[str, Any]] = []
+        self.seen = 0
+        self.weight = math.exp(math.log(self._uniform()) / size)
+        self.next_row = size + self._skip()
+
+    def _uniform(self) -> float:
+        u = self.rng.random()
+        while u == 0.0:
+            u = self.rng.random()
+        return u
+
+    def _skip(self) -> int:
+        return math.floor(math.log(self._uniform()) / math.log(1 - self.weight))
+
+    def add(self, chunk: Dict[str, List[Any]], row_count: int):
+        """Offers a chunk of rows; only the rows taken are materialised."""
+        start = self.seen
+        for i in range(min(row_count, self.size - len(self.rows))):
+            self.rows.append({name: values[i] for name, values in chunk.items()})
+        while self.next_row < start + row_count:
+            i = self.next_row - start
+            self.rows[self.rng.randrange(self.size)] = {name: values[i] for name, values in chunk.items()}
+            self.weight *= math.exp(math.log(self._uniform()) / self.size)
+            self.next_row += self._skip() + 1
+        self.seen += row_count
+
+
+def _sampled_result(types, values: List[Any], total_count: int) -> BaseSemanticType:
+    """Infers from a sample, with stats extrapolated to the whole column."""
+    result = _infer(types, values)
+    if total_count == len(values):
+        return result
+    low, confidence, high = wilson_interval(result.stats.valid_count, len(values))
+    valid_count = round(confidence * total_count)
+    return type(result)(stats=SemanticTypeStats(
+        total_count=total_count,
+        valid_count=valid_count,
+        invalid_count=total_count - valid_count,
+        confidence=confidence,
+        is_exact=False,
+        confidence_low=low,
+        confidence_high=high,
+        sample_size=len(values)
+    ))
+
+
+def infer_file(path: str, columns: Optional[List[str]] = None, sample_rows: Optional[int] = None,
+               seed: Optional[int] = None, chunk_size: int = _CHUNK_SIZE,
+               file_format: Optional[str] = None, encoding: str = "utf-8",
+               delimiter: Optional[str] = None) -> Dict[str, BaseSemanticType]:
+    """
+    Infers the semantic type of every column of a CSV or JSON Lines
+    file in a single pass, without loading it into memory.
+
+    Args:
+        path: The file to profile.
+        columns: The columns to infer. Defaults to all of them.
+        sample_rows: Infer from a uniform reservoir sample of this many
+                rows instead of counting every row. The stats are then
+                estimates (`stats.is_exact` is False), as with
+                `infer(..., sample=...)`.
+        seed: Seed for the reservoir sample.
+        chunk_size: Rows read at a time; this bounds memory use.
+        file_format: 'csv' or 'jsonl'. Defaults to guessing from the
+                extension (.csv, .tsv, .txt, .jsonl, .ndjson).
+        encoding: The file's text encoding.
+        delimiter: The CSV field delimiter. Defaults to a tab for .tsv
+                files and ',' otherwise.
+
+    Returns:
+        Column name -> inferred type instance, in file order. Without
+        sampling, each result is the same as `infer` on the whole column.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    if sample_rows is not None and sample_rows < 1:
+        raise ValueError("sample_rows must be at least 1.")
+    file_format = _file_format(path, file_format)
+    delimiter = _delimiter(path, delimiter)
+    types = get_registered_types()
+    if not types:
+        raise ImportError("No semantic types are registered. Did percipio.built_in_types fail to import?")
+
+    wanted = set(columns) if columns is not None else None
+    inferrers: Dict[str, Inferrer] = {}
+    reservoir = _Reservoir(sample_rows, seed) if sample_rows is not None else None
+    names: List[str] = []
+    row_count = 0
+    for names, chunk, count in _read_chunks(path, file_format, chunk_size, encoding, delimiter, columns):
+        if wanted is not None:
+            chunk = {name: values for name, values in chunk.items() if name in wanted}
+        if reservoir is not None:
+            reservoir.add(chunk, count)
+        else:
+            for name, values in chunk.items():
+                inferrer = inferrers.get(name)
+                if inferrer is None:
+                    inferrer = inferrers[name] = Inferrer(types)
+                    # A JSON Lines key first seen here was None in earlier rows
+                    inferrer.update_counts([None], [row_count])
+                inferrer.update(values)
+        row_count += count
+
+    selected = [name for name in names if wanted is None or name in wanted]
+    if columns is not None:
+        _check_columns(path, columns, names)
+    if not row_count:
+        raise ValueError(f"Cannot infer types from '{path}': it has no rows.")
+
+    if reservoir is not None:
+        return {name: _sampled_result(types, [row.get(name) for row in reservoir.rows], row_count)
+                for name in selected}
+    return {name: inferrers[name].result() for name in selected}
+
+
+# --- Cleaning ---
+
+def _field_names(handler: Optional[BaseSemanticType], include_raw: bool) -> List[str]:
+    """The output fields of a column: [VALUE_FIELD] for unstructured results."""
+    if handler is None or not handler.output_fields:
+        return [VALUE_FIELD]
+    return [field for field in handler.output_fields if include_raw or field != RAW_FIELD]
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+def clean_file(src: str, dst: str, schema: Optional[Dict[str, BaseSemanticType]] = None,
+               columns: Optional[List[str]] = None, include_raw: bool = False,
+               chunk_size: int = _CHUNK_SIZE, file_format: Optional[str] = None,
+               dst_format: Optional[str] = None, encoding: str = "utf-8", delimiter: Optional[str] = None,
+               sample_rows: Optional[int] = None, seed: Optional[int] = None) -> Dict[str, BaseSemanticType]:
+    """
+    Cleans a CSV or JSON Lines file column by column into a new file,
+    streaming `chunk_size` rows at a time.
+
+    Args:
+        src: The file to clean.
+        dst: Where to write the cleaned rows (overwritten).
+        schema: Column name -> type instance, e.g. from `infer_file`.
+                Columns to clean that it doesn't cover are inferred first,
+                in one extra pass over `src` (with `sample_rows` and `seed`).
+        columns: The columns to clean; the others are copied through
+                unchanged. Defaults to the columns of `schema`, or to every
+                column if no schema is given.
+        include_raw: Keep the "raw" (unparsed input) field of structured
+                results.
+        chunk_size: Rows processed at a time; this bounds memory use.
+        file_format: The format of `src` ('csv' or 'jsonl'); guessed from
+                the extension by default.
+        dst_format: The format of `dst`; guessed from its extension.
+                JSON Lines rows hold each cleaned result as is; CSV rows
+                get one "<column>.<field>" column per output field of
+                types that declare `output_fields`.
+        encoding: The text encoding of both files.
+        delimiter: The CSV field delimiter of both files. Defaults to a
+                tab for .tsv files and ',' otherwise, for each file.
+
+    Returns:
+        The schema that was used.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    file_format = _file_format(src, file_format)
+    dst_format = _file_format(dst, dst_format)
+    src_delimiter, dst_delimiter = _delimiter(src, delimiter), _delimiter(dst, delimiter)
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise ValueError("clean_file cannot write to its own input file.")
+
+    schema = dict(schema or {})
+    if columns is None:
+        columns = list(schema)
+        todo = None if not schema else []
+    else:
+        todo = [name for name in columns if name not in schema]
+    if todo is None or todo:
+        inferred = infer_file(src, todo, sample_rows=sample_rows, seed=seed, chunk_size=chunk_size,
+                              file_format=file_format, encoding=encoding, delimiter=src_delimiter)
+        schema.update(inferred)
+        columns = columns or list(inferred)
+    cleaned_names = set(columns)
+
+    with open(dst, "w", encoding=encoding, newline="") as out:
+        writer = csv.writer(out, delimiter=dst_delimiter) if dst_format == CSV else None
+        header: Optional[List[str]] = None
+        layout: List[Tuple[str, List[str]]] = []
+
+        for names, chunk, count in _read_chunks(src, file_format, chunk_size, encoding, src_delimiter,
+                                                columns):
+            cleaned = {name: schema[name].clean(values) if name in cleaned_names else values
+                       for name, values in chunk.items()}
+            if header is None:
+                layout = [(name, _field_names(schema[name] if name in cleaned_names else None,
+                                              include_raw)) for name in names]
+                header = [name if fields == [VALUE_FIELD] else f"{name}.{field}"
+                          for name, fields in layout for field in fields]
+                if writer is not None:
+                    writer.writerow(header)
+            elif writer is not None and len(names) > len(layout):
+                raise ValueError(f"Column '{names[len(layout)]}' first appears after the CSV header "
+                                 "was written. Write JSON Lines instead.")
+
+            if writer is not None:
+                writer.writerows(_csv_rows(cleaned, layout, count))
+            else:
+                _write_jsonl(out, cleaned, names, cleaned_names, include_raw, count)
+    return schema
+
+
+def _csv_rows(cleaned: Dict[str, List[Any]], layout: List[Tuple[str, List[str]]],
+              count: int) -> Iterator[List[Any]]:
+    for i in range(count):
+        row = []
+        for name, fields in layout:
+            value = cleaned[name][i]
+            if fields == [VALUE_FIELD]:
+                row.append(_csv_value(value))
+            elif value is None:
+                row.extend([""] * len(fields))
+            else:
+                row.extend(_csv_value(value.get(field)) for field in fields)
+        yield row
+
+
+def _write_jsonl(out, cleaned: Dict[str, List[Any]], names: List[str], cleaned_names: set,
+                 include_raw: bool, count: int):
+    dumps = json.JSONEncoder(ensure_ascii=False, default=str).encode
+    for i in range(count):
+        row = {}
+        for name in names:
+            value = cleaned[name][i]
+            if not include_raw and name in cleaned_names and type(value) is dict:
+                # clean() gives every row its own dict
+                value.pop(RAW_FIELD, None)
+            row[name] = value
+        out.write(dumps(row))
+        out.write("\n")
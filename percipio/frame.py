@@ -0,0 +1,303 @@
+"""
+Table-level inference and cleaning.
+
+`infer_frame` and `clean_frame` take a pandas DataFrame or a dict of
+columns and handle every column in one call:
+
+    schema = percipio.infer_frame(df)
+    clean_df = percipio.clean_frame(df, schema)
+
+Columns are read from their underlying arrays instead of being copied
+into lists: object columns as zero-copy object arrays, and typed columns
+(ints, floats, dates, categoricals, ...) through their value counts, so
+each distinct value is validated once. Types that implement
+`clean_series` are cleaned with vectorised pandas string operations.
+
+pandas is optional: percipio never imports it itself, and dicts of
+plain lists work without it.
+"""
+
+import sys
+from collections.abc import Mapping
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Tuple
+
+from .columnar import RAW_FIELD, VALUE_FIELD
+from .core import SAMPLE_STRATEGIES, _infer, _score, llm_reason
+from .parallel import get_best_executor, is_sendable, pool_errors, resolve_workers
+from .types import BaseSemanticType, get_registered_types
+
+# The keyword arguments of `infer` that apply to each column
+_INFER_OPTIONS = ("engine", "sample", "max_error", "seed", "cache", "deduplicate", "type_budget")
+
+
+def _pandas():
+    """The pandas module if the caller has imported it, else None."""
+    return sys.modules.get("pandas")
+
+
+def _is_series(column: Any) -> bool:
+    pd = _pandas()
+    return pd is not None and isinstance(column, pd.Series)
+
+
+def _columns(frame: Any, columns: Optional[List[str]]) -> Dict[str, Any]:
+    """Column name -> column (a Series or a sequence) for the selected columns."""
+    pd = _pandas()
+    if pd is not None and isinstance(frame, pd.DataFrame):
+        if frame.columns.has_duplicates:
+            raise ValueError("DataFrame has duplicate column names.")
+    elif not isinstance(frame, Mapping):
+        raise TypeError("Expected a pandas DataFrame or a dict of columns.")
+    names = list(frame.columns if hasattr(frame, "columns") else frame) if columns is None else columns
+    return {name: frame[name] for name in names}
+
+
+def _is_array(column: Any) -> bool:
+    np = sys.modules.get("numpy")
+    return np is not None and isinstance(column, np.ndarray)
+
+
+def _object_values(column: Any) -> Any:
+    """
+    The items of a column as Python objects; object Series and arrays are
+    not copied.
+    """
+    if _is_array(column) and column.dtype != object:
+        # NumPy scalars (np.int64, np.str_, ...) are not the Python types
+        # the built-in types check for
+        return column.tolist()
+    if not _is_series(column):
+        return column
+    if column.dtype == object:
+        return column.to_numpy(dtype=object, copy=False)
+    return column.to_numpy(dtype=object)
+
+
+def _column_items(column: Any) -> Tuple[Any, Optional[List[int]]]:
+    """
+    The items to validate for a column, and their weights (None if the
+    items are the rows themselves).
+    """
+    if _is_series(column) and column.dtype != object:
+        # A typed column holds one Python type per dtype, so pandas can
+        # count its distinct values in C (an object column can't be
+        # counted this way: pandas treats 1, 1.0 and True as one value).
+        counts = column.value_counts(dropna=False)
+        # Categoricals count their unused categories as 0
+        counts = counts[counts > 0]
+        return counts.index.tolist(), counts.tolist()
+    return _object_values(column), None
+
+
+def string_rows(series: Any) -> Tuple[Any, Any]:
+    """
+    For vectorised `clean_series` implementations: the positions of the
+    str items of a pandas Series, and those items as an object Series
+    with a fresh RangeIndex.
+    """
+    import numpy as np
+    import pandas as pd
+    if series.dtype != object and series.dtype.kind in "biufcmM":
+        # Numbers, booleans and dates: no strings at all
+        return np.empty(0, dtype=np.intp), pd.Series([], dtype=object)
+    values = _object_values(series)
+    mask = np.fromiter(map(isinstance, values, repeat(str)), dtype=bool, count=len(values))
+    positions = np.flatnonzero(mask)
+    return positions, pd.Series(values[positions], dtype=object)
+
+
+def _check_options(options: Dict[str, Any]):
+    unknown = set(options) - set(_INFER_OPTIONS)
+    if unknown:
+        raise TypeError(f"Unknown inference options: {sorted(unknown)}. Use any of {_INFER_OPTIONS}.")
+    if options.get("sample") is not None and options["sample"] not in SAMPLE_STRATEGIES:
+        raise ValueError(f"Unknown sample strategy '{options['sample']}'. Use one of {SAMPLE_STRATEGIES}.")
+    if not 0 < options.get("max_error", 0.01) < 1:
+        raise ValueError("max_error must be between 0 and 1.")
+
+
+def _infer_column(types, items, weights, options) -> BaseSemanticType:
+    # Runs in a worker; `types` is the caller's registry
+    return _infer(types, items, weights=weights, **options)
+
+
+def _run_columns(func, jobs: Dict[str, tuple], workers: int, payload: Any) -> Dict[str, Any]:
+    """
+    Calls func(*args) for every column's args, `workers` columns at a
+    time. Columns whose arguments cannot be sent to a worker process are
+    run here instead.
+    """
+    if workers == 1 or len(jobs) < 2:
+        return {name: func(*args) for name, args in jobs.items()}
+
+    from concurrent.futures import ThreadPoolExecutor
+    executor = get_best_executor(workers, payload)
+    in_processes = not isinstance(executor, ThreadPoolExecutor)
+    futures = {name: executor.submit(func, *args) for name, args in jobs.items()
+               if not in_processes or is_sendable(args)}
+    results = {}
+    for name, args in jobs.items():
+        future = futures.get(name)
+        if future is None:
+            results[name] = func(*args)
+            continue
+        try:
+            results[name] = future.result()
+        except pool_errors():
+            # A worker died; run the column here
+            results[name] = func(*args)
+        except Exception:
+            if not in_processes:
+                raise
+            # The column may not have pickled (`is_sendable` only probes
+            # it): run it here, where a genuine error is raised again
+            results[name] = func(*args)
+    return results
+
+
+def infer_frame(frame: Any, columns: Optional[List[str]] = None, workers: int = 1,
+                llm_engine: Optional[Any] = None, **options) -> Dict[str, BaseSemanticType]:
+    """
+    Infers the semantic type of every column of a table.
+
+    Args:
+        frame: A pandas DataFrame, or a dict of column name -> list (or
+               array, or Series) of items.
+        columns: The columns to infer. Defaults to all of them.
+        workers: Infer this many columns at a time in worker processes
+                 (-1 for one per CPU). Threads are used instead on
+                 free-threaded builds, or if a registered type cannot be
+                 pickled. A single column is sharded as in `infer`.
+        llm_engine: With engine='llm', the `llm_async.AsyncLLMEngine`
+                 that handles the low-confidence columns, all at once.
+                 Defaults to one with the default limits.
+        **options: Passed on to `infer` for each column: engine, sample,
+                 max_error, seed, cache, deduplicate and type_budget. Typed (non-object)
+                 pandas columns are always scored exactly, from their
+                 value counts.
+
+    Returns:
+        Column name -> inferred type instance, in column order. Each
+        result is the same as `infer(column.tolist())`.
+    """
+    _check_options(options)
+    types = get_registered_types()
+    if not types:
+        raise ImportError("No semantic types are registered. Did percipio.built_in_types fail to import?")
+
+    workers = resolve_workers(workers)
+    # Level 3 runs once for the whole table, below
+    use_llm = options.get("engine") == "llm"
+    options = dict(options, engine="default")
+    selected = _columns(frame, columns)
+    jobs = {}
+    for name, column in selected.items():
+        items, weights = _column_items(column)
+        if not len(items):
+            raise ValueError(f"Cannot infer type of empty column '{name}'.")
+        jobs[name] = (types, items, weights, options)
+
+    if len(jobs) == 1 and workers > 1:
+        # Nothing to run side by side: shard the column instead
+        name, (_, items, weights, _) = next(iter(jobs.items()))
+        schema = {name: _infer(types, items, weights=weights, workers=workers, **options)}
+    else:
+        schema = _run_columns(_infer_column, jobs, workers, types)
+
+    if use_llm:
+        _infer_ambiguous(schema, selected, llm_engine)
+    return schema
+
+
+def _infer_ambiguous(schema: Dict[str, BaseSemanticType], selected: Dict[str, Any],
+                     llm_engine: Optional[Any]):
+    """
+    engine='llm' for a table: asks a generative model about every
+    low-confidence column at once (see `llm_async.AsyncLLMEngine`), and
+    keeps the dynamic types that beat the registered ones.
+    """
+    from .llm_async import AsyncLLMEngine
+    reasons = {name: llm_reason(type(result), result.stats) for name, result in schema.items()}
+    ambiguous = {name: _object_values(selected[name]) for name, reason in reasons.items() if reason is not None}
+    if not ambiguous:
+        return
+    details = "; ".join(f"{name!r}: {reasons[name]}" for name in ambiguous)
+    print(f"Default engine is unsure of {len(ambiguous)} column(s) ({details}). Trying 'llm' engine...")
+    for name, (llm_type_class, llm_stats) in (llm_engine or AsyncLLMEngine()).run(ambiguous).items():
+        if llm_type_class and _score(llm_type_class, llm_stats) > _score(type(schema[name]), schema[name].stats):
+            schema[name] = llm_type_class(stats=llm_stats)
+
+
+def _output_names(name: Any, fields: Dict[str, Any]) -> Dict[Any, Any]:
+    """Names a column's cleaned fields: "<name>.<field>", or just <name> for a scalar type."""
+    if list(fields) == [VALUE_FIELD]:
+        return {name: fields[VALUE_FIELD]}
+    return {f"{name}.{field}": column for field, column in fields.items()}
+
+
+def _clean_column(handler: BaseSemanticType, name: Any, column: Any,
+                  include_raw: bool) -> Dict[Any, Any]:
+    """Output column name -> cleaned column, for one input column."""
+    as_pandas = _is_series(column)
+    if as_pandas:
+        cleaned = handler.clean_series(column)
+        if cleaned is not None:
+            if not include_raw:
+                cleaned = cleaned.drop(columns=[RAW_FIELD], errors="ignore")
+            # .array keeps the dtype (e.g. categorical) but not the index
+            return _output_names(name, {field: cleaned[field].array for field in cleaned.columns})
+
+    items = _object_values(column)
+    if handler.output_fields:
+        result = handler.clean_columnar(items, include_raw=include_raw)
+        if as_pandas:
+            cleaned = result.to_pandas()
+            return _output_names(name, {field: cleaned[field].array for field in cleaned.columns})
+        return _output_names(name, result.columns)
+    return {name: handler.clean(items)}
+
+
+def clean_frame(frame: Any, schema: Optional[Dict[str, BaseSemanticType]] = None,
+                columns: Optional[List[str]] = None, include_raw: bool = False,
+                workers: int = 1, **options) -> Any:
+    """
+    Cleans every column of a table with its semantic type.
+
+    Args:
+        frame: A pandas DataFrame, or a dict of column name -> list (or
+               array, or Series) of items.
+        schema: Column name -> type instance, e.g. from `infer_frame`.
+                Columns it doesn't cover are inferred first, with
+                `**options` (see `infer_frame`).
+        columns: The columns to clean. Defaults to all of them.
+        include_raw: Keep the "raw" (unparsed input) field of types that
+                declare one.
+        workers: Clean this many columns at a time in worker processes
+                (-1 for one per CPU), as in `infer_frame`.
+
+    Returns:
+        For a DataFrame, a DataFrame with the same index; otherwise a dict
+        of columns. Types with `output_fields` produce one column per
+        field, named "<column>.<field>" and typed as in `clean_columnar`
+        (or just "<column>" for a single "value" field); other types
+        produce one column of `clean` results.
+    """
+    selected = _columns(frame, columns)
+    schema = dict(schema or {})
+    missing = [name for name in selected if name not in schema]
+    if missing:
+        schema.update(infer_frame(frame, missing, workers=workers, **options))
+
+    jobs = {name: (schema[name], name, column, include_raw) for name, column in selected.items()}
+    results = _run_columns(_clean_column, jobs, resolve_workers(workers),
+                           [schema[name] for name in selected])
+
+    cleaned = {}
+    for name in selected:
+        cleaned.update(results[name])
+
+    pd = _pandas()
+    if pd is not None and isinstance(frame, pd.DataFrame):
+        return pd.DataFrame(cleaned, index=frame.index, copy=False)
+    return cleaned
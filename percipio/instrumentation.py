@@ -0,0 +1,370 @@
+"""
+Counters, timings and a Prometheus exporter for percipio.
+
+Instrumentation is off by default, and then costs one flag check per
+`infer`/`clean` call. Turn it on with `enable()` (or by setting
+PERCIPIO_METRICS=1):
+
+    from percipio import instrumentation
+    instrumentation.enable()
+    ...
+    print(instrumentation.prometheus_text())
+
+Every instrumented operation emits an `Event` to each sink. A sink is
+any callable taking an Event; the default one, METRICS, aggregates them
+into counters and histograms:
+
+    percipio_<event>_total{labels}               operations
+    percipio_<event>_seconds{labels}             duration histogram
+    percipio_<event>_rows_total{labels}          rows processed
+    percipio_<event>_rows_per_second{labels}     throughput of the last one
+
+Events:
+    infer       {type}: one inferred column (the winning type)
+    validate    {type}: one type's validation of a column (rows = items checked)
+    type_dropped {type, reason}: a type raised, ran over budget or was quarantined
+    clean       {type, method}: one clean/clean_columnar call
+    llm         {op, outcome}: one model call (identify, identify_batch, generate)
+
+Cache, quarantine and sandbox state is read at export time.
+
+Metrics recorded inside worker processes (e.g. `infer_frame(workers=N)`)
+stay in those processes.
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Whether hooks emit events. Hooks check this before doing any work.
+ENABLED = False
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0, math.inf)
+
+_HELP = {
+    "infer": "Columns inferred, by winning type.",
+    "validate": "Per-type validation of a column during inference.",
+    "type_dropped": "Types dropped from inference, by reason.",
+    "clean": "Clean calls, by type and method.",
+    "llm": "Generative model calls, by operation and outcome.",
+    "schema_drift": "Drift events of monitored columns, by kind and winning type.",
+}
+
+
+class Event:
+    """One instrumented operation."""
+    __slots__ = ("name", "labels", "seconds", "rows", "timestamp")
+
+    def __init__(self, name: str, labels: Dict[str, str], seconds: Optional[float] = None, rows: int = 0):
+        self.name = name
+        self.labels = labels
+        self.seconds = seconds
+        self.rows = rows
+        self.timestamp = time.time()
+
+    def __repr__(self):
+        return f"Event({self.name!r}, {self.labels}, seconds={self.seconds}, rows={self.rows})"
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.total += seconds
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    A sink that aggregates events into counters and histograms, keyed by
+    event name and labels. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Dict[Tuple[str, tuple], int] = {}
+        self.rows: Dict[Tuple[str, tuple], int] = {}
+        self.rates: Dict[Tuple[str, tuple], float] = {}
+        self.histograms: Dict[Tuple[str, tuple], _Histogram] = {}
+
+    def __call__(self, event: Event):
+        key = (event.name, tuple(sorted(event.labels.items())))
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            if event.rows:
+                self.rows[key] = self.rows.get(key, 0) + event.rows
+            if event.seconds is not None:
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = _Histogram()
+                histogram.observe(event.seconds)
+                if event.rows and event.seconds > 0:
+                    self.rates[key] = event.rows / event.seconds
+
+    def reset(self):
+        with self._lock:
+            self.counts.clear()
+            self.rows.clear()
+            self.rates.clear()
+            self.histograms.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """A plain-dict copy of every metric, e.g. for logging."""
+        with self._lock:
+            def flat(key):
+                name, labels = key
+                return (name,) + labels
+            return {
+                "counts": {flat(key): value for key, value in self.counts.items()},
+                "rows": {flat(key): value for key, value in self.rows.items()},
+                "rows_per_second": {flat(key): value for key, value in self.rates.items()},
+                "seconds": {flat(key): {"count": h.count, "sum": h.total}
+                            for key, h in self.histograms.items()},
+            }
+
+
+# The default sink, read by the exporter
+METRICS = MetricsRegistry()
+
+_SINKS: List[Callable[[Event], None]] = [METRICS]
+
+
+# --- Switches ---
+
+def enable(*sinks: Callable[[Event], None]):
+    """Turns instrumentation on, adding any extra sinks."""
+    global ENABLED
+    for sink in sinks:
+        add_sink(sink)
+    ENABLED = True
+
+
+def disable():
+    """Turns instrumentation off. Collected metrics are kept."""
+    global ENABLED
+    ENABLED = False
+
+
+def add_sink(sink: Callable[[Event], None]):
+    if sink not in _SINKS:
+        _SINKS.append(sink)
+
+
+def remove_sink(sink: Callable[[Event], None]):
+    if sink in _SINKS:
+        _SINKS.remove(sink)
+
+
+def emit(name: str, labels: Dict[str, str], seconds: Optional[float] = None, rows: int = 0):
+    """Sends an event to every sink. A failing sink never breaks the caller."""
+    event = Event(name, labels, seconds, rows)
+    for sink in list(_SINKS):
+        try:
+            sink(event)
+        except Exception as e:
+            print(f"percipio: Metrics sink {sink!r} failed: {e}")
+
+
+# --- Hooks ---
+
+def record_infer(type_name: Optional[str], rows: int, seconds: float, budgets: Any = None,
+                 quarantined: Optional[Dict[str, str]] = None):
+    """One inferred column, and how each type fared (see budget.TypeBudgets)."""
+    emit("infer", {"type": type_name or "none"}, seconds, rows)
+    if budgets is not None:
+        for TypeClass, elapsed in budgets.elapsed.items():
+            emit("validate", {"type": TypeClass.name}, elapsed, budgets.rows.get(TypeClass, 0))
+        for TypeClass in budgets.dropped:
+            reason = "over_budget" if TypeClass in budgets.over_budget else "raised"
+            emit("type_dropped", {"type": TypeClass.name, "reason": reason})
+    for name in quarantined or ():
+        emit("type_dropped", {"type": name, "reason": "quarantined"})
+
+
+def record_clean(type_name: str, method: str, rows: int, seconds: float):
+    emit("clean", {"type": type_name, "method": method}, seconds, rows)
+
+
+def record_llm(op: str, seconds: float, ok: bool):
+    emit("llm", {"op": op, "outcome": "ok" if ok else "error"}, seconds)
+
+
+def record_drift(kind: str, type_name: str):
+    """A SchemaMonitor event (see percipio.monitor)."""
+    emit("schema_drift", {"kind": kind, "type": type_name})
+
+
+# --- Collectors (read at export time) ---
+
+def _collect() -> List[Tuple[str, str, str, Dict[str, str], float]]:
+    """(name, kind, help, labels, value) samples for current state."""
+    samples = []
+    from .core import INFERENCE_CACHE
+    for field, value in INFERENCE_CACHE.info().items():
+        if field in ("hits", "misses", "evictions", "invalidations"):
+            samples.append((f"percipio_inference_cache_{field}_total", "counter",
+                            f"Inference cache {field}.", {}, value))
+        elif field in ("entries", "bytes"):
+            samples.append((f"percipio_inference_cache_{field}", "gauge",
+                            f"Inference cache {field}.", {}, value))
+
+    from .memo import VALUE_MEMO
+    if VALUE_MEMO.enabled:
+        info = VALUE_MEMO.info()
+        for field in ("hits", "misses", "evictions", "invalidations"):
+            samples.append((f"percipio_value_memo_{field}_total", "counter",
+                            f"Value memo {field}.", {}, info[field]))
+        samples.append(("percipio_value_memo_entries", "gauge", "Value memo entries.", {}, info["entries"]))
+        for name, kinds in info["by_type"].items():
+            for kind, counts in kinds.items():
+                samples.append(("percipio_value_memo_type_hit_ratio", "gauge",
+                                "Value memo hit rate per type and kind of result.",
+                                {"type": name, "kind": kind}, counts["hit_rate"]))
+
+    from .budget import QUARANTINE
+    samples.append(("percipio_quarantined_types", "gauge", "Types currently quarantined.", {},
+                    len(QUARANTINE.info()["quarantined"])))
+
+    llm_engine = sys.modules.get(__package__ + ".llm_engine")
+    if llm_engine is not None:
+        if llm_engine.PARSER_CACHE is not None:
+            info = llm_engine.PARSER_CACHE.info()
+            for field in ("hits", "misses", "evictions"):
+                samples.append((f"percipio_parser_cache_{field}_total", "counter",
+                                f"LLM parser cache {field}.", {}, info[field]))
+            samples.append(("percipio_parser_cache_entries", "gauge",
+                            "LLM parser cache entries.", {}, info["entries"]))
+        if llm_engine.PARSER_SANDBOX is not None:
+            samples.append(("percipio_sandbox_disabled_parsers", "gauge",
+                            "Generated parsers disabled by the sandbox.", {},
+                            len(llm_engine.PARSER_SANDBOX.disabled)))
+    return samples
+
+
+# --- Prometheus / OpenMetrics Export ---
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def prometheus_text(registry: Optional[MetricsRegistry] = None, openmetrics: bool = False) -> str:
+    """
+    All metrics in the Prometheus text exposition format, or in
+    OpenMetrics format (which ends with '# EOF') if `openmetrics`.
+    """
+    registry = registry or METRICS
+    lines = []
+
+    def family(name: str, kind: str, help_text: str):
+        # OpenMetrics names a counter family without its _total suffix
+        type_name = name[:-len("_total")] if openmetrics and kind == "counter" else name
+        lines.append(f"# HELP {type_name} {help_text}")
+        lines.append(f"# TYPE {type_name} {kind}")
+
+    with registry._lock:
+        counts = sorted(registry.counts.items())
+        rows = sorted(registry.rows.items())
+        rates = sorted(registry.rates.items())
+        histograms = sorted((key, (list(h.counts), h.total, h.count)) for key, h in registry.histograms.items())
+
+    def grouped(entries):
+        groups: Dict[str, list] = {}
+        for (name, labels), value in entries:
+            groups.setdefault(name, []).append((labels, value))
+        return groups.items()
+
+    for name, entries in grouped(counts):
+        metric = f"percipio_{name}_total"
+        family(metric, "counter", _HELP.get(name, f"percipio {name} operations."))
+        lines.extend(f"{metric}{_labels(labels)} {value}" for labels, value in entries)
+    for name, entries in grouped(rows):
+        metric = f"percipio_{name}_rows_total"
+        family(metric, "counter", f"Rows processed by percipio {name}.")
+        lines.extend(f"{metric}{_labels(labels)} {value}" for labels, value in entries)
+    for name, entries in grouped(rates):
+        metric = f"percipio_{name}_rows_per_second"
+        family(metric, "gauge", f"Rows per second of the latest percipio {name}.")
+        lines.extend(f"{metric}{_labels(labels)} {_number(value)}" for labels, value in entries)
+    for name, entries in grouped(histograms):
+        metric = f"percipio_{name}_seconds"
+        family(metric, "histogram", f"Duration of percipio {name}, in seconds.")
+        for labels, (bucket_counts, total, count) in entries:
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS, bucket_counts):
+                cumulative += bucket_count
+                lines.append(f"{metric}_bucket{_labels(labels, ('le', _number(bound)))} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{metric}_count{_labels(labels)} {count}")
+
+    declared = set()
+    for name, kind, help_text, labels, value in _collect():
+        # Labelled samples of one metric share a single header
+        if name not in declared:
+            declared.add(name)
+            family(name, kind, help_text)
+        lines.append(f"{name}{_labels(sorted(labels.items()))} {_number(value)}")
+
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def serve_metrics(port: int = 0, host: str = "127.0.0.1"):
+    """
+    Serves `prometheus_text()` at http://host:port/metrics from a
+    background thread, for Prometheus to scrape. Returns the server
+    (`server.server_address` has the port; `server.shutdown()` stops it).
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+            body = prometheus_text(openmetrics=openmetrics).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/openmetrics-text; version=1.0.0; charset=utf-8"
+                             if openmetrics else "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="percipio-metrics").start()
+    return server
+
+
+if os.environ.get("PERCIPIO_METRICS", "").lower() in ("1", "true", "yes", "on"):
+    enable()
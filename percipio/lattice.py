@@ -0,0 +1,93 @@
+"""
+The type lattice: which types refine which.
+
+A type may name a `parent`, a broader type that accepts every item it
+accepts (String -> Email, Numeric -> Integer). Inference validates
+parents first and tries each child only on the items its parent
+accepted, so a block its parent rejects outright costs the whole
+subtree nothing. Since a child can never count more valid items than
+its parent, its score bound is at most its parent's count, and subtrees
+are ruled out together by the usual pruning.
+
+A parent that is no longer a candidate itself (pruned, or `virtual`)
+is still validated when it narrows enough candidates below it to pay
+for itself (see `TypeLattice.filters`).
+
+The contract is the type author's: if a child accepts an item its
+parent rejects, that item is counted as invalid for the child.
+"""
+
+from typing import Any, Collection, Dict, List, Optional, Set
+
+# A type that is not a candidate is only validated to narrow at least
+# this many candidates below it; narrowing a single one rarely pays for
+# validating the block twice.
+_MIN_CHILDREN = 2
+
+
+class TypeLattice:
+    """
+    Parent links between a set of types (classes or TypeDescriptors),
+    resolved by name within the set. Parents missing from the set are
+    ignored, as are links that would form a cycle.
+
+    Args:
+        types: The types taking part in one inference run.
+    """
+
+    def __init__(self, types: List[Any]):
+        by_name = {TypeClass.name: TypeClass for TypeClass in types}
+        # TypeClass -> its ancestors in the set, nearest first
+        self.ancestors: Dict[Any, List[Any]] = {}
+        for TypeClass in types:
+            chain, parent = [], by_name.get(TypeClass.parent)
+            while parent is not None and parent is not TypeClass and parent not in chain:
+                chain.append(parent)
+                parent = by_name.get(parent.parent)
+            self.ancestors[TypeClass] = chain
+        self.linked = any(self.ancestors.values())
+
+    def __repr__(self):
+        links = sum(1 for chain in self.ancestors.values() if chain)
+        return f"<TypeLattice: {len(self.ancestors)} types, {links} with a parent>"
+
+    def order(self, types: List[Any]) -> List[Any]:
+        """`types` with every parent before its children (otherwise in the given order)."""
+        if not self.linked:
+            return types
+        return sorted(types, key=lambda TypeClass: len(self.ancestors.get(TypeClass, ())))
+
+    def parents_within(self, types: Collection[Any]) -> Set[Any]:
+        """The types that are an ancestor of another one of `types`."""
+        if not self.linked:
+            return set()
+        members = set(types)
+        return {ancestor for TypeClass in types for ancestor in self.ancestors.get(TypeClass, ())
+                if ancestor in members}
+
+    def nearest(self, TypeClass, validated: Collection[Any]) -> Optional[Any]:
+        """The type's nearest ancestor among `validated` (None if there is none)."""
+        for ancestor in self.ancestors.get(TypeClass, ()):
+            if ancestor in validated:
+                return ancestor
+        return None
+
+    def filters(self, candidates: List[Any], excluded: Collection[Any] = ()) -> List[Any]:
+        """
+        Ancestors that are not candidates themselves but are worth
+        validating to narrow the candidates below them: those above at
+        least _MIN_CHILDREN candidates, up to each candidate's nearest
+        candidate ancestor (which is validated anyway). Parents first.
+        """
+        if not self.linked:
+            return []
+        members = set(candidates)
+        below: Dict[Any, int] = {}
+        for TypeClass in candidates:
+            for ancestor in self.ancestors.get(TypeClass, ()):
+                if ancestor in members:
+                    break
+                if ancestor not in excluded:
+                    below[ancestor] = below.get(ancestor, 0) + 1
+        chosen = [ancestor for ancestor, count in below.items() if count >= _MIN_CHILDREN]
+        return self.order(chosen)
@@ -0,0 +1,323 @@
+"""
+An asyncio version of the Level 3 (generative) engine, for profiling
+many ambiguous columns at once.
+
+`llm_engine.infer_dynamic_type` handles one column with two blocking
+model calls. `AsyncLLMEngine` handles a whole table's worth:
+
+    engine = AsyncLLMEngine(max_concurrency=8, requests_per_second=5)
+    results = engine.run({"name": names, "contact": contacts})
+
+- Columns with a cached parser (see `llm_engine.PARSER_CACHE`) make no
+  model call at all.
+- The rest are identified `batch_size` columns per prompt.
+- One parser is generated per distinct type name, not per column.
+- Every prompt goes out concurrently, at most `max_concurrency` at a
+  time and no faster than `requests_per_second`.
+
+Prompts go to the model server at $PERCIPIO_LLM_URL if it is set (see
+`llm_engine._call_llm`), else to the mock model. `StubModelServer`
+serves the mock model over HTTP, for trying the whole path locally.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from . import instrumentation, llm_engine
+from .parser_cache import shape_fingerprint
+from .types import BaseSemanticType, SemanticTypeStats
+
+# Most sample values shown to the model when generating one parser for
+# several columns of the same type
+_MAX_GENERATE_SAMPLES = 20
+
+
+# --- Transport ---
+
+async def _call_llm(prompt: str) -> str:
+    """
+    Async `llm_engine._call_llm`; `AsyncLLMEngine._prompt` records its
+    latency. The blocking request (or mock) runs in a thread, so the
+    event loop keeps the other prompts, and the engine's limits, going.
+    """
+    return await asyncio.to_thread(llm_engine._send_prompt, prompt)
+
+
+class _RateLimiter:
+    """Spaces out calls to at most `rate` per second."""
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1 / rate if rate else 0.0
+        self.next_time = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# --- Engine ---
+
+class AsyncLLMEngine:
+    """
+    Generative inference for many columns at once.
+
+    Args:
+        max_concurrency: The most prompts in flight at a time.
+        requests_per_second: The most prompts sent per second (None for
+                             no limit).
+        batch_size: The most columns identified in one prompt. Columns
+                    a batched answer doesn't cover are asked about alone.
+        call: An async function sending one prompt and returning the
+              model's answer. Defaults to $PERCIPIO_LLM_URL or the mock.
+
+    The limits apply per `infer_columns` call.
+    """
+
+    def __init__(self, max_concurrency: int = 8, requests_per_second: Optional[float] = None,
+                 batch_size: int = 8, call: Optional[Callable[[str], Awaitable[str]]] = None):
+        if max_concurrency < 1 or batch_size < 1:
+            raise ValueError("max_concurrency and batch_size must be at least 1.")
+        if requests_per_second is not None and requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive.")
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.batch_size = batch_size
+        self.call = call or _call_llm
+
+        # --- Counters ---
+        self.prompts_sent = 0
+
+    def __repr__(self):
+        return (f"AsyncLLMEngine(max_concurrency={self.max_concurrency}, "
+                f"requests_per_second={self.requests_per_second}, batch_size={self.batch_size})")
+
+    async def _prompt(self, prompt: str, limits: Tuple[asyncio.Semaphore, _RateLimiter],
+                      op: str = "prompt") -> str:
+        semaphore, rate_limiter = limits
+        async with semaphore:
+            await rate_limiter.wait()
+            self.prompts_sent += 1
+            if not instrumentation.ENABLED:
+                return await self.call(prompt)
+            start = time.perf_counter()
+            try:
+                response = await self.call(prompt)
+            except Exception:
+                instrumentation.record_llm(op, time.perf_counter() - start, ok=False)
+                raise
+            instrumentation.record_llm(op, time.perf_counter() - start, ok=True)
+            return response
+
+    async def _identify_one(self, sample: List[Any], limits) -> Optional[str]:
+        try:
+            response = await self._prompt(llm_engine._IDENTIFY_PROMPT.format(sample=sample), limits, "identify")
+        except Exception as e:
+            # Any failure costs only this prompt's columns, not the gather
+            print(f"[LLM Engine]: {e}")
+            return None
+        return llm_engine._parse_type_name(response)
+
+    async def _identify_batch(self, samples: Dict[Any, List[Any]], limits) -> Dict[Any, Optional[str]]:
+        """Column name -> type name (None if unknown) for up to batch_size columns."""
+        if len(samples) == 1:
+            name, sample = next(iter(samples.items()))
+            return {name: await self._identify_one(sample, limits)}
+
+        # Column names can be anything, so the prompt uses "c<n>" ids
+        ids = {f"c{n}": name for n, name in enumerate(samples)}
+        lines = "\n".join(f"{column_id}: {samples[name]}" for column_id, name in ids.items())
+        try:
+            response = await self._prompt(llm_engine._IDENTIFY_BATCH_PROMPT.format(columns=lines), limits,
+                                         "identify_batch")
+        except Exception as e:
+            print(f"[LLM Engine]: {e}")
+            return dict.fromkeys(samples)
+        try:
+            answers = json.loads(response)
+        except ValueError:
+            answers = None
+        if not isinstance(answers, dict):
+            answers = {}
+
+        type_names = {}
+        for column_id, name in ids.items():
+            answer = answers.get(column_id)
+            if isinstance(answer, dict):
+                answer = answer.get("semantic_type")
+            type_names[name] = llm_engine._type_name(answer)
+        missing = [name for name, type_name in type_names.items() if type_name is None]
+        if missing:
+            # Not answered (or not usably) for these: ask about each one alone
+            retried = await asyncio.gather(*(self._identify_one(samples[name], limits) for name in missing))
+            type_names.update(zip(missing, retried))
+        return type_names
+
+    async def _generate(self, sample: List[Any], limits) -> Optional[str]:
+        try:
+            response = await self._prompt(llm_engine._GENERATE_PROMPT.format(sample=sample), limits, "generate")
+        except Exception as e:
+            print(f"[LLM Engine]: {e}")
+            return None
+        return llm_engine._extract_python_code(response) or None
+
+    async def infer_columns(self, columns: Dict[Any, List[Any]]
+                            ) -> Dict[Any, Tuple[Optional[Type[BaseSemanticType]], SemanticTypeStats]]:
+        """
+        `llm_engine.infer_dynamic_type` for every column.
+
+        Args:
+            columns: Column name -> list of items.
+
+        Returns:
+            Column name -> (dynamic type class or None, stats), in column order.
+        """
+        limits = (asyncio.Semaphore(self.max_concurrency), _RateLimiter(self.requests_per_second))
+        samples = {name: llm_engine._sample(data) for name, data in columns.items()}
+        fingerprints = {name: shape_fingerprint(sample, salt=llm_engine.PROMPT_VERSION)
+                        for name, sample in samples.items()}
+
+        # --- 1. Check the Cache ---
+        found: Dict[Any, Type[BaseSemanticType]] = {}
+        for name, fingerprint in fingerprints.items():
+            DynamicType = await asyncio.to_thread(llm_engine._cached_type, fingerprint)
+            if DynamicType is not None:
+                found[name] = DynamicType
+        pending = [name for name in columns if name not in found]
+
+        # --- 2. Identify the Types, a batch of columns per prompt ---
+        batches = [pending[start:start + self.batch_size]
+                   for start in range(0, len(pending), self.batch_size)]
+        type_names: Dict[Any, Optional[str]] = {}
+        for identified in await asyncio.gather(
+                *(self._identify_batch({name: samples[name] for name in batch}, limits) for batch in batches)):
+            type_names.update(identified)
+
+        # --- 3. Generate one Parser per Type ---
+        by_type: Dict[str, List[Any]] = {}
+        for name in pending:
+            if type_names.get(name) is not None:
+                by_type.setdefault(type_names[name], []).append(name)
+        type_samples = {}
+        for type_name, names in by_type.items():
+            merged = []
+            for name in names:
+                for item in samples[name]:
+                    if item not in merged:
+                        merged.append(item)
+            type_samples[type_name] = merged[:_MAX_GENERATE_SAMPLES]
+        parser_codes = await asyncio.gather(*(self._generate(sample, limits)
+                                              for sample in type_samples.values()))
+
+        # --- 4. Create the Dynamic Classes ---
+        for type_name, parser_code in zip(by_type, parser_codes):
+            if parser_code is None:
+                continue
+            names = by_type[type_name]
+            # Compiles the parser and writes the cache: keep the loop free
+            DynamicType = await asyncio.to_thread(llm_engine._new_type, type_name, parser_code,
+                                                  [fingerprints[name] for name in names])
+            if DynamicType is not None:
+                found.update(dict.fromkeys(names, DynamicType))
+
+        # --- 5. Register and Score ---
+        results = {}
+        for name, data in columns.items():
+            if name in found:
+                stats = await asyncio.to_thread(llm_engine._register_dynamic, found[name], data)
+                results[name] = (found[name], stats)
+            else:
+                results[name] = (None, SemanticTypeStats())
+        return results
+
+    def run(self, columns: Dict[Any, List[Any]]
+            ) -> Dict[Any, Tuple[Optional[Type[BaseSemanticType]], SemanticTypeStats]]:
+        """`infer_columns` from synchronous code. Inside an event loop, await `infer_columns` instead."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.infer_columns(columns))
+        raise RuntimeError("AsyncLLMEngine.run() was called from a running event loop; "
+                           "use 'await engine.infer_columns(...)' instead.")
+
+
+# --- Stub Model Server ---
+
+class StubModelServer:
+    """
+    A local model server answering with the mock model, in a background
+    thread. Point the engine at it to exercise the HTTP path end to end:
+
+        with StubModelServer(delay=0.05) as server:
+            os.environ["PERCIPIO_LLM_URL"] = server.url
+            ...
+
+    Args:
+        respond: prompt -> answer. Defaults to the mock model.
+        delay: Seconds to wait before each answer, to simulate latency.
+    """
+
+    def __init__(self, respond: Optional[Callable[[str], str]] = None, delay: float = 0.0):
+        self.respond = respond or llm_engine._mock_response
+        self.delay = delay
+        self.prompts: List[str] = []
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "StubModelServer":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    prompt = json.loads(self.rfile.read(length))["prompt"]
+                except (ValueError, KeyError):
+                    self.send_error(400, "Expected a JSON body with a 'prompt'.")
+                    return
+                stub.prompts.append(prompt)
+                if stub.delay:
+                    time.sleep(stub.delay)
+                body = json.dumps({"text": stub.respond(prompt)}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubModelServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -6,13 +6,23 @@ to create dynamic types for ambiguous data.
 
 This file is not fully implemented and requires an API key
 and the 'google-generativeai' library.
+
+The generated parsers are run out of process, in PARSER_SANDBOX.
 """
 
 from .types import BaseSemanticType, SemanticTypeStats, register_type
-from typing import List, Any, Tuple, Type
+from .parser_cache import ParserCache, shape_fingerprint
+from .sandbox import ParserSandbox
+from . import instrumentation
+from typing import List, Any, Dict, Optional, Tuple, Type
+import copyreg
+import hashlib
+import json
 import re
 import types
 import os
+import time
+import urllib.request
 
 # --- Placeholder for the actual generative AI API ---
 # from google.generativeai import GenerativeModel
@@ -26,10 +36,50 @@ import os
 #     print("Warning: GEMINI_API_KEY not set. LLM engine is disabled.")
 #     MODEL = None
 
-def _call_llm(prompt: str) -> str:
-    """A mock function simulating a call to a generative model."""
+# A model server to send prompts to instead of the mock below: it gets
+# POST {"prompt": "..."} and answers {"text": "..."} (see
+# llm_async.StubModelServer for a local one).
+LLM_URL_ENV = "PERCIPIO_LLM_URL"
+
+# Seconds to wait for a model server response
+LLM_TIMEOUT = 60.0
+
+def _call_llm(prompt: str, op: str = "prompt") -> str:
+    """
+    Sends a prompt to the model server at $PERCIPIO_LLM_URL, or to the
+    mock model. `op` labels its latency in `percipio.instrumentation`.
+    """
+    if not instrumentation.ENABLED:
+        return _send_prompt(prompt)
+    start = time.perf_counter()
+    try:
+        response = _send_prompt(prompt)
+    except ConnectionError:
+        instrumentation.record_llm(op, time.perf_counter() - start, ok=False)
+        raise
+    instrumentation.record_llm(op, time.perf_counter() - start, ok=True)
+    return response
+
+def _send_prompt(prompt: str) -> str:
+    url = os.environ.get(LLM_URL_ENV)
+    if url:
+        return _post_prompt(url, prompt)
+
     print(f"\n[LLM Engine]: Simulating call with prompt:\n{prompt[:200]}...\n")
-    
+    return _mock_response(prompt)
+
+def _post_prompt(url: str, prompt: str, timeout: float = LLM_TIMEOUT) -> str:
+    """One prompt to a model server; raises ConnectionError on a failed request."""
+    request = urllib.request.Request(url, data=json.dumps({"prompt": prompt}).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())["text"]
+    except (OSError, ValueError, KeyError) as e:
+        raise ConnectionError(f"Model server at {url} failed: {e}") from e
+
+def _mock_response(prompt: str) -> str:
+    """A mock function simulating a generative model's answer."""
     # This is where the actual 'MODEL.generate_content(prompt)' would go.
     # For this conceptual demo, we will hard-code a response
     # for the 'PersonName' example.
@@ -57,11 +107,11 @@ def parse(item: str) -> dict | None:
         if match:
             parts = match.groupdict()
             return {
-                "title": parts.get("title", "").replace(".", "") or None,
+                "title": (parts.get("title") or "").replace(".", "") or None,
                 "first": parts.get("first") or None,
                 "middle": parts.get("middle") or None,
                 "last": parts.get("last") or None,
-                "suffix": parts.get("suffix", "").replace(".", "") or None,
+                "suffix": (parts.get("suffix") or "").replace(".", "") or None,
                 "raw": item
             }
             
@@ -72,12 +122,52 @@ def parse(item: str) -> dict | None:
     return None # Could not parse
 ```
 """
+    elif "column id" in prompt:
+        # Several columns at once (see _IDENTIFY_BATCH_PROMPT)
+        column_ids = re.findall(r"^(c\d+): ", prompt, re.MULTILINE)
+        return json.dumps({column_id: "PersonName" for column_id in column_ids})
     elif "semantic type" in prompt:
         # The model is being asked to identify the type
         return '{"semantic_type": "PersonName"}'
     
     return "" # Fallback
 
+# --- Prompts ---
+_IDENTIFY_PROMPT = (
+    "Analyze the following data samples and identify their single, "
+    "specific semantic type (e.g., 'Email', 'UKPostcode', 'PersonName').\n"
+    "Samples: {sample}\n"
+    "Respond with *only* a JSON object: {{\"semantic_type\": \"...\"}}"
+)
+
+_GENERATE_PROMPT = (
+    "Write a single Python function 'parse(item: str) -> dict | None' "
+    "that can parse data samples like the ones below. "
+    "The function should return a dictionary of the item's components, "
+    "or None if it cannot be parsed. Include the original 'raw' item in the dict.\n"
+    "Samples: {sample}\n"
+    "Respond with *only* the Python code, inside a ```python markdown block."
+)
+
+# Identifies several columns in one prompt (see llm_async); each column
+# is one "c<n>: [samples]" line.
+_IDENTIFY_BATCH_PROMPT = (
+    "Analyze each of the following data columns and identify its single, "
+    "specific semantic type (e.g., 'Email', 'UKPostcode', 'PersonName').\n"
+    "{columns}\n"
+    "Respond with *only* a JSON object mapping each column id to its type: "
+    "{{\"c0\": \"...\", ...}}"
+)
+
+# Cached parsers were written for these exact prompts; editing them
+# changes the version and retires the old entries.
+PROMPT_VERSION = hashlib.sha256(
+    (_IDENTIFY_PROMPT + _IDENTIFY_BATCH_PROMPT + _GENERATE_PROMPT).encode("utf-8")).hexdigest()[:12]
+
+# Generated parsers, kept across runs (see percipio.parser_cache).
+# Set to None to always ask the model.
+PARSER_CACHE: Optional[ParserCache] = ParserCache(version=PROMPT_VERSION)
+
 def _extract_python_code(response: str) -> str:
     """Extracts Python code from a markdown block."""
     match = re.search(r"```python\n(.*?)\n```", response, re.DOTALL)
@@ -85,106 +175,224 @@ def _extract_python_code(response: str) -> str:
         return match.group(1)
     return response # Assume raw code
 
-def infer_dynamic_type(data: List[Any]) -> Tuple[Type[BaseSemanticType] | None, SemanticTypeStats]:
-    """
-    The core of the LLM engine.
-    1. Asks the LLM to name the type.
-    2. Asks the LLM to write a parser for it.
-    3. Dynamically creates a new SemanticType class.
-    4. Registers and returns this new class.
-    """
-    # if not MODEL:
-    #     print("[LLM Engine]: Model not configured. Skipping.")
-    #     return None, SemanticTypeStats()
+# Generated parsers run here, out of process (see percipio.sandbox).
+# Set to None to run them in-process, e.g. for code you have reviewed.
+PARSER_SANDBOX: Optional[ParserSandbox] = ParserSandbox()
 
-    # --- 1. Identify the Type ---
-    # Take a sample of the data
-    sample = data[:5] + data[-5:] if len(data) > 10 else data
-    
-    prompt_identify = (
-        "Analyze the following data samples and identify their single, "
-        "specific semantic type (e.g., 'Email', 'UKPostcode', 'PersonName').\n"
-        f"Samples: {sample}\n"
-        "Respond with *only* a JSON object: {\"semantic_type\": \"...\"}"
-    )
-    
-    response_identify = _call_llm(prompt_identify) # Simulated call
-    
-    try:
-        import json
-        type_name = json.loads(response_identify).get("semantic_type", "Dynamic_Unknown")
-    except Exception:
-        type_name = "Dynamic_Unknown"
-
-    if type_name == "Dynamic_Unknown":
-        return None, SemanticTypeStats()
-
-    # --- 2. Generate the Parser ---
-    prompt_generate = (
-        "Write a single Python function 'parse(item: str) -> dict | None' "
-        "that can parse data samples like the ones below. "
-        "The function should return a dictionary of the item's components, "
-        "or None if it cannot be parsed. Include the original 'raw' item in the dict.\n"
-        f"Samples: {sample}\n"
-        "Respond with *only* the Python code, inside a ```python markdown block."
-    )
-    
-    response_generate = _call_llm(prompt_generate) # Simulated call
-    parser_code = _extract_python_code(response_generate)
-    
-    if not parser_code:
-        return None, SemanticTypeStats()
+# Parser code -> 'parse' function, for PARSER_SANDBOX = None
+_LOCAL_PARSERS: Dict[str, Any] = {}
 
-    # --- 3. Create the Dynamic Class ---
-    try:
-        # Execute the code to get the 'parse' function
+def _local_parser(parser_code: str):
+    """Executes generated code in-process and returns its 'parse' function."""
+    parse_function = _LOCAL_PARSERS.get(parser_code)
+    if parse_function is None:
         exec_scope = {}
-        exec(parser_code, globals(), exec_scope)
+        exec(parser_code, exec_scope)
         parse_function = exec_scope['parse']
-    except Exception as e:
-        print(f"[LLM Engine]: Failed to execute generated code: {e}")
-        return None, SemanticTypeStats()
-        
+        _LOCAL_PARSERS[parser_code] = parse_function
+    return parse_function
+
+def _run_parser(parser_code: str, items: List[Any], validate: bool) -> List[Any]:
+    """The generated parser over a batch of items: tokens, or truth values if `validate`."""
+    sandbox = PARSER_SANDBOX
+    if sandbox is not None:
+        return sandbox.validate(parser_code, items) if validate else sandbox.parse(parser_code, items)
+    tokens = list(map(_local_parser(parser_code), items))
+    return [token is not None for token in tokens] if validate else tokens
+
+# (type name, parser code) -> class. Lets worker processes rebuild a
+# dynamic type from its source once, rather than once per chunk.
+_DYNAMIC_TYPES: Dict[Tuple[str, str], Type[BaseSemanticType]] = {}
+
+class _DynamicTypeMeta(type):
+    """
+    The metaclass of dynamic types. They are built inside a function, so
+    pickle can't find them by name; instead the class pickles as its
+    source (see `_reduce_dynamic_type`), so type lists that include one
+    can still go to worker processes, e.g. for infer(workers=N).
+    """
+
+def _reduce_dynamic_type(cls):
+    return (_build_dynamic_type, (cls.type_name, cls.parser_code))
+
+copyreg.pickle(_DynamicTypeMeta, _reduce_dynamic_type)
+
+def _build_dynamic_type(type_name: str, parser_code: str) -> Type[BaseSemanticType]:
+    """
+    Creates a new SemanticType class from generated parser code.
+    Raises if the code fails to execute or does not define 'parse'.
+    """
+    key = (type_name, parser_code)
+    if key in _DYNAMIC_TYPES:
+        return _DYNAMIC_TYPES[key]
+
+    # Check that the code runs and defines 'parse'
+    if PARSER_SANDBOX is not None:
+        PARSER_SANDBOX.load(parser_code)
+    else:
+        _local_parser(parser_code)
+
     # Dynamically create a new class
     class_name = f"Dynamic{type_name}Type"
-    
-    # This is the new _clean_item method for our class
-    def _dynamic_clean_item(self, item: Any) -> dict | None:
-        # We are using the 'parse_function' from the exec_scope
-        return parse_function(item)
 
-    # This is the new validate_item method
+    # The generated 'parse' is the type's parse-once method: it checks
+    # and parses an item in one go, a batch of items per call
+    @classmethod
+    def _dynamic_parse_batch(cls, items: List[Any]) -> List[dict | None]:
+        return _run_parser(parser_code, items, validate=False)
+
+    # One sandbox round trip per call: the type is `batch_only`, and
+    # percipio itself only calls the batch methods
     @classmethod
-    def _dynamic_validate_item(cls, item: Any) -> bool:
+    def _dynamic_parse_item(cls, item: Any) -> dict | None:
+        return cls.parse_batch([item])[0]
+
+    @classmethod
+    def _dynamic_validate_batch(cls, items: List[Any]) -> List[bool]:
         # We assume if the generated parser works, it's valid
-        return parse_function(item) is not None
+        return _run_parser(parser_code, items, validate=True)
+
+    # The parsed dict is the cleaned value
+    def _dynamic_clean_parsed(self, token: dict, item: Any) -> dict:
+        return token
 
-    # Create the class using type()
-    DynamicType = type(
+    # The class itself can't be pickled by reference, so instances
+    # pickle as their source code (e.g. for clean(workers=N))
+    def _dynamic_reduce(self):
+        return (_rebuild_dynamic_instance, (type_name, parser_code, self.stats))
+
+    # Create the class with its metaclass, which pickles it by value
+    DynamicType = _DynamicTypeMeta(
         class_name,
         (BaseSemanticType,),
         {
             "name": f"Dynamic_{type_name}",
             "specificity": 0.95, # Dynamically generated types are very specific
-            "validate_item": _dynamic_validate_item,
-            "_clean_item": _dynamic_clean_item,
+            "batch_only": True,
+            "type_name": type_name,
+            "parser_code": parser_code,
+            "parse_item": _dynamic_parse_item,
+            "parse_batch": _dynamic_parse_batch,
+            "validate_batch": _dynamic_validate_batch,
+            "_clean_parsed": _dynamic_clean_parsed,
+            "__reduce__": _dynamic_reduce,
         }
     )
-    
-    # --- 4. Register and Return ---
-    # Register it so it can be found in the future
-    register_type(DynamicType)
-    
+    _DYNAMIC_TYPES[key] = DynamicType
+    return DynamicType
+
+def _rebuild_dynamic_instance(type_name: str, parser_code: str,
+                              stats: SemanticTypeStats) -> BaseSemanticType:
+    """Unpickles an instance of a dynamic type (see `_dynamic_reduce`)."""
+    return _build_dynamic_type(type_name, parser_code)(stats=stats)
+
+def _sample(data: List[Any]) -> List[Any]:
+    """The items shown to the model: the first and last five."""
+    return list(data[:5]) + list(data[-5:]) if len(data) > 10 else list(data)
+
+def _type_name(answer: Any) -> Optional[str]:
+    """The model's answer as a type name, or None if it is not one."""
+    if not isinstance(answer, str) or not answer or answer == "Dynamic_Unknown":
+        return None
+    return answer
+
+def _parse_type_name(response: str) -> Optional[str]:
+    """The type name from an identification response, or None."""
+    try:
+        return _type_name(json.loads(response).get("semantic_type"))
+    except Exception:
+        return None
+
+def _cached_type(fingerprint: str) -> Optional[Type[BaseSemanticType]]:
+    """The dynamic type cached under `fingerprint`, if any (see PARSER_CACHE)."""
+    cache = PARSER_CACHE
+    cached = cache.get(fingerprint) if cache is not None else None
+    if cached is None:
+        return None
+    try:
+        DynamicType = _build_dynamic_type(*cached)
+    except Exception as e:
+        print(f"[LLM Engine]: Discarding cached parser that failed to execute: {e}")
+        cache.discard(fingerprint)
+        return None
+    print(f"[LLM Engine]: Reusing cached parser for '{cached[0]}'")
+    return DynamicType
+
+def _new_type(type_name: str, parser_code: str,
+              fingerprints: List[str]) -> Optional[Type[BaseSemanticType]]:
+    """Builds a freshly generated type and caches its parser under each fingerprint."""
+    try:
+        DynamicType = _build_dynamic_type(type_name, parser_code)
+    except Exception as e:
+        print(f"[LLM Engine]: Failed to execute generated code: {e}")
+        return None
+    cache = PARSER_CACHE
+    if cache is not None:
+        try:
+            for fingerprint in fingerprints:
+                cache.put(fingerprint, type_name, parser_code)
+        except OSError as e:
+            print(f"[LLM Engine]: Could not cache the generated parser: {e}")
+    return DynamicType
+
+def _register_dynamic(DynamicType: Type[BaseSemanticType], data: List[Any]) -> SemanticTypeStats:
+    """Registers a dynamic type and scores `data` with it."""
+    # Register it so it can be found in the future. The same source
+    # always builds the same class, so a repeat is a no-op; a new parser
+    # for a known type name replaces the old one.
+    register_type(DynamicType, replace=True)
+
     # Finally, calculate the stats for this new type
     total_count = len(data)
-    valid_count = sum(1 for item in data if DynamicType.validate_item(item))
+    valid_count = sum(DynamicType.validate_batch(data))
     stats = SemanticTypeStats(
         total_count=total_count,
         valid_count=valid_count,
         invalid_count=total_count - valid_count,
         confidence=(valid_count / total_count if total_count > 0 else 0)
     )
-    
-    print(f"[LLM Engine]: Successfully created and registered '{class_name}'")
-    
-    return DynamicType, stats
+
+    print(f"[LLM Engine]: Successfully created and registered '{DynamicType.__name__}'")
+    return stats
+
+def infer_dynamic_type(data: List[Any]) -> Tuple[Type[BaseSemanticType] | None, SemanticTypeStats]:
+    """
+    The core of the LLM engine.
+    1. Looks for a parser generated earlier for data of the same shape
+       (see PARSER_CACHE); otherwise
+    2. Asks the LLM to name the type, and
+    3. Asks the LLM to write a parser for it.
+    4. Dynamically creates a new SemanticType class.
+    5. Registers and returns this new class.
+
+    For many columns at once, see `llm_async.AsyncLLMEngine`.
+    """
+    # if not MODEL:
+    #     print("[LLM Engine]: Model not configured. Skipping.")
+    #     return None, SemanticTypeStats()
+
+    # Take a sample of the data
+    sample = _sample(data)
+
+    # --- 1. Check the Cache ---
+    fingerprint = shape_fingerprint(sample, salt=PROMPT_VERSION)
+    DynamicType = _cached_type(fingerprint)
+
+    if DynamicType is None:
+        # --- 2. Identify the Type ---
+        type_name = _parse_type_name(_call_llm(_IDENTIFY_PROMPT.format(sample=sample), "identify"))
+        if type_name is None:
+            return None, SemanticTypeStats()
+
+        # --- 3. Generate the Parser ---
+        parser_code = _extract_python_code(_call_llm(_GENERATE_PROMPT.format(sample=sample), "generate"))
+        if not parser_code:
+            return None, SemanticTypeStats()
+
+        # --- 4. Create the Dynamic Class ---
+        DynamicType = _new_type(type_name, parser_code, [fingerprint])
+        if DynamicType is None:
+            return None, SemanticTypeStats()
+
+    # --- 5. Register and Return ---
+    return DynamicType, _register_dynamic(DynamicType, data)
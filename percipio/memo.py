@@ -0,0 +1,229 @@
+"""
+A bounded, process-wide memo of per-value results.
+
+The same values turn up across columns, files and calls: the same email
+domains, amounts and IDs. With the memo on, a type's verdict on a value
+and its cleaned result are computed once, then looked up by every later
+`infer`, `clean` and streaming `Inferrer` that meets the value again:
+
+    from percipio.memo import VALUE_MEMO
+    VALUE_MEMO.enable(max_entries=500_000)
+    ...
+    VALUE_MEMO.info()   # hits, misses and hit rates, overall and per type
+
+It is off by default (or set PERCIPIO_VALUE_MEMO=<max entries>). A
+lookup costs about as much as a simple regex match, so it pays for types
+with expensive validation or cleaning (checksums, lookups, generated
+parsers) on columns whose values recur.
+
+Entries are keyed by (type name, kind, value type, value), so equal
+values of different types (1, 1.0 and True) are kept apart. A type's
+entries are dropped when it is re-registered, or when a different class
+of the same name uses the memo.
+
+Clean results are filed under the class, but `_clean_item` is an
+instance method. So only handlers with no state besides their `stats`
+use the memo for cleaning; a handler with any other instance attribute
+(e.g. configuration set in `__init__`) always cleans for itself.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+# --- Kinds of results ---
+VALIDATE = "validate"  # The truth value of validate_batch
+CLEAN = "clean"        # The result of _clean_item
+
+_MISSING = object()
+
+
+class ValueMemo:
+    """
+    A thread-safe LRU memo of per-value results of types.
+
+    Args:
+        max_entries: The most results to keep, over all types.
+        enabled: Whether `infer` and `clean` use it.
+    """
+
+    def __init__(self, max_entries: int = 1_000_000, enabled: bool = False):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        # Type name -> the class its entries came from, and how many there are
+        self._owners: Dict[str, Any] = {}
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        # --- Counters ---
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # (type name, kind) -> [hits, misses]
+        self._lookups: Dict[tuple, List[int]] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        state = "on" if self.enabled else "off"
+        return (f"ValueMemo({state}, entries={len(self._entries)}, hits={self.hits}, "
+                f"misses={self.misses}, evictions={self.evictions})")
+
+    def enable(self, max_entries: Optional[int] = None):
+        """Turns the memo on, optionally with a new size (evicting down to it)."""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+                self._evict()
+            self.enabled = True
+
+    def disable(self):
+        """Turns the memo off and drops its entries. The counters are kept."""
+        self.enabled = False
+        self.clear()
+
+    # --- Lookups ---
+
+    def apply(self, owner: Any, kind: str, func: Callable[[List[Any]], List[Any]], values: List[Any],
+              fresh: Optional[Callable[[Any], Any]] = None) -> List[Any]:
+        """
+        `func(values)` through the memo: results for values seen before
+        are looked up, and `func` is called once, on a list of the rest,
+        whose results are stored. Unhashable values are never stored.
+
+        Args:
+            owner: The type class. Entries are filed under its name.
+            kind: VALIDATE or CLEAN.
+            func: Computes one result per value, in order.
+            values: The values.
+            fresh: Applied to every result that is stored or read back
+                   (e.g. copying mutable ones), so callers never share
+                   an object with the memo.
+        """
+        name = owner.name
+        results = [None] * len(values)
+        missed: List[int] = []
+        with self._lock:
+            if self._owners.get(name) is not owner:
+                self._drop(name)
+                self._owners[name] = owner
+            entries = self._entries
+            for i, value in enumerate(values):
+                try:
+                    key = (name, kind, type(value), value)
+                    result = entries.get(key, _MISSING)
+                except TypeError:
+                    # Unhashable
+                    result = _MISSING
+                if result is _MISSING:
+                    missed.append(i)
+                    continue
+                entries.move_to_end(key)
+                results[i] = result if fresh is None else fresh(result)
+            self._count(name, kind, len(values) - len(missed), len(missed))
+        if not missed:
+            return results
+
+        computed = func([values[i] for i in missed])
+        with self._lock:
+            # Skip storing if the type was re-registered in the meantime
+            store = self._owners.get(name) is owner
+            entries, added = self._entries, 0
+            for i, result in zip(missed, computed):
+                results[i] = result
+                if not store:
+                    continue
+                value = values[i]
+                try:
+                    key = (name, kind, type(value), value)
+                    if key not in entries:
+                        added += 1
+                    entries[key] = result if fresh is None else fresh(result)
+                except TypeError:
+                    pass
+            if added:
+                self._sizes[name] = self._sizes.get(name, 0) + added
+                self._evict()
+        return results
+
+    def _count(self, name: str, kind: str, hits: int, misses: int):
+        # Caller holds the lock
+        self.hits += hits
+        self.misses += misses
+        counts = self._lookups.get((name, kind))
+        if counts is None:
+            counts = self._lookups[(name, kind)] = [0, 0]
+        counts[0] += hits
+        counts[1] += misses
+
+    def _evict(self):
+        # Caller holds the lock
+        while len(self._entries) > max(self.max_entries, 0):
+            (name, *_), _ = self._entries.popitem(last=False)
+            self._sizes[name] -= 1
+            self.evictions += 1
+
+    # --- Invalidation ---
+
+    def invalidate(self, name: str):
+        """Drops the entries of one type (called when it is re-registered)."""
+        with self._lock:
+            self._drop(name)
+
+    def _drop(self, name: str):
+        # Caller holds the lock
+        self._owners.pop(name, None)
+        if not self._sizes.pop(name, 0):
+            return
+        for key in [key for key in self._entries if key[0] == name]:
+            del self._entries[key]
+        self.invalidations += 1
+
+    def clear(self):
+        """Drops every entry. The counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._owners.clear()
+            self._sizes.clear()
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Counters and usage, for tuning `max_entries`. 'by_type' maps each
+        type name to {kind: {'hits', 'misses', 'hit_rate'}}.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            by_type: Dict[str, Dict[str, Dict[str, Any]]] = {}
+            for (name, kind), (hits, misses) in self._lookups.items():
+                by_type.setdefault(name, {})[kind] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                }
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "by_type": by_type,
+            }
+
+
+# --- Globals ---
+# Shared by every inference and cleaning call in the process.
+VALUE_MEMO = ValueMemo()
+
+_configured = os.environ.get("PERCIPIO_VALUE_MEMO", "")
+if _configured:
+    try:
+        VALUE_MEMO.enable(int(_configured))
+    except ValueError:
+        print(f"percipio: Ignored PERCIPIO_VALUE_MEMO={_configured!r}; expected a number of entries.")
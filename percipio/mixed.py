@@ -0,0 +1,242 @@
+"""
+Per-row type assignment for mixed columns.
+
+`infer` answers "which single type fits this column best?". A column
+that is half emails and half currency amounts gets Email at 50%
+confidence, and which rows held the amounts is lost. `infer_mixed`
+keeps, for every candidate type, a bitmap of the rows it accepted (see
+percipio.bitmap) and works from those:
+
+    result = percipio.infer_mixed(column)
+    result.candidates               # every type, best score first
+    result.best.invalid_rows()      # rows the `infer` winner rejects
+    result.shares()                 # {'Email': 0.5, 'Currency': 0.5}
+    cleaned = result.clean(column)  # each row cleaned by the type it matched
+
+Every candidate is scored to the end of the column, since a type that
+can't win the column may still be the best match for some rows. Each
+holds about one bit per row while it is a candidate.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Type
+
+from . import instrumentation
+from .bitmap import BitmapBuilder, expand, full, positions
+from .budget import QUARANTINE
+from .core import _BranchAndBound, _no_type_message, _record
+from .encoding import dictionary_encode, should_encode
+from .types import BaseSemanticType, SemanticTypeStats, get_registered_types
+
+
+class TypeMatch:
+    """
+    One candidate type of a column and the rows it accepted.
+
+    Attributes:
+        type_class: The type.
+        stats: Its stats on the whole column.
+        bitmap: An int with bit `i` set if row `i` is valid.
+        length: Rows in the column.
+    """
+
+    def __init__(self, type_class: Type[BaseSemanticType], stats: SemanticTypeStats, bitmap: int, length: int):
+        self.type_class = type_class
+        self.stats = stats
+        self.bitmap = bitmap
+        self.length = length
+
+    def __repr__(self):
+        return f"<TypeMatch: {self.name}, {self.stats.valid_count}/{self.length} rows, score={self.score:.3f}>"
+
+    @property
+    def name(self) -> str:
+        return self.type_class.name
+
+    @property
+    def score(self) -> float:
+        """Confidence times specificity, as `infer` ranks types."""
+        return self.stats.confidence * self.type_class.specificity
+
+    def is_valid(self, row: int) -> bool:
+        return bool(self.bitmap >> row & 1)
+
+    def valid_rows(self) -> List[int]:
+        return positions(self.bitmap)
+
+    def invalid_rows(self) -> List[int]:
+        return positions(full(self.length) & ~self.bitmap)
+
+
+class MixedColumn:
+    """
+    The candidate types of a column, and which type each row belongs to.
+
+    A row is assigned to the most specific type that accepted it (so
+    Email rows go to Email rather than String); equally specific types
+    go by score.
+
+    Attributes:
+        candidates: A TypeMatch per candidate type, highest score first.
+                    The first is the type `infer` returns.
+        assigned: Type name -> bitmap of the rows assigned to it, for the
+                  types that were assigned any, most specific first.
+        unmatched: Bitmap of the rows no type accepted.
+        length: Rows in the column.
+        dropped: Type name -> why it is not a candidate (raised, ran out
+                 of time or quarantined).
+    """
+
+    def __init__(self, candidates: List[TypeMatch], length: int, dropped: Optional[Dict[str, str]] = None):
+        self.candidates = candidates
+        self.length = length
+        self.dropped = dropped or {}
+        self.matches = {match.name: match for match in candidates}
+        self.assigned: Dict[str, int] = {}
+        taken = 0
+        # sorted() is stable, so equally specific types stay in score order
+        for match in sorted(candidates, key=lambda m: -m.type_class.specificity):
+            rows = match.bitmap & ~taken
+            if rows:
+                self.assigned[match.name] = rows
+                taken |= rows
+        self.unmatched = full(length) & ~taken
+
+    def __repr__(self):
+        shares = ", ".join(f"{name} {share:.1%}" for name, share in self.shares().items())
+        return (f"<MixedColumn: {self.length} rows, {shares or 'no types'}, "
+                f"{self.unmatched.bit_count()} unmatched>")
+
+    @property
+    def best(self) -> Optional[TypeMatch]:
+        """The best-scoring candidate (what `infer` returns)."""
+        return self.candidates[0] if self.candidates else None
+
+    @property
+    def is_mixed(self) -> bool:
+        """True if rows were assigned to more than one type."""
+        return len(self.assigned) > 1
+
+    def schema(self) -> BaseSemanticType:
+        """An instance of the best type, as `infer` returns it."""
+        return self.best.type_class(stats=self.best.stats)
+
+    def shares(self) -> Dict[str, float]:
+        """Type name -> fraction of the rows assigned to it."""
+        return {name: rows.bit_count() / self.length for name, rows in self.assigned.items()}
+
+    def rows_of(self, name: str) -> List[int]:
+        """The rows assigned to a type."""
+        return positions(self.assigned.get(name, 0))
+
+    def unmatched_rows(self) -> List[int]:
+        return positions(self.unmatched)
+
+    def type_of(self, row: int) -> Optional[str]:
+        """The name of the type a row was assigned to (None if no type accepted it)."""
+        for name, rows in self.assigned.items():
+            if rows >> row & 1:
+                return name
+        return None
+
+    def clean(self, data: List[Any], deduplicate: Optional[bool] = None) -> List[Optional[Any]]:
+        """
+        Cleans every row with the type it was assigned to (None for
+        unmatched rows). Each type cleans only its own rows.
+
+        Args:
+            data: The column this result was inferred from.
+            deduplicate: As for `BaseSemanticType.clean`.
+        """
+        if len(data) != self.length:
+            raise ValueError(f"Expected the {self.length} rows this column was inferred from, got {len(data)}.")
+        cleaned: List[Optional[Any]] = [None] * self.length
+        for name, bitmap in self.assigned.items():
+            match = self.matches[name]
+            rows = positions(bitmap)
+            handler = match.type_class(stats=match.stats)
+            for row, value in zip(rows, handler.clean([data[row] for row in rows], deduplicate=deduplicate)):
+                cleaned[row] = value
+        return cleaned
+
+
+class _MaskingSearch(_BranchAndBound):
+    """
+    A _BranchAndBound that keeps every type's validity bitmap and never
+    prunes. A type's bitmap is dropped as soon as its validation fails.
+    """
+
+    def __init__(self, registered_types: List[Type[BaseSemanticType]], total_count: int,
+                 type_budget: Optional[float] = None):
+        super().__init__(registered_types, total_count, type_budget)
+        self.bitmaps: Dict[Type[BaseSemanticType], BitmapBuilder] = {
+            TypeClass: BitmapBuilder() for TypeClass in self.viable
+        }
+
+    def _validate_viable(self, block, weights=None):
+        counts, results = self._validate_lattice(block, weights, per_item=self.viable)
+        for TypeClass in self.viable:
+            if counts[TypeClass] is None:
+                del self.bitmaps[TypeClass]
+            else:
+                self.bitmaps[TypeClass].add(self.position, results[TypeClass])
+        self._add_counts(counts)
+
+    def _prune(self):
+        # Every type is scored to the end
+        pass
+
+
+def infer_mixed(data: List[Any], deduplicate: Optional[bool] = None,
+                type_budget: Optional[float] = None) -> MixedColumn:
+    """
+    Infers which type every row of a column matches.
+
+    Args:
+        data: A list of data points (e.g., a CSV column).
+        deduplicate: As for `infer`: validate each distinct value once.
+                The bitmaps are over rows either way.
+        type_budget: As for `infer`.
+
+    Returns:
+        A MixedColumn: every candidate type ranked as `infer` ranks
+        them, with the rows each accepted, and each row's type.
+    """
+    if not len(data):
+        raise ValueError("Cannot infer type from empty data list.")
+    if type_budget is not None and type_budget <= 0:
+        raise ValueError("type_budget must be positive.")
+
+    registered_types = get_registered_types()
+    if not registered_types:
+        raise ImportError("No semantic types are registered. Did percipio.built_in_types fail to import?")
+
+    items, weights = data, None
+    if deduplicate or deduplicate is None and should_encode(data):
+        items, weights = dictionary_encode(data) or (data, None)
+
+    start = time.perf_counter() if instrumentation.ENABLED else None
+    admitted, quarantined = QUARANTINE.admit(registered_types)
+    search = _MaskingSearch(admitted, len(data), type_budget)
+    best_type_class = search.run(items, weights)
+    QUARANTINE.record(search.budgets)
+    _record(start, best_type_class, items, weights, search, quarantined)
+    if best_type_class is None:
+        raise TypeError(_no_type_message(search, quarantined))
+
+    codes = None
+    if weights is not None:
+        # Row -> its distinct value, to map the bitmaps back to rows
+        index = {key: i for i, key in enumerate(zip(map(type, items), items))}
+        codes = list(map(index.__getitem__, zip(map(type, data), data)))
+        if len(items) <= 256:
+            codes = bytes(codes)
+
+    candidates = []
+    for TypeClass in search.viable:
+        bitmap = search.bitmaps.pop(TypeClass).bitmap()
+        if codes is not None:
+            bitmap = expand(bitmap, codes, len(items))
+        candidates.append(TypeMatch(TypeClass, search.stats_for(TypeClass), bitmap, len(data)))
+    candidates.sort(key=lambda match: (-match.score, search.order[match.type_class]))
+    return MixedColumn(candidates, len(data), {**quarantined, **search.dropped()})
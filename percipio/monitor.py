@@ -0,0 +1,341 @@
+"""
+Schema drift monitoring over record streams.
+
+A `SchemaMonitor` keeps the valid counts of every type over the last
+`window` rows of a stream (a sliding window) or over consecutive
+blocks of `window` rows (tumbling windows), and calls back when the
+winning type changes or its confidence crosses a threshold:
+
+    monitor = percipio.SchemaMonitor(window=10_000, thresholds=(0.99, 0.95),
+                                     callbacks=[alert])
+    for record in consumer:
+        monitor.add(record["email"])
+
+Each type's verdicts on the rows in the window are kept in a ring
+buffer of one byte per row, so a row entering the window adds its
+verdicts and the row it displaces subtracts its own: O(types) per row,
+however long the stream runs.
+
+Types that are `batch_only` (generated parsers) are never validated a
+row at a time: `add` then buffers rows and validates them together.
+
+As in `infer`, a type whose validation raises is out of the running: it
+can't win while any row it raised on is in the window.
+"""
+
+from typing import Any, Callable, Iterable, List, Optional, Type
+
+from . import instrumentation
+from .types import BaseSemanticType, SemanticTypeStats, TypeDescriptor, get_registered_types
+
+WINDOW_MODES = ('sliding', 'tumbling')
+
+# Rows `add` buffers by default when a tracked type is `batch_only`
+_BATCH_ONLY_BUFFER = 1024
+
+# --- Verdicts ---
+_INVALID, _VALID, _RAISED = 0, 1, 2
+
+# --- Event Kinds ---
+TYPE_CHANGED = "type_changed"                  # Another type now wins the window
+CONFIDENCE_DROPPED = "confidence_dropped"      # The winner fell below a threshold
+CONFIDENCE_RECOVERED = "confidence_recovered"  # The winner rose back to a threshold
+
+
+class DriftEvent:
+    """
+    A change in a monitored column, passed to the monitor's callbacks.
+
+    Attributes:
+        kind: TYPE_CHANGED, CONFIDENCE_DROPPED or CONFIDENCE_RECOVERED.
+        type_name: The type winning the window now.
+        previous_type: The type that won the previous check.
+        confidence: The winner's confidence over the window.
+        threshold: The threshold crossed (None for TYPE_CHANGED).
+        stats: The winner's stats over the window.
+        position: Rows the monitor had seen when it happened.
+    """
+
+    def __init__(self, kind: str, type_name: str, previous_type: str, confidence: float,
+                 threshold: Optional[float], stats: SemanticTypeStats, position: int):
+        self.kind = kind
+        self.type_name = type_name
+        self.previous_type = previous_type
+        self.confidence = confidence
+        self.threshold = threshold
+        self.stats = stats
+        self.position = position
+
+    def __repr__(self):
+        if self.kind == TYPE_CHANGED:
+            change = f"{self.previous_type} -> {self.type_name}"
+        else:
+            change = f"{self.type_name} crossed {self.threshold:.2%}"
+        return f"<DriftEvent: {self.kind} at row {self.position}, {change} ({self.confidence:.2%})>"
+
+
+class SchemaMonitor:
+    """
+    Tracks the semantic type of a stream over a fixed-size window.
+
+    The window is checked after every `add` and after every chunk of an
+    `update`: a sliding window once it holds `min_rows` rows, a tumbling
+    window each time it fills up (it starts over with the next row). The
+    winner is picked as `infer` picks it, by confidence times
+    specificity, among the types that didn't raise on any of the
+    window's rows.
+
+    Args:
+        window: Rows in the window.
+        mode: 'sliding' (the last `window` rows) or 'tumbling'
+              (consecutive, non-overlapping blocks of `window` rows).
+        thresholds: Confidences of the winner that trigger an event when
+              crossed in either direction, e.g. (0.99, 0.95).
+        callbacks: Called with each DriftEvent. A failing callback is
+              reported and never interrupts the stream.
+        types: The types to track. Defaults to every registered type at
+              the time the monitor is created.
+        min_rows: Rows a sliding window needs before it is checked.
+              Defaults to the full window.
+        buffer: Rows `add` collects before validating them as one
+              `update` (and checking the window once). Defaults to 1,
+              or to 1024 if a tracked type is `batch_only`. Buffered
+              rows are also flushed by `update`, `flush`, `stats` and
+              `result`.
+    """
+
+    def __init__(self, window: int = 10_000, mode: str = 'sliding', thresholds: Iterable[float] = (),
+                 callbacks: Optional[List[Callable[[DriftEvent], None]]] = None,
+                 types: Optional[List[Type[BaseSemanticType]]] = None, min_rows: Optional[int] = None,
+                 buffer: Optional[int] = None):
+        if window < 1:
+            raise ValueError("window must be at least 1.")
+        if mode not in WINDOW_MODES:
+            raise ValueError(f"Unknown window mode '{mode}'. Use one of {WINDOW_MODES}.")
+        self.thresholds = sorted(set(thresholds), reverse=True)
+        if any(not 0 < threshold <= 1 for threshold in self.thresholds):
+            raise ValueError("Thresholds must be between 0 and 1.")
+        self.min_rows = window if min_rows is None else min_rows
+        if not 1 <= self.min_rows <= window:
+            raise ValueError("min_rows must be between 1 and the window size.")
+
+        types = list(types) if types is not None else get_registered_types()
+        # Virtual types are never inferred, so they are not tracked. Every
+        # row reaches every type, so lazy types are imported up front.
+        self.types = [loaded for loaded in map(_load, types) if loaded is not None and not loaded.virtual]
+        if not self.types:
+            raise ImportError("No semantic types are registered. Did percipio.built_in_types fail to import?")
+        self.window = window
+        self.mode = mode
+        self.callbacks = list(callbacks or [])
+        if buffer is None:
+            buffer = _BATCH_ONLY_BUFFER if any(TypeClass.batch_only for TypeClass in self.types) else 1
+        if buffer < 1:
+            raise ValueError("buffer must be at least 1.")
+        self.buffer = buffer
+        self.pending: List[Any] = []  # Rows added but not validated yet
+
+        # Per type: its verdict (_INVALID, _VALID or _RAISED) on the row in each window slot
+        self.rings = [bytearray(window) for _ in self.types]
+        self.valid_counts = [0] * len(self.types)
+        self.raised_counts = [0] * len(self.types)
+        self.filled = 0    # Rows in the window
+        self.head = 0      # Slot of the next row (the oldest row once the window is full)
+        self.seen = 0      # Rows added in total
+        self.completed = False  # A tumbling window filled up and starts over with the next row
+        # The outcome of the last check
+        self.winner: Optional[Type[BaseSemanticType]] = None
+        self.confidence: Optional[float] = None
+
+    def __repr__(self):
+        winner = f"{self.winner.name} at {self.confidence:.2%}" if self.winner else "no winner yet"
+        return f"<SchemaMonitor: {self.mode} window of {self.window}, {self.filled} rows in it, {winner}>"
+
+    def add_callback(self, callback: Callable[[DriftEvent], None]):
+        self.callbacks.append(callback)
+
+    # --- Feeding ---
+
+    def add(self, item: Any) -> "SchemaMonitor":
+        """Adds one record, in O(types) (or buffers it; see `buffer`)."""
+        if self.buffer > 1:
+            self.pending.append(item)
+            if len(self.pending) >= self.buffer:
+                self.flush()
+            return self
+        self._start_row()
+        head = self.head
+        for i, TypeClass in enumerate(self.types):
+            try:
+                verdict = _VALID if TypeClass.validate_item(item) else _INVALID
+            except Exception:
+                # Validation function might fail on weird data
+                verdict = _RAISED
+            ring = self.rings[i]
+            # The slot holds the row leaving the window (0 while it isn't full)
+            leaving = ring[head]
+            self.valid_counts[i] += (verdict == _VALID) - (leaving == _VALID)
+            self.raised_counts[i] += (verdict == _RAISED) - (leaving == _RAISED)
+            ring[head] = verdict
+        self._advance(1)
+        self._check()
+        return self
+
+    def update(self, items: Iterable[Any]) -> "SchemaMonitor":
+        """
+        Adds a micro-batch of records, validating each type on the whole
+        batch at once. The window is checked after each chunk of at
+        most `window` rows (or at every tumbling window's end).
+        """
+        self.flush()
+        items = items if isinstance(items, list) else list(items)
+        position = 0
+        while position < len(items):
+            self._start_row()
+            room = self.window - self.filled if self.mode == 'tumbling' else self.window
+            chunk = items[position:position + room]
+            for i, TypeClass in enumerate(self.types):
+                self._write(i, _verdicts(TypeClass, chunk))
+            self._advance(len(chunk))
+            position += len(chunk)
+            self._check()
+        return self
+
+    def flush(self) -> "SchemaMonitor":
+        """Validates the rows `add` buffered."""
+        if self.pending:
+            items, self.pending = self.pending, []
+            self.update(items)
+        return self
+
+    def _start_row(self):
+        if self.completed:
+            # The previous tumbling window was checked; start a new one
+            self.valid_counts = [0] * len(self.types)
+            self.raised_counts = [0] * len(self.types)
+            for ring in self.rings:
+                ring[:] = bytes(self.window)
+            self.filled = self.head = 0
+            self.completed = False
+
+    def _write(self, i: int, verdicts: bytes):
+        """Puts a type's verdicts on consecutive rows into its ring, replacing the oldest rows."""
+        ring, head = self.rings[i], self.head
+        first = min(len(verdicts), self.window - head)
+        leaving = [ring[head:head + first]]
+        ring[head:head + first] = verdicts[:first]
+        if first < len(verdicts):
+            rest = len(verdicts) - first
+            leaving.append(ring[:rest])
+            ring[:rest] = verdicts[first:]
+        self.valid_counts[i] += verdicts.count(_VALID) - sum(rows.count(_VALID) for rows in leaving)
+        self.raised_counts[i] += verdicts.count(_RAISED) - sum(rows.count(_RAISED) for rows in leaving)
+
+    def _advance(self, rows: int):
+        self.head = (self.head + rows) % self.window
+        self.filled = min(self.window, self.filled + rows)
+        self.seen += rows
+
+    # --- Checking ---
+
+    def _check(self):
+        if self.mode == 'tumbling':
+            if self.filled < self.window:
+                return
+            self.completed = True
+        elif self.filled < self.min_rows:
+            return
+
+        best = self._best()
+        if best is None:
+            # Every type raised on a row in the window: no winner to compare
+            return
+        winner, confidence = self.types[best], self.valid_counts[best] / self.filled
+        previous, previous_confidence = self.winner, self.confidence
+        self.winner, self.confidence = winner, confidence
+        if previous is None:
+            # The first check sets the baseline
+            return
+
+        if winner is not previous:
+            self._fire(TYPE_CHANGED, previous, None)
+            return
+        for threshold in self.thresholds:
+            if (confidence >= threshold) != (previous_confidence >= threshold):
+                self._fire(CONFIDENCE_DROPPED if confidence < threshold else CONFIDENCE_RECOVERED,
+                           previous, threshold)
+
+    def _fire(self, kind: str, previous: Type[BaseSemanticType], threshold: Optional[float]):
+        event = DriftEvent(kind, self.winner.name, previous.name, self.confidence, threshold,
+                           self._stats(self.types.index(self.winner)), self.seen)
+        if instrumentation.ENABLED:
+            instrumentation.record_drift(kind, event.type_name)
+        for callback in list(self.callbacks):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"percipio: Drift callback {callback!r} failed: {e}")
+
+    def _best(self) -> Optional[int]:
+        """The index of the best-scoring type over the window, or None if all of them raised."""
+        best, best_score = None, -1.0
+        for i, TypeClass in enumerate(self.types):
+            if self.raised_counts[i]:
+                continue
+            # Strictly greater, so ties go to the earlier type, as in `infer`
+            score = (self.valid_counts[i] / self.filled) * TypeClass.specificity
+            if score > best_score:
+                best, best_score = i, score
+        return best
+
+    # --- Results ---
+
+    def _stats(self, i: int) -> SemanticTypeStats:
+        valid_count = self.valid_counts[i]
+        return SemanticTypeStats(
+            total_count=self.filled,
+            valid_count=valid_count,
+            invalid_count=self.filled - valid_count,
+            confidence=valid_count / self.filled if self.filled else 0.0
+        )
+
+    def stats(self) -> dict:
+        """Type name -> its SemanticTypeStats over the current window."""
+        self.flush()
+        return {TypeClass.name: self._stats(i) for i, TypeClass in enumerate(self.types)}
+
+    def result(self) -> BaseSemanticType:
+        """
+        An instance of the best-matching type over the current window
+        (for a tumbling window that just filled up, that window), like
+        `infer` on the window's rows returns.
+        """
+        self.flush()
+        if not self.filled:
+            raise ValueError("Cannot infer type from empty data list.")
+        best = self._best()
+        if best is None:
+            raise TypeError("Could not infer any semantic type for the data (every tracked type raised on the window's rows).")
+        return self.types[best](stats=self._stats(best))
+
+
+def _load(TypeClass) -> Optional[Type[BaseSemanticType]]:
+    if not isinstance(TypeClass, TypeDescriptor):
+        return TypeClass
+    try:
+        return TypeClass.load()
+    except Exception as e:
+        print(f"percipio: Skipped type '{TypeClass.name}' ({TypeClass.target}): {e}")
+        return None
+
+
+def _verdicts(TypeClass, items: List[Any]) -> bytes:
+    """
+    One verdict byte per item: _VALID or _INVALID, or _RAISED for every
+    item if the type's validation of the batch raised (as `infer` drops a
+    type whose validation of a block raises).
+    """
+    try:
+        return bytes(map(bool, TypeClass.validate_batch(items)))
+    except Exception:
+        return bytes([_RAISED]) * len(items)
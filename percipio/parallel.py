@@ -0,0 +1,147 @@
+"""
+Worker pools shared by percipio's parallel code paths.
+
+Starting worker processes is expensive, so pools are created on first
+use and kept alive (one per worker count) for later calls. Work is sent
+to them as pickled chunks; type classes travel by reference, so any type
+defined at module level (including in `__main__`) is available in the
+workers even if it was registered after the pool started.
+
+On free-threaded Python builds, threads run Python code in parallel and
+need no pickling, so thread pools are used instead where possible.
+
+concurrent.futures and multiprocessing are imported on first use: they
+are most of what `import percipio` would otherwise cost.
+"""
+
+import atexit
+import os
+import pickle
+import sys
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+_EXECUTORS: Dict[int, "ProcessPoolExecutor"] = {}
+_THREAD_EXECUTORS: Dict[int, "ThreadPoolExecutor"] = {}
+_LOCK = threading.Lock()
+
+# Item types that always pickle
+_PLAIN_TYPES = frozenset((str, int, float, bool, bytes, type(None)))
+
+
+def free_threaded() -> bool:
+    """True on a free-threaded (no-GIL) Python build with the GIL disabled."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def resolve_workers(workers: int) -> int:
+    """Maps workers=-1 (or 0) to the number of CPUs."""
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def get_executor(workers: int) -> "ProcessPoolExecutor":
+    """Returns the shared process pool with this many workers."""
+    with _LOCK:
+        executor = _EXECUTORS.get(workers)
+        if executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=workers,
+                                           mp_context=multiprocessing.get_context())
+            _EXECUTORS[workers] = executor
+        return executor
+
+
+def get_thread_executor(workers: int) -> "ThreadPoolExecutor":
+    """Returns the shared thread pool with this many workers."""
+    with _LOCK:
+        executor = _THREAD_EXECUTORS.get(workers)
+        if executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="percipio")
+            _THREAD_EXECUTORS[workers] = executor
+        return executor
+
+
+def get_best_executor(workers: int, payload: Any) -> "Executor":
+    """
+    A thread pool on free-threaded builds, else a process pool, unless
+    `payload` (what every task will carry) cannot be pickled, in which
+    case threads are the only option.
+    """
+    if free_threaded() or not is_picklable(payload):
+        return get_thread_executor(workers)
+    return get_executor(workers)
+
+
+@atexit.register
+def shutdown():
+    """Stops every shared pool. They are recreated on next use."""
+    with _LOCK:
+        for executor in _EXECUTORS.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        for executor in _THREAD_EXECUTORS.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        _EXECUTORS.clear()
+        _THREAD_EXECUTORS.clear()
+
+
+def pool_errors() -> Tuple[type, ...]:
+    """
+    The errors that mean work could not be sent to (or run in) a process
+    pool, so the caller should run it locally instead. Use as
+    `except pool_errors():`, which only imports the pool machinery once
+    an error is actually being handled. Errors raised by the work itself
+    are not among them; check what is sent with `is_picklable` first.
+    """
+    from concurrent.futures.process import BrokenProcessPool
+    return (BrokenProcessPool, pickle.PicklingError)
+
+
+def is_picklable(obj: Any) -> bool:
+    """
+    True if `obj` can be sent to a worker process. Classes created inside
+    functions (e.g. some dynamically generated types) cannot.
+    """
+    try:
+        pickle.dumps(obj)
+    except Exception:
+        return False
+    return True
+
+
+def is_sendable(args: Any) -> bool:
+    """
+    A cheap `is_picklable` for a task's arguments. Lists that only hold
+    plain values (most columns) are not pickled at all, and arrays and
+    Series are probed by their dtype and first item, so a later item can
+    still fail to pickle: callers must be ready to run the task
+    themselves if its future raises.
+    """
+    return all(map(_sendable, args))
+
+
+def _sendable(arg: Any) -> bool:
+    if _plain_list(arg):
+        return True
+    dtype = getattr(arg, "dtype", None)
+    if dtype is not None and hasattr(arg, "__len__"):
+        # Typed arrays always pickle; object ones hold anything
+        return dtype != object or is_picklable(next(iter(arg), None))
+    return is_picklable(arg)
+
+
+def _plain_list(obj: Any) -> bool:
+    return type(obj) is list and set(map(type, obj)) <= _PLAIN_TYPES
+
+
+def split(length: int, parts: int) -> List[Tuple[int, int]]:
+    """Splits range(length) into at most `parts` contiguous (start, stop) shards."""
+    parts = max(1, min(parts, length))
+    return [(i * length // parts, (i + 1) * length // parts) for i in range(parts)]
@@ -0,0 +1,231 @@
+"""
+A persistent on-disk cache of LLM-generated parsers.
+
+`llm_engine.infer_dynamic_type` asks a model to name a column's type and
+to write a parser for it. Both answers depend only on the sample values
+the model is shown, so they are stored here under a fingerprint of the
+samples' *shape* (see `shape_fingerprint`). A later run over similar data
+rebuilds the dynamic type from the cached source with no model call.
+
+Each entry is a small JSON file in the cache directory:
+
+    $PERCIPIO_CACHE_DIR (default: $XDG_CACHE_HOME/percipio or ~/.cache/percipio)
+        parsers/<fingerprint>.json
+
+Entries written by an older cache format or prompt version are ignored
+and removed. The directory is bounded in entries and bytes; the least
+recently used entries are evicted first.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Bump when the entry layout changes
+CACHE_FORMAT_VERSION = 1
+
+# --- Shape Fingerprints ---
+
+def _char_shape(char: str) -> str:
+    if char.isupper():
+        return "A"
+    if char.isalpha():
+        return "a"
+    if char.isdigit():
+        return "9"
+    if char.isspace():
+        return " "
+    return char
+
+
+def value_shape(value: Any) -> str:
+    """
+    The shape of a value: its type, and for strings, the character
+    classes with repeats collapsed ("Dr. Jane Smith" -> "str:Aa. Aa Aa").
+    """
+    if not isinstance(value, str):
+        return type(value).__name__
+    shape = []
+    for char in value:
+        char_shape = _char_shape(char)
+        if not shape or shape[-1] != char_shape:
+            shape.append(char_shape)
+    return "str:" + "".join(shape)
+
+
+def shape_fingerprint(samples: List[Any], salt: str = "") -> str:
+    """
+    A fingerprint of the distinct shapes among `samples` (order and
+    repetition don't matter). `salt` separates e.g. prompt versions.
+    """
+    shapes = sorted(set(map(value_shape, samples)))
+    digest = hashlib.sha256(json.dumps([salt, shapes]).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+# --- Cache ---
+
+def default_cache_dir() -> str:
+    root = os.environ.get("PERCIPIO_CACHE_DIR")
+    if not root:
+        root = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "percipio")
+    return os.path.join(root, "parsers")
+
+
+class ParserCache:
+    """
+    Generated (type name, parser source) pairs on disk, by fingerprint.
+
+    Args:
+        directory: Where to keep the entries. Defaults to
+                   `default_cache_dir()` at the time of each call.
+        max_entries: The most entries to keep.
+        max_bytes: The most disk space the entries may use.
+        version: The prompt version. Entries stored under another
+                 version are treated as misses and removed.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_entries: int = 512,
+                 max_bytes: int = 8 * 1024 * 1024, version: str = "1"):
+        self._directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version = version
+        self._lock = threading.Lock()
+
+        # --- Counters ---
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def directory(self) -> str:
+        return self._directory or default_cache_dir()
+
+    def __repr__(self):
+        return (f"ParserCache(directory={self.directory!r}, hits={self.hits}, "
+                f"misses={self.misses}, evictions={self.evictions})")
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, f"{fingerprint}.json")
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(last used, size, path) of every entry, oldest first."""
+        entries = []
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.name.endswith(".json"):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            pass
+        return sorted(entries)
+
+    def get(self, fingerprint: str) -> Optional[Tuple[str, str]]:
+        """Returns the cached (type name, parser source), or None."""
+        path = self._path(fingerprint)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if (entry.get("format") != CACHE_FORMAT_VERSION or entry.get("version") != self.version
+                or not entry.get("type_name") or not entry.get("parser_code")):
+            # Stale or damaged
+            self.discard(fingerprint)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            os.utime(path)  # Marks it recently used
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return entry["type_name"], entry["parser_code"]
+
+    def put(self, fingerprint: str, type_name: str, parser_code: str):
+        """Stores an entry, then evicts the least recently used ones over budget."""
+        entry = {
+            "format": CACHE_FORMAT_VERSION,
+            "version": self.version,
+            "fingerprint": fingerprint,
+            "type_name": type_name,
+            "parser_code": parser_code,
+            "created": time.time(),
+        }
+        data = json.dumps(entry, indent=1).encode("utf-8")
+        if len(data) > self.max_bytes or self.max_entries <= 0:
+            return
+        directory = self.directory
+        os.makedirs(directory, exist_ok=True)
+        # Write then rename, so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(fingerprint))
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._evict()
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            _, size, path = entries.pop(0)
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def discard(self, fingerprint: str):
+        """Removes one entry, e.g. a parser that turned out to be broken."""
+        try:
+            os.unlink(self._path(fingerprint))
+        except OSError:
+            pass
+
+    def clear(self):
+        """Removes every entry. The counters are kept."""
+        for _, _, path in self._entries():
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def info(self) -> Dict[str, Any]:
+        """Counters and usage, like `InferenceCache.info`."""
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "directory": self.directory,
+            }
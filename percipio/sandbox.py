@@ -0,0 +1,303 @@
+"""
+A pool of pre-forked worker processes for running model-written parsers.
+
+The parsers `llm_engine` generates are untrusted code: a regex with
+catastrophic backtracking or a runaway allocation would hang or kill the
+process that runs it. `ParserSandbox` runs them in separate processes
+instead, started once and reused:
+
+- Rows are sent a batch at a time, so the IPC cost is spread over
+  thousands of rows, and batches go to all the workers at once.
+- Each batch has a time budget. A worker that overruns it is killed and
+  replaced, and the parser is disabled.
+- Each worker has a memory limit (RLIMIT_AS, on POSIX). A parser that
+  runs out of memory, or kills its worker, is disabled too.
+
+A disabled parser accepts nothing from then on, so its type drops out of
+inference instead of stalling it.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Any, Dict, List, Optional
+
+# --- Defaults ---
+# Seconds a worker may spend on one batch
+DEFAULT_TIME_BUDGET = 2.0
+# Bytes a worker may allocate beyond what it started with
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
+# Rows per batch sent to a worker
+DEFAULT_BATCH_SIZE = 4096
+
+# Operations a worker understands
+_LOAD = "load"          # Check that the code defines 'parse'
+_PARSE = "parse"        # parse() every item
+_VALIDATE = "validate"  # Whether parse() accepts every item
+
+
+class SandboxError(RuntimeError):
+    """Generated parser code that cannot be loaded."""
+
+
+def parser_key(parser_code: str) -> str:
+    """Identifies a parser by its source."""
+    return hashlib.sha256(parser_code.encode("utf-8")).hexdigest()[:16]
+
+
+# --- Worker ---
+
+def _limit_memory(memory_limit: Optional[int]):
+    try:
+        import resource
+    except ImportError:
+        return  # Not on POSIX: time budgets only
+    if not memory_limit:
+        return
+    try:
+        with open("/proc/self/statm") as f:
+            baseline = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        baseline = 0
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    soft = baseline + memory_limit
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+def _parse_all(parse, items) -> List[Any]:
+    try:
+        return list(map(parse, items))
+    except MemoryError:
+        raise
+    except Exception:
+        pass
+    # A row the parser chokes on is simply not parsed
+    results = []
+    for item in items:
+        try:
+            results.append(parse(item))
+        except MemoryError:
+            raise
+        except Exception:
+            results.append(None)
+    return results
+
+
+def _worker(conn, memory_limit: Optional[int]):
+    """[Worker] Runs parsers on the batches it is sent until the pipe closes."""
+    _limit_memory(memory_limit)
+    parsers = {}
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        op, key, parser_code, items = message
+        try:
+            parse = parsers.get(key)
+            if parse is None:
+                scope = {"__name__": "percipio_generated"}
+                exec(parser_code, scope)
+                parse = scope.get("parse")
+                if not callable(parse):
+                    raise SandboxError("the code does not define a 'parse' function")
+                parsers[key] = parse
+            if op == _LOAD:
+                reply = ("ok", None)
+            elif op == _VALIDATE:
+                reply = ("ok", bytes(token is not None for token in _parse_all(parse, items)))
+            else:
+                reply = ("ok", _parse_all(parse, items))
+            conn.send(reply)
+        except MemoryError:
+            parsers.clear()
+            conn.send(("memory", "exceeded its memory limit"))
+        except BaseException as e:
+            conn.send(("error", f"failed with {type(e).__name__}: {e}"))
+
+
+# --- Pool ---
+
+class _Worker:
+    def __init__(self, context, memory_limit: Optional[int]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker, args=(child_conn, memory_limit),
+                                       name="percipio-sandbox", daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        self.conn.close()  # The worker exits on EOF
+        self.process.join(1)
+        if self.process.is_alive():
+            self.kill()
+
+
+class ParserSandbox:
+    """
+    Runs generated parsers in a reusable pool of worker processes.
+
+    Args:
+        processes: Worker processes. Defaults to one per CPU, up to 4.
+        time_budget: Seconds a parser may spend on one batch.
+        memory_limit: Bytes a worker may allocate (None for no limit).
+        batch_size: Rows per batch.
+
+    Attributes:
+        disabled: Parser key (see `parser_key`) -> why it was disabled.
+    """
+
+    def __init__(self, processes: Optional[int] = None, time_budget: float = DEFAULT_TIME_BUDGET,
+                 memory_limit: Optional[int] = DEFAULT_MEMORY_LIMIT, batch_size: int = DEFAULT_BATCH_SIZE):
+        if time_budget <= 0 or batch_size < 1:
+            raise ValueError("time_budget and batch_size must be positive.")
+        self.processes = processes or min(4, os.cpu_count() or 1)
+        self.time_budget = time_budget
+        self.memory_limit = memory_limit
+        self.batch_size = batch_size
+        self.disabled: Dict[str, str] = {}
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        self._workers: List[_Worker] = []
+        self._pid = None
+        # The pipes carry one conversation at a time
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        return (f"ParserSandbox(processes={self.processes}, time_budget={self.time_budget}, "
+                f"memory_limit={self.memory_limit}, disabled={len(self.disabled)})")
+
+    # --- Lifecycle ---
+
+    def start(self) -> "ParserSandbox":
+        """Forks the workers now rather than on first use."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Never started, or inherited across a fork: the pipes
+                # belong to the parent, so start our own workers
+                self._workers = []
+                self._pid = os.getpid()
+            while len(self._workers) < self.processes:
+                self._workers.append(_Worker(self._context, self.memory_limit))
+        return self
+
+    def close(self):
+        """Stops the workers. They are started again on next use."""
+        with self._lock:
+            if self._pid == os.getpid():
+                for worker in self._workers:
+                    worker.stop()
+            self._workers = []
+            self._pid = None
+
+    def __enter__(self) -> "ParserSandbox":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        """Kills a worker and starts another in its place, which it returns."""
+        worker.kill()
+        self._workers.remove(worker)
+        replacement = _Worker(self._context, self.memory_limit)
+        self._workers.append(replacement)
+        return replacement
+
+    def _disable(self, key: str, reason: str):
+        if key not in self.disabled:
+            self.disabled[key] = reason
+            print(f"[Sandbox]: Disabled generated parser {key}: {reason}.")
+
+    # --- Running Parsers ---
+
+    def load(self, parser_code: str):
+        """
+        Checks that `parser_code` runs and defines 'parse', in a worker.
+        Raises SandboxError if it doesn't.
+        """
+        key = parser_key(parser_code)
+        with self._lock:
+            self._run(_LOAD, key, parser_code, [[]])
+            if key in self.disabled:
+                raise SandboxError(f"The generated parser {self.disabled[key]}.")
+
+    def parse(self, parser_code: str, items: List[Any]) -> List[Optional[Any]]:
+        """parse() on every item: the parsed value, or None where it fails."""
+        results = self.run(_PARSE, parser_code, items)
+        return results if results is not None else [None] * len(items)
+
+    def validate(self, parser_code: str, items: List[Any]) -> List[bool]:
+        """Whether parse() accepts every item."""
+        results = self.run(_VALIDATE, parser_code, items)
+        return results if results is not None else [False] * len(items)
+
+    def run(self, op: str, parser_code: str, items: List[Any]) -> Optional[List[Any]]:
+        """Runs `op` over `items` in batches; None if the parser is (or gets) disabled."""
+        key = parser_key(parser_code)
+        if key in self.disabled:
+            return None
+        size = self.batch_size
+        batches = [items[start:start + size] for start in range(0, len(items), size)]
+        with self._lock:
+            results = self._run(op, key, parser_code, batches)
+        if results is None:
+            return None
+        if op == _VALIDATE:
+            return [bool(valid) for batch in results for valid in batch]
+        return [token for batch in results for token in batch]
+
+    def _run(self, op: str, key: str, parser_code: str, batches: List[Any]) -> Optional[List[Any]]:
+        self.start()
+        results = [None] * len(batches)
+        pending = deque(enumerate(batches))
+        idle = list(self._workers)
+        in_flight = {}  # Pipe -> (worker, batch index, deadline)
+        try:
+            while (pending or in_flight) and key not in self.disabled:
+                while pending and idle:
+                    worker = idle.pop()
+                    index, batch = pending.popleft()
+                    worker.conn.send((op, key, parser_code, batch))
+                    in_flight[worker.conn] = (worker, index, time.monotonic() + self.time_budget)
+
+                timeout = max(0.0, min(deadline for _, _, deadline in in_flight.values()) - time.monotonic())
+                ready = wait(list(in_flight), timeout)
+                for conn in ready:
+                    worker, index, _ = in_flight.pop(conn)
+                    try:
+                        status, payload = conn.recv()
+                    except (EOFError, OSError):
+                        # Killed, e.g. by the OS for its memory use
+                        idle.append(self._replace(worker))
+                        self._disable(key, "crashed its worker process")
+                        continue
+                    idle.append(worker)
+                    if status == "ok":
+                        results[index] = payload
+                    else:
+                        self._disable(key, payload)
+
+                now = time.monotonic()
+                for conn, (worker, _, deadline) in list(in_flight.items()):
+                    if deadline <= now:
+                        del in_flight[conn]
+                        idle.append(self._replace(worker))
+                        self._disable(key, f"exceeded its time budget of {self.time_budget}s per batch")
+        finally:
+            # Batches still running belong to a disabled parser (or were
+            # interrupted): their workers can't be trusted to finish soon
+            for worker, _, _ in in_flight.values():
+                self._replace(worker)
+        return None if key in self.disabled else results
@@ -0,0 +1,203 @@
+"""
+Cheap per-item feature signatures.
+
+A signature is computed once per item and shared by every type during
+inference. Types declare a `SignatureFilter` (their `prefilter` class
+attribute) describing what their valid items look like, e.g. "must
+contain '@'" or "only digits, commas, dots and currency symbols". Items
+that fail a type's filter are counted as invalid without ever reaching
+its `validate_item` (and so its regex).
+
+A filter may admit items that the type then rejects, but it must never
+reject an item that `validate_item` would accept.
+"""
+
+from typing import Any, List, NamedTuple, Optional
+
+# --- Character Classes ---
+# Bits of `Signature.mask`. A character belongs to exactly one class,
+# checked in this order.
+CURRENCY = 1 << 0  # One of CURRENCY_SYMBOLS
+AT = 1 << 1        # '@'
+DOT = 1 << 2       # '.'
+COMMA = 1 << 3     # ','
+SPACE = 1 << 4     # Any str.isspace() character
+DIGIT = 1 << 5     # Any str.isdigit() character
+ALPHA = 1 << 6     # Any str.isalpha() character
+OTHER = 1 << 7     # Everything else (punctuation, symbols, ...)
+ANY = (1 << 8) - 1
+
+CURRENCY_SYMBOLS = "$£€¥"
+
+
+def char_class(char: str) -> int:
+    """Returns the class bit of a single character."""
+    if char in CURRENCY_SYMBOLS:
+        return CURRENCY
+    if char == "@":
+        return AT
+    if char == ".":
+        return DOT
+    if char == ",":
+        return COMMA
+    if char.isspace():
+        return SPACE
+    if char.isdigit():
+        return DIGIT
+    if char.isalpha():
+        return ALPHA
+    return OTHER
+
+
+# Translating an ASCII string's bytes through this table replaces every
+# character with its class bit, in C and in one call.
+_ASCII_TABLE = bytes(char_class(chr(i)) for i in range(128)) + bytes(128)
+
+
+class Signature(NamedTuple):
+    """The features of one (stripped) string item."""
+    length: int  # Length after strip()
+    mask: int    # OR of the class bits of every character
+    first: int   # Class bit of the first character (0 if empty)
+    last: int    # Class bit of the last character (0 if empty)
+
+
+_EMPTY = Signature(0, 0, 0, 0)
+# NamedTuple's own constructor is several times slower than this
+_new_signature = tuple.__new__
+
+
+def signature_of(item: Any) -> Optional[Signature]:
+    """
+    Computes the signature of an item. Non-string items have no
+    signature (None).
+    """
+    if not isinstance(item, str):
+        return None
+    text = item.strip()
+    if not text:
+        return _EMPTY
+    if not text.isascii():
+        mask = 0
+        for char in set(text):
+            mask |= char_class(char)
+        return _new_signature(Signature, (len(text), mask, char_class(text[0]), char_class(text[-1])))
+
+    # Fast path: one membership test (memchr) per class
+    bits = text.encode("ascii").translate(_ASCII_TABLE)
+    mask = ((CURRENCY if CURRENCY in bits else 0) | (AT if AT in bits else 0)
+            | (DOT if DOT in bits else 0) | (COMMA if COMMA in bits else 0)
+            | (SPACE if SPACE in bits else 0) | (DIGIT if DIGIT in bits else 0)
+            | (ALPHA if ALPHA in bits else 0) | (OTHER if OTHER in bits else 0))
+    return _new_signature(Signature, (len(text), mask, bits[0], bits[-1]))
+
+
+def signatures_of(items: List[Any]) -> List[Optional[Signature]]:
+    """Computes the signatures of a block of items."""
+    return [signature_of(item) for item in items]
+
+
+# --- Constraints ---
+
+class SignatureFilter:
+    """
+    Constraints a type places on the signature of its valid items.
+
+    Args:
+        required: Class bits that must all be present (e.g. AT | DOT).
+        allowed: Class bits that may be present. Any other class rejects
+                 the item. Defaults to every class.
+        min_length: Minimum stripped length.
+        max_length: Maximum stripped length (None for no limit).
+        first: Class bits the first character may have (None for any).
+        last: Class bits the last character may have (None for any).
+        strings_only: Reject non-string items. Set to False for types
+                 that also accept e.g. plain ints; those items are then
+                 always passed on to `validate_item`.
+    """
+
+    def __init__(self, required: int = 0, allowed: int = ANY, min_length: int = 0,
+                 max_length: Optional[int] = None, first: Optional[int] = None,
+                 last: Optional[int] = None, strings_only: bool = True):
+        self.required = required
+        self.allowed = allowed
+        self.min_length = min_length
+        self.max_length = max_length
+        self.first = ANY if first is None else first
+        self.last = ANY if last is None else last
+        self.strings_only = strings_only
+
+    def __repr__(self):
+        return (f"SignatureFilter(required={self.required:#x}, allowed={self.allowed:#x}, "
+                f"length={self.min_length}..{self.max_length}, strings_only={self.strings_only})")
+
+    def _key(self) -> tuple:
+        return (self.required, self.allowed, self.min_length, self.max_length, self.first, self.last,
+                self.strings_only)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SignatureFilter):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def admits(self, signature: Optional[Signature]) -> bool:
+        """True if an item with this signature may be valid."""
+        if signature is None:
+            return not self.strings_only
+        length, mask, first, last = signature
+        return (mask & self.required == self.required
+                and not mask & ~self.allowed
+                and self.min_length <= length
+                and (self.max_length is None or length <= self.max_length)
+                and bool(first & self.first or not length)
+                and bool(last & self.last or not length))
+
+    def select(self, items: List[Any], signatures: List[Optional[Signature]]) -> List[Any]:
+        """Returns the items of a block that pass the filter, in order."""
+        required, forbidden = self.required, ANY & ~self.allowed
+        min_length = self.min_length
+        max_length = self.max_length if self.max_length is not None else float("inf")
+        first_ok, last_ok = self.first, self.last
+        admit_other = not self.strings_only
+        # An empty string has no first/last character to constrain
+        return [
+            item for item, sig in zip(items, signatures)
+            if (admit_other if sig is None else
+                sig[1] & required == required and not sig[1] & forbidden
+                and min_length <= sig[0] <= max_length
+                and (sig[2] & first_ok or not sig[0]) and (sig[3] & last_ok or not sig[0]))
+        ]
+
+
+# --- Built-in Type Prefilters ---
+# Shared by the built-in classes (percipio.built_in_types) and their lazy
+# registrations (percipio.types), so the registry can reject items
+# before the classes are imported.
+
+# Plain ints and floats have no signature and are always checked
+NUMERIC_PREFILTER = SignatureFilter(required=DIGIT, allowed=DIGIT | DOT | ALPHA | OTHER, min_length=1,
+                                    strings_only=False)
+
+# Plain ints have no signature and are always checked
+INTEGER_PREFILTER = SignatureFilter(allowed=DIGIT, min_length=1, strings_only=False)
+
+# Shortest match is "a@b.c"; '_', '+' and '-' fall in the OTHER class
+EMAIL_PREFILTER = SignatureFilter(
+    required=AT | DOT,
+    allowed=ALPHA | DIGIT | AT | DOT | OTHER,
+    min_length=5,
+    first=ALPHA | DIGIT | DOT | OTHER,
+    last=ALPHA | DIGIT | DOT | OTHER,
+)
+
+# Only digits, commas, dots, symbols and spaces; it must start with a
+# symbol or the amount and end with a symbol or a digit/comma.
+CURRENCY_PREFILTER = SignatureFilter(
+    allowed=DIGIT | COMMA | DOT | CURRENCY | SPACE,
+    min_length=1,
+    first=CURRENCY | DIGIT | COMMA,
+    last=CURRENCY | DIGIT | COMMA,
+)
@@ -0,0 +1,153 @@
+"""
+Streaming inference over columns that never fit in memory at once.
+
+An `Inferrer` keeps one running valid count per type, so memory stays
+constant however long the column is. Chunks can come from generators,
+file readers or database cursors, and two inferrers over different
+parts of a column can be merged.
+
+    inferrer = percipio.Inferrer()
+    for chunk in read_column_in_chunks():
+        inferrer.update(chunk)
+    schema = inferrer.result()
+"""
+
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Type
+
+from .core import _block_signatures, _validate_types
+from .encoding import dictionary_encode, should_encode
+from .lattice import TypeLattice
+from .types import BaseSemanticType, SemanticTypeStats, get_registered_types
+
+
+class Inferrer:
+    """
+    Incrementally infers the semantic type of a column.
+
+    The result is the same winner and SemanticTypeStats that `infer`
+    returns on the materialised list. Since the column's length is not
+    known up front, every type is counted to the end (there is no early
+    pruning).
+
+    Args:
+        types: The types to score. Defaults to every registered type at
+               the time the Inferrer is created.
+    """
+
+    def __init__(self, types: Optional[List[Type[BaseSemanticType]]] = None):
+        self.types = list(types) if types is not None else get_registered_types()
+        if not self.types:
+            raise ImportError("No semantic types are registered. Did percipio.built_in_types fail to import?")
+        self.lattice = TypeLattice(self.types)
+        self.valid_counts: Dict[Type[BaseSemanticType], int] = dict.fromkeys(self.types, 0)
+        self.failed = set()
+        self.total_count = 0
+
+    def __repr__(self):
+        return f"<Inferrer: {self.total_count} items, {len(self.types) - len(self.failed)} candidate types>"
+
+    def update(self, chunk: Iterable[Any]) -> "Inferrer":
+        """Adds a chunk of items to the running counts."""
+        chunk = chunk if isinstance(chunk, list) else list(chunk)
+        if not chunk:
+            return self
+
+        items, weights = chunk, None
+        if should_encode(chunk):
+            items, weights = dictionary_encode(chunk) or (chunk, None)
+        self._count(items, weights)
+        self.total_count += len(chunk)
+        return self
+
+    def update_counts(self, values: List[Any], counts: List[int]) -> "Inferrer":
+        """
+        Adds pre-counted items: each of `values` occurs as many times as
+        the matching entry of `counts` (see `infer_counts`).
+        """
+        if len(values) != len(counts):
+            raise ValueError("values and counts must have the same length.")
+        pairs = [(value, count) for value, count in zip(values, counts) if count > 0]
+        if pairs:
+            self._count([value for value, _ in pairs], [count for _, count in pairs])
+            self.total_count += sum(count for _, count in pairs)
+        return self
+
+    def _count(self, items: List[Any], weights: Optional[List[int]]):
+        viable = [TypeClass for TypeClass in self.types if not TypeClass.virtual and TypeClass not in self.failed]
+        types = viable + self.lattice.filters(viable, self.failed)
+        signatures = _block_signatures(types, items)
+        counts, _ = _validate_types(self.lattice, types, items, signatures, weights, self._run)
+        for TypeClass in viable:
+            if counts[TypeClass] is not None:
+                self.valid_counts[TypeClass] += counts[TypeClass]
+
+    def _run(self, TypeClass, func, *args, rows: int = 0):
+        try:
+            return func(*args)
+        except Exception:
+            # Validation function might fail on weird data
+            self.failed.add(TypeClass)
+            return None
+
+    def merge(self, other: "Inferrer") -> "Inferrer":
+        """
+        Adds another Inferrer's counts into this one, e.g. one that
+        scored a different part of the same column.
+        """
+        if other.types != self.types:
+            raise ValueError("Cannot merge Inferrers that score different types.")
+        for TypeClass, valid_count in other.valid_counts.items():
+            self.valid_counts[TypeClass] += valid_count
+        self.failed |= other.failed
+        self.total_count += other.total_count
+        return self
+
+    def result(self) -> BaseSemanticType:
+        """
+        Returns an instance of the best-matching type for everything seen
+        so far, like `infer` does.
+        """
+        if not self.total_count:
+            raise ValueError("Cannot infer type from empty data list.")
+
+        best_type_class = None
+        best_score = -1.0
+        for TypeClass in self.types:
+            if TypeClass.virtual or TypeClass in self.failed:
+                continue
+            score = (self.valid_counts[TypeClass] / self.total_count) * TypeClass.specificity
+            if score > best_score:
+                best_score = score
+                best_type_class = TypeClass
+
+        if best_type_class is None:
+            raise TypeError("Could not infer any semantic type for the data.")
+
+        valid_count = self.valid_counts[best_type_class]
+        return best_type_class(stats=SemanticTypeStats(
+            total_count=self.total_count,
+            valid_count=valid_count,
+            invalid_count=self.total_count - valid_count,
+            confidence=valid_count / self.total_count
+        ))
+
+
+def infer_iter(iterable: Iterable[Any], chunk_size: int = 65536) -> BaseSemanticType:
+    """
+    Infers the semantic type of any iterable (e.g. a generator) without
+    materialising it, reading `chunk_size` items at a time.
+
+    Returns:
+        The same result as `infer(list(iterable))`.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    inferrer = Inferrer()
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        inferrer.update(chunk)
+    return inferrer.result()
@@ -1,45 +1,401 @@
+import importlib
+import os
 import re
-from typing import List, Any, Dict, Optional, Type, Callable, Set
+from collections.abc import Mapping
+from typing import List, Any, Dict, Iterator, Optional, Type, Callable, Set
+from .signature import (CURRENCY_PREFILTER, EMAIL_PREFILTER, INTEGER_PREFILTER, NUMERIC_PREFILTER,
+                        SignatureFilter)
+from .encoding import _fresh, iter_distinct, map_distinct, should_encode
+from .columnar import ColumnarResult, build_columns, FIELD_KINDS
+from .parallel import get_best_executor, resolve_workers
+from .memo import VALUE_MEMO, CLEAN
+from . import instrumentation
+from itertools import repeat
+import math
+import time
 
 # --- Globals ---
-# This registry holds all 'discoverable' semantic types
-TYPE_REGISTRY: Dict[str, Type["BaseSemanticType"]] = {}
+# This registry holds all 'discoverable' semantic types, as a
+# TypeDescriptor per type name. Classes are imported on first use.
+TYPE_DESCRIPTORS: Dict[str, "TypeDescriptor"] = {}
 
+# Bumped on every change to TYPE_DESCRIPTORS, so anything derived from the
+# registry (e.g. cached inference results) can tell when it is stale.
+_REGISTRY_VERSION = 0
 
-def register_type(cls: Type["BaseSemanticType"]) -> Type["BaseSemanticType"]:
+# Installed packages can add types under this entry point group (see
+# `load_plugins`). Set PERCIPIO_DISABLE_PLUGINS=1 to ignore them.
+ENTRY_POINT_GROUP = "percipio.types"
+_PLUGINS_LOADED = False
+
+
+class TypeDescriptor:
+    """
+    What the registry knows about a type without importing it: its name,
+    specificity and, optionally, a prefilter. That is all inference needs
+    to rank a type and skip the items it can't accept, so the class (and
+    its regexes) is only imported from `target` once an item reaches its
+    validation. A type whose prefilter rejects a whole column is never
+    imported at all.
+
+    During inference a descriptor stands in for its class: attribute
+    access and calls are forwarded to the class, importing it first.
+
+    Args:
+        name: The type's name; must match the class's.
+        target: Where the class is defined, as 'package.module:ClassName'.
+        specificity: Must match the class's.
+        prefilter: A SignatureFilter that accepts every item the type
+                   could accept (it may accept more). Defaults to none;
+                   if given, it must equal the class's.
+        parent: Must match the class's (see `BaseSemanticType.parent`).
+        virtual: Must match the class's.
+    """
+    __slots__ = ("name", "target", "specificity", "prefilter", "parent", "virtual", "cls")
+
+    def __init__(self, name: str, target: str, specificity: float,
+                 prefilter: Optional[SignatureFilter] = None, parent: Optional[str] = None,
+                 virtual: bool = False):
+        if not name:
+            raise ValueError("A TypeDescriptor needs a name.")
+        if ":" not in target:
+            raise ValueError(f"Type '{name}' has target '{target}', expected 'package.module:ClassName'.")
+        if prefilter is not None and not isinstance(prefilter, SignatureFilter):
+            raise TypeError(f"Type '{name}' has a 'prefilter' that is not a SignatureFilter.")
+        self.name = name
+        self.target = target
+        self.specificity = specificity
+        self.prefilter = prefilter
+        self.parent = parent
+        self.virtual = virtual
+        self.cls: Optional[Type["BaseSemanticType"]] = None
+
+    @classmethod
+    def of(cls, type_class: Type["BaseSemanticType"]) -> "TypeDescriptor":
+        """A descriptor for a class that is already imported."""
+        descriptor = cls(type_class.name, _target_of(type_class), type_class.specificity,
+                         type_class.prefilter, type_class.parent, type_class.virtual)
+        descriptor.cls = type_class
+        return descriptor
+
+    def load(self) -> Type["BaseSemanticType"]:
+        """Imports the class (once) and checks it against the descriptor."""
+        if self.cls is None:
+            module_name, _, qualname = self.target.partition(":")
+            # Importing the module may register the class, which binds it
+            found = importlib.import_module(module_name)
+            for attr in qualname.split("."):
+                found = getattr(found, attr)
+            if self.cls is None:
+                self._bind(found)
+        return self.cls
+
+    def _bind(self, type_class: Type["BaseSemanticType"]):
+        if not (isinstance(type_class, type) and issubclass(type_class, BaseSemanticType)):
+            raise TypeError(f"'{self.target}' is not a BaseSemanticType subclass.")
+        registered = (self.name, self.specificity, self.parent, self.virtual)
+        found = (type_class.name, type_class.specificity, type_class.parent, type_class.virtual)
+        if found != registered:
+            raise TypeError(f"Type '{self.name}' was registered for '{self.target}' as "
+                            f"(name, specificity, parent, virtual) = {registered}, but the class has {found}.")
+        if self.prefilter is not None and self.prefilter != type_class.prefilter:
+            # Items the descriptor rejected would count as invalid for a class that accepts them
+            raise TypeError(f"Type '{self.name}' was registered for '{self.target}' with prefilter "
+                            f"{self.prefilter!r}, but the class has {type_class.prefilter!r}.")
+        _check_type(type_class)
+        self.prefilter = type_class.prefilter
+        self.cls = type_class
+
+    def __getattr__(self, attr: str) -> Any:
+        # Only called for what the descriptor itself doesn't have
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+    def __call__(self, *args, **kwargs) -> "BaseSemanticType":
+        return self.load()(*args, **kwargs)
+
+    def __reduce__(self):
+        # Sent to worker processes by reference; they import it themselves
+        return (TypeDescriptor, (self.name, self.target, self.specificity, self.prefilter,
+                                 self.parent, self.virtual))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TypeDescriptor):
+            return NotImplemented
+        return (self.name, self.target) == (other.name, other.target)
+
+    def __hash__(self) -> int:
+        return hash((self.name, self.target))
+
+    def __repr__(self):
+        state = "loaded" if self.cls is not None else "not loaded"
+        return f"<TypeDescriptor: {self.name} -> {self.target} ({state})>"
+
+
+def _target_of(type_class: type) -> str:
+    return f"{type_class.__module__}:{type_class.__qualname__}"
+
+
+def _check_type(cls: Type["BaseSemanticType"]):
+    name = cls.name
+    if cls.prefilter is not None and not isinstance(cls.prefilter, SignatureFilter):
+        raise TypeError(f"Type '{name}' has a 'prefilter' that is not a SignatureFilter.")
+    for field, kind in (cls.output_fields or {}).items():
+        if kind not in FIELD_KINDS:
+            raise ValueError(f"Type '{name}' declares field '{field}' with unknown kind '{kind}'.")
+
+
+def _register(descriptor: TypeDescriptor, replace: bool):
+    global _REGISTRY_VERSION
+    name = descriptor.name
+    if name in TYPE_DESCRIPTORS and not replace:
+        raise ValueError(f"Type '{name}' is already registered. Pass replace=True to replace it.")
+    ancestor, seen = descriptor.parent, {name}
+    while ancestor is not None and ancestor in TYPE_DESCRIPTORS:
+        if ancestor in seen:
+            raise ValueError(f"Type '{name}' would make '{ancestor}' its own ancestor.")
+        seen.add(ancestor)
+        ancestor = TYPE_DESCRIPTORS[ancestor].parent
+    TYPE_DESCRIPTORS[name] = descriptor
+    _REGISTRY_VERSION += 1
+    # Results memoized for a type this name replaces are stale
+    VALUE_MEMO.invalidate(name)
+
+
+def register_type(cls: Optional[Type["BaseSemanticType"]] = None, *,
+                  replace: bool = False) -> Any:
     """
     A class decorator to register a new semantic type
     with the 'percipio' inference engine.
-    
+
     Usage:
         @register_type
         class MyCustomType(BaseSemanticType):
             ...
+
+        @register_type(replace=True)
+        class MyCustomType(BaseSemanticType):  # Redefined, e.g. in a notebook
+            ...
+
+    Registering the same class again is a no-op. Registering a different
+    class under a name that is taken raises ValueError, unless `replace`
+    is set. To register a type without importing it, see
+    `register_lazy_type`.
     """
+    if cls is None:
+        return lambda cls: register_type(cls, replace=replace)
+
     name = cls.name
     if not name:
         raise ValueError("SemanticType class must have a 'name' attribute.")
-    if name in TYPE_REGISTRY:
-        raise ValueError(f"Type '{name}' is already registered.")
-    
-    TYPE_REGISTRY[name] = cls
+    existing = TYPE_DESCRIPTORS.get(name)
+    if existing is not None and existing.cls is cls:
+        return cls
+    if existing is not None and existing.cls is None and existing.target == _target_of(cls):
+        # The class a lazy registration points to, being imported
+        existing._bind(cls)
+        return cls
+    _check_type(cls)
+    _register(TypeDescriptor.of(cls), replace)
     return cls
 
+def register_lazy_type(name: str, target: str, specificity: float,
+                       prefilter: Optional[SignatureFilter] = None, *, parent: Optional[str] = None,
+                       virtual: bool = False, replace: bool = False) -> TypeDescriptor:
+    """
+    Registers a type without importing it; see `TypeDescriptor`.
+
+    Usage:
+        register_lazy_type("EmployeeID", "mycompany.types:EmployeeIDType", 0.9,
+                           prefilter=SignatureFilter(allowed=ALPHA | DIGIT | OTHER))
+
+    Registering the same name and target again is a no-op.
+    """
+    descriptor = TypeDescriptor(name, target, specificity, prefilter, parent, virtual)
+    if TYPE_DESCRIPTORS.get(name) == descriptor:
+        return TYPE_DESCRIPTORS[name]
+    _register(descriptor, replace)
+    return descriptor
+
+def load_plugins():
+    """
+    Registers the types of installed packages, once. Called by the first
+    inference, so installed packs cost nothing at import.
+
+    A package adds types with an entry point in the 'percipio.types'
+    group that refers to a BaseSemanticType subclass, a TypeDescriptor,
+    a list of either, or a function returning one of those:
+
+        [project.entry-points."percipio.types"]
+        mycompany = "mycompany.percipio_types:DESCRIPTORS"
+
+    A plugin that fails to load, or clashes with a registered name, is
+    skipped with a message.
+    """
+    global _PLUGINS_LOADED
+    if _PLUGINS_LOADED:
+        return
+    _PLUGINS_LOADED = True
+    if os.environ.get("PERCIPIO_DISABLE_PLUGINS", "").lower() in ("1", "true", "yes", "on"):
+        return
+    from importlib.metadata import entry_points
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            found = entry_point.load()
+            if callable(found) and not isinstance(found, (type, TypeDescriptor)):
+                found = found()
+            if isinstance(found, (type, TypeDescriptor)):
+                found = [found]
+            for plugin in found:
+                if isinstance(plugin, TypeDescriptor):
+                    if TYPE_DESCRIPTORS.get(plugin.name) != plugin:
+                        _register(plugin, replace=False)
+                else:
+                    register_type(plugin)
+        except Exception as e:
+            print(f"percipio: Skipped type plugin '{entry_point.name}' ({entry_point.value}): {e}")
+
 def get_registered_types() -> List[Type["BaseSemanticType"]]:
-    """Returns a list of all registered type classes."""
-    return list(TYPE_REGISTRY.values())
+    """
+    Returns every registered type: the class if it has been imported,
+    else its TypeDescriptor (which imports it when needed).
+    """
+    load_plugins()
+    return [descriptor.cls or descriptor for descriptor in TYPE_DESCRIPTORS.values()]
+
+def get_type_descriptors() -> List[TypeDescriptor]:
+    """Returns the descriptor of every registered type, importing nothing."""
+    load_plugins()
+    return list(TYPE_DESCRIPTORS.values())
+
+def registry_version() -> int:
+    """Returns a counter that changes whenever TYPE_DESCRIPTORS changes."""
+    return _REGISTRY_VERSION
+
+
+class _ClassRegistry(Mapping):
+    """
+    The registry as type name -> class, importing each class when it is
+    looked up. This was TYPE_REGISTRY's shape before types were
+    registered lazily; use TYPE_DESCRIPTORS to inspect types without
+    importing them.
+    """
+
+    def __getitem__(self, name: str) -> Type["BaseSemanticType"]:
+        return TYPE_DESCRIPTORS[name].load()
+
+    def __contains__(self, name: object) -> bool:
+        return name in TYPE_DESCRIPTORS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(TYPE_DESCRIPTORS)
+
+    def __len__(self) -> int:
+        return len(TYPE_DESCRIPTORS)
+
+    def __repr__(self):
+        return f"<TYPE_REGISTRY: {len(self)} types>"
+
+
+# Type name -> class, read-only (see _ClassRegistry)
+TYPE_REGISTRY = _ClassRegistry()
+
+# Columns shorter than this are cleaned in-process even with workers > 1.
+_PARALLEL_CLEAN_MIN_ITEMS = 10_000
+# Default number of chunks per worker, so one slow chunk doesn't leave
+# the other workers idle.
+_CHUNKS_PER_WORKER = 4
+
+# Items parsed per 'parse_batch' call while cleaning
+_PARSE_BATCH_SIZE = 4096
+
+# --- Batch Validation Helpers ---
+
+def regex_mask(regex: re.Pattern, items: List[Any],
+               prepare: Optional[Callable[[str], str]] = None) -> List[bool]:
+    """
+    For each item: is it a str that `regex` matches (after `prepare`,
+    e.g. `str.strip`, if given)? On blocks of strings, the whole loop
+    runs in C.
+    """
+    try:
+        strings = items if prepare is None else map(prepare, items)
+        return list(map(bool, map(regex.match, strings)))
+    except TypeError:
+        # Not all strings
+        pass
+    if prepare is None:
+        return [isinstance(item, str) and bool(regex.match(item)) for item in items]
+    return [isinstance(item, str) and bool(regex.match(prepare(item))) for item in items]
+
+
+def regex_tokens(regex: re.Pattern, items: List[Any],
+                 prepare: Optional[Callable[[str], str]] = None) -> List[Optional[re.Match]]:
+    """
+    Like `regex_mask`, but returns each item's match object (None for
+    non-strings and non-matches), for batch 'parse_item' implementations.
+    """
+    try:
+        strings = items if prepare is None else map(prepare, items)
+        return list(map(regex.match, strings))
+    except TypeError:
+        # Not all strings
+        pass
+    if prepare is None:
+        return [regex.match(item) if isinstance(item, str) else None for item in items]
+    return [regex.match(prepare(item)) if isinstance(item, str) else None for item in items]
 
 # --- Data Structures ---
 
 class SemanticTypeStats:
-    """A simple data class to hold inference statistics."""
-    def __init__(self, total_count=0, valid_count=0, invalid_count=0, confidence=0.0):
+    """
+    A simple data class to hold inference statistics.
+
+    When inference ran on a sample (`infer(..., sample=...)`), `is_exact`
+    is False, the counts are extrapolated to the whole column and
+    `confidence_low`/`confidence_high` bound the true confidence.
+
+    On the winner of `infer`, `dropped` maps each type that was left out
+    or lost early to the reason (e.g. it raised, or ran out of its time
+    budget), and `timings` maps type names to seconds spent validating.
+    """
+    def __init__(self, total_count=0, valid_count=0, invalid_count=0, confidence=0.0,
+                 is_exact=True, confidence_low=None, confidence_high=None, sample_size=None,
+                 dropped=None, timings=None):
         self.total_count = total_count
         self.valid_count = valid_count
         self.invalid_count = invalid_count
         self.confidence = confidence # The raw % of valid items
+        self.is_exact = is_exact
+        # For exact stats the interval collapses onto the confidence itself
+        self.confidence_low = confidence if confidence_low is None else confidence_low
+        self.confidence_high = confidence if confidence_high is None else confidence_high
+        self.sample_size = total_count if sample_size is None else sample_size
+        self.dropped: Dict[str, str] = dropped or {}
+        self.timings: Dict[str, float] = timings or {}
     
+    def merge(self, other: "SemanticTypeStats") -> "SemanticTypeStats":
+        """
+        Combines the stats of the same type on two disjoint parts of a
+        column (e.g. shards scored by different workers).
+        """
+        if not (self.is_exact and other.is_exact):
+            raise ValueError("Only exact stats can be merged.")
+        total_count = self.total_count + other.total_count
+        valid_count = self.valid_count + other.valid_count
+        return SemanticTypeStats(
+            total_count=total_count,
+            valid_count=valid_count,
+            invalid_count=total_count - valid_count,
+            confidence=valid_count / total_count if total_count else 0.0
+        )
+
     def __repr__(self):
+        if not self.is_exact:
+            return (f"SemanticTypeStats(total={self.total_count}, "
+                    f"sampled={self.sample_size}, confidence={self.confidence:.2f} "
+                    f"[{self.confidence_low:.2f}, {self.confidence_high:.2f}])")
         return (f"SemanticTypeStats(total={self.total_count}, "
                 f"valid={self.valid_count}, confidence={self.confidence:.2f})")
 
@@ -52,8 +408,12 @@ class BaseSemanticType:
     To create a new type, subclass this and:
     1. Set the 'name' attribute.
     2. Set the 'specificity' (0.0 to 1.0).
-    3. Override the 'validate_item' static method.
+    3. Override the 'validate_item' static method (or just set 'regex'),
+       and optionally 'validate_batch'.
     4. Override the '_clean_item' instance method.
+
+    Alternatively, for 3 and 4, override 'parse_item' (or just set
+    'regex') and '_clean_parsed', so each item is only parsed once.
     """
     
     # --- Class Attributes for Inference ---
@@ -68,6 +428,29 @@ class BaseSemanticType:
     # Optional: A pre-compiled regex for fast Level 1 checks.
     regex: Optional[re.Pattern] = None
 
+    # Optional: Cheap constraints on an item's signature (see signature.py).
+    # During inference, items that fail them never reach 'validate_item'.
+    prefilter: Optional[SignatureFilter] = None
+
+    # Optional: The fields '_clean_item' returns and their kinds (see
+    # columnar.py), e.g. {"amount": "float64"}. Declaring them enables
+    # 'clean_columnar'. Types that return a scalar use a single "value".
+    output_fields: Optional[Dict[str, str]] = None
+
+    # Optional: The name of a broader type that accepts every item this
+    # one accepts (e.g. "String" for 'Email'). During inference a type is
+    # only tried on the items its parent accepted (see lattice.py).
+    parent: Optional[str] = None
+
+    # A virtual type only groups its children in the lattice (e.g.
+    # 'Numeric'): it narrows their items but is never inferred itself.
+    virtual: bool = False
+
+    # Set on types whose per-item methods cost a round trip each (e.g.
+    # generated parsers, which run in a sandbox): callers should drive
+    # them through 'parse_batch' and 'validate_batch' only.
+    batch_only: bool = False
+
     # --- Instance Attributes ---
     
     def __init__(self, stats: Optional[SemanticTypeStats] = None):
@@ -82,6 +465,36 @@ class BaseSemanticType:
 
     # --- Core API ---
     
+    @classmethod
+    def parse_item(cls, item: Any) -> Optional[Any]:
+        """
+        [Parse Once]
+        Checks and parses a single item in one go. Returns a parse token
+        (e.g. the regex match object) if the item belongs to this type,
+        or None if it doesn't.
+
+        Types that implement this (plus '_clean_parsed') get
+        'validate_item' and '_clean_item' derived from it, so cleaning
+        parses each item once instead of validating and then parsing.
+
+        The default matches strings against 'regex'. Types without a
+        regex must override this, or 'validate_item' and '_clean_item'.
+        """
+        if cls.regex is None:
+            raise NotImplementedError
+        return cls.regex.match(item) if isinstance(item, str) else None
+
+    @classmethod
+    def parse_batch(cls, items: List[Any]) -> List[Optional[Any]]:
+        """
+        [Parse Once]
+        'parse_item' over a whole block of items. The default runs the
+        regex-based default 'parse_item' in a single C-level pass.
+        """
+        if cls.regex is not None and cls.parse_item.__func__ is BaseSemanticType.parse_item.__func__:
+            return regex_tokens(cls.regex, items)
+        return list(map(cls.parse_item, items))
+
     @classmethod
     def validate_item(cls, item: Any) -> bool:
         """
@@ -89,9 +502,28 @@ class BaseSemanticType:
         A fast, class-level check to see if a single item
         *could* belong to this type.
         
-        This method MUST be overridden by subclasses.
+        The default accepts the items 'parse_item' accepts.
         """
-        raise NotImplementedError
+        return cls.parse_item(item) is not None
+
+    @classmethod
+    def validate_batch(cls, items: List[Any]) -> List[bool]:
+        """
+        [Level 1/2 Inference]
+        Validates a whole block of items at once, returning one truth
+        value per item. `infer` calls this rather than 'validate_item'.
+
+        The default maps 'validate_item' (or 'parse_item') over the
+        block, or, for types that rely on the regex-based defaults,
+        matches 'regex' against the block in a single C-level pass.
+        Override it with a faster equivalent; it must agree with
+        'validate_item' on every item.
+        """
+        if cls.validate_item.__func__ is not BaseSemanticType.validate_item.__func__:
+            return list(map(cls.validate_item, items))
+        if cls.regex is not None and cls.parse_item.__func__ is BaseSemanticType.parse_item.__func__:
+            return regex_mask(cls.regex, items)
+        return [token is not None for token in map(cls.parse_item, items)]
     
     def _clean_item(self, item: Any) -> Optional[Any]:
         """
@@ -102,16 +534,167 @@ class BaseSemanticType:
         Returns a structured object (e.g., a dict) or None if
         parsing fails.
         
-        This method MUST be overridden by subclasses.
+        The default passes the token from 'parse_item' to
+        '_clean_parsed'. Otherwise, this method MUST be overridden
+        by subclasses.
+        """
+        token = self.parse_item(item)
+        if token is None:
+            return None
+        return self._clean_parsed(token, item)
+
+    def _clean_parsed(self, token: Any, item: Any) -> Optional[Any]:
+        """
+        [Transform, Parse Once]
+        Builds the cleaned value of `item` from the token 'parse_item'
+        returned for it. Returns None if the item can't be cleaned.
         """
         raise NotImplementedError
 
-    def clean(self, data: List[Any]) -> List[Optional[Any]]:
+    def clean_series(self, series: Any) -> Optional[Any]:
+        """
+        [Transform, optional]
+        Cleans a whole pandas Series with vectorised operations, for
+        `percipio.clean_frame`.
+
+        Returns a DataFrame with one column per entry of 'output_fields',
+        on the same index as `series`, where rows that fail to clean are
+        missing in every field. The values must match what '_clean_item'
+        returns row by row.
+
+        Returns None (the default) if the type has no vectorised
+        implementation, in which case '_clean_item' is used.
+        """
+        return None
+
+    def clean(self, data: List[Any], deduplicate: Optional[bool] = None,
+              workers: int = 1, chunk_size: Optional[int] = None) -> List[Optional[Any]]:
         """
         The main public transformation API.
         
         It iterates over a list, attempts to clean each item
         using the type's specific logic, and returns a list
         of structured objects or Nones.
+
+        Args:
+            data: The items to clean.
+            deduplicate: Clean each distinct value once and expand the
+                results back to row order (rows get their own copies of
+                mutable results such as dicts). None (the default) decides
+                from a cheap estimate of the column's cardinality.
+            workers: Clean chunks of the data in this many worker processes
+                (-1 for one per CPU), reassembled in order. Threads are used
+                instead on free-threaded builds, or if this handler cannot
+                be pickled. The pools persist across calls.
+            chunk_size: Items per chunk sent to a worker. Defaults to an
+                even split into a few chunks per worker.
+        """
+        if not instrumentation.ENABLED:
+            return self._clean_rows(data, deduplicate, workers, chunk_size)
+        start = time.perf_counter()
+        cleaned = self._clean_rows(data, deduplicate, workers, chunk_size)
+        instrumentation.record_clean(self.name, "clean", len(data), time.perf_counter() - start)
+        return cleaned
+
+    def _clean_rows(self, data: List[Any], deduplicate: Optional[bool], workers: int,
+                    chunk_size: Optional[int]) -> List[Optional[Any]]:
+        if VALUE_MEMO.enabled and self._shares_results():
+            # Only the values the memo doesn't hold are cleaned, as below
+            return VALUE_MEMO.apply(type(self), CLEAN,
+                                    lambda missed: self._clean_all(missed, deduplicate, workers, chunk_size),
+                                    data, fresh=_fresh)
+        return self._clean_all(data, deduplicate, workers, chunk_size)
+
+    def _shares_results(self) -> bool:
+        """
+        Whether this handler cleans like any other instance of its class,
+        so its results can be memoized per class: it has no state but its
+        stats.
         """
-        return [self._clean_item(item) for item in data]
+        state = getattr(self, "__dict__", None)
+        if state is None or not state.keys() <= {"stats"}:
+            return False
+        return not any(getattr(klass, "__slots__", ()) for klass in type(self).__mro__)
+
+    def _clean_all(self, data: List[Any], deduplicate: Optional[bool], workers: int,
+                   chunk_size: Optional[int]) -> List[Optional[Any]]:
+        if deduplicate or deduplicate is None and should_encode(data):
+            cleaned = map_distinct(self._clean_batch, data, batched=True)
+            if cleaned is not None:
+                return cleaned
+
+        workers = resolve_workers(workers)
+        if workers > 1 and len(data) >= _PARALLEL_CLEAN_MIN_ITEMS:
+            chunk_size = chunk_size or math.ceil(len(data) / (workers * _CHUNKS_PER_WORKER))
+            chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+            executor = get_best_executor(workers, self)
+            cleaned = []
+            for part in executor.map(_clean_chunk, repeat(self), chunks):
+                cleaned.extend(part)
+            return cleaned
+
+        return list(self._clean_each(data))
+
+    def _clean_each(self, data: List[Any]) -> Iterator[Optional[Any]]:
+        """
+        Lazily cleans every item. For types that only implement the
+        parse-once methods, this skips the '_clean_item' indirection.
+        """
+        if type(self)._clean_item is not BaseSemanticType._clean_item:
+            return map(self._clean_item, data)
+        return self._clean_parsed_each(data)
+
+    def _clean_batch(self, data: List[Any]) -> List[Optional[Any]]:
+        return list(self._clean_each(data))
+
+    def _clean_parsed_each(self, data: List[Any]) -> Iterator[Optional[Any]]:
+        build = self._clean_parsed
+        for start in range(0, len(data), _PARSE_BATCH_SIZE):
+            batch = data[start:start + _PARSE_BATCH_SIZE]
+            yield from [None if token is None else build(token, item)
+                        for token, item in zip(self.parse_batch(batch), batch)]
+
+    def clean_columnar(self, data: List[Any], include_raw: bool = False,
+                       deduplicate: Optional[bool] = None) -> ColumnarResult:
+        """
+        Like `clean`, but returns one typed array per output field and a
+        validity bitmap instead of a list of dicts, which takes a fraction
+        of the memory and hands off to NumPy/pandas without copying.
+
+        Args:
+            data: The items to clean.
+            include_raw: Keep the 'raw' field (a copy of every input).
+            deduplicate: As for `clean`.
+        """
+        if not self.output_fields:
+            raise TypeError(f"Type '{self.name}' does not declare output_fields.")
+        start = time.perf_counter() if instrumentation.ENABLED else None
+        results = None
+        if deduplicate or deduplicate is None and should_encode(data):
+            results = iter_distinct(self._clean_batch, data, batched=True)
+        if results is None:
+            results = self._clean_each(data)
+        columns = build_columns(results, self.output_fields, include_raw)
+        if start is not None:
+            instrumentation.record_clean(self.name, "clean_columnar", len(data), time.perf_counter() - start)
+        return columns
+
+
+def _clean_chunk(handler: BaseSemanticType, chunk: List[Any]) -> List[Optional[Any]]:
+    """[Worker] Cleans one chunk of a column."""
+    return handler._clean_batch(chunk)
+
+
+# --- Built-in Types ---
+# Registered as descriptors: percipio.built_in_types (and its regexes) is
+# imported by the first item that gets past a type's prefilter, not by
+# `import percipio`. Binding a class checks it against these entries.
+for _name, _class_name, _specificity, _prefilter, _parent, _virtual in (
+        ("String", "StringType", 0.1, None, None, False),
+        ("Numeric", "NumericType", 0.0, NUMERIC_PREFILTER, None, True),
+        ("Integer", "IntegerType", 0.5, INTEGER_PREFILTER, "Numeric", False),
+        ("Email", "EmailType", 0.8, EMAIL_PREFILTER, "String", False),
+        ("Currency", "CurrencyType", 0.7, CURRENCY_PREFILTER, "String", False)):
+    register_lazy_type(_name, f"percipio.built_in_types:{_class_name}", _specificity, _prefilter,
+                       parent=_parent, virtual=_virtual)
+del _name, _class_name, _specificity, _prefilter, _parent, _virtual
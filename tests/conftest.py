@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from percipio import types
+from percipio.budget import QUARANTINE
+from percipio.core import INFERENCE_CACHE
+from percipio.memo import VALUE_MEMO
+from percipio.types import TypeDescriptor, get_registered_types
+
+
+def reference_infer(data):
+    """
+    The straightforward definition of `infer`: every non-virtual type
+    validates the whole column, a type that raises is out, and the best
+    confidence times specificity wins (ties to the earliest registered).
+
+    Returns:
+        (type name, valid count), or (None, None) if no type could run.
+    """
+    best, best_score, best_valid = None, -1.0, None
+    for TypeClass in get_registered_types():
+        if isinstance(TypeClass, TypeDescriptor):
+            TypeClass = TypeClass.load()
+        if TypeClass.virtual:
+            continue
+        try:
+            valid = sum(1 for ok in TypeClass.validate_batch(list(data)) if ok)
+        except Exception:
+            continue
+        score = valid / len(data) * TypeClass.specificity
+        if score > best_score:
+            best, best_score, best_valid = TypeClass.name, score, valid
+    return best, best_valid
+
+
+def assert_matches_reference(result, data):
+    assert (result.name, result.stats.valid_count) == reference_infer(data)
+    assert result.stats.total_count == len(data)
+
+
+def _datasets():
+    rng = random.Random(7)
+
+    def emails(n):
+        return [f"user{rng.randrange(10**6)}@example{rng.randrange(50)}.com" for _ in range(n)]
+
+    def money(n):
+        return [f"{rng.choice('$£€¥')}{rng.randrange(10**5) / 100:.2f}" for _ in range(n)]
+
+    def ints(n):
+        return [str(rng.randrange(-10**6, 10**6)) for _ in range(n)]
+
+    def words(n):
+        return ["".join(rng.choice("abcdefgh ") for _ in range(rng.randrange(1, 12))) for _ in range(n)]
+
+    return {
+        "emails": emails(3000),
+        "currency": money(3000),
+        "int_strings": ints(3000),
+        "words": words(3000),
+        "mixed": emails(1000) + money(1000) + ints(1000),
+        "dirty": emails(2700) + words(300),
+        "low_cardinality": [rng.choice(["a@b.co", "$1.00", "12", "x"]) for _ in range(5000)],
+        "python_ints": [rng.randrange(100) for _ in range(2000)],
+        "floats": [rng.random() for _ in range(500)],
+        "with_nones": emails(500) + [None] * 100,
+        "python_objects": ["a", 1, 2.5, None, True, b"x"],
+        "single": ["$5.00"],
+    }
+
+
+DATASETS = _datasets()
+
+
+@pytest.fixture(params=sorted(DATASETS))
+def column(request):
+    """(name, items) of each reference dataset."""
+    return request.param, DATASETS[request.param]
+
+
+@pytest.fixture
+def registry():
+    """Restores the type registry (and what is derived from it) after the test."""
+    saved = dict(types.TYPE_DESCRIPTORS)
+    yield types.TYPE_DESCRIPTORS
+    names = set(saved) | set(types.TYPE_DESCRIPTORS)
+    types.TYPE_DESCRIPTORS.clear()
+    types.TYPE_DESCRIPTORS.update(saved)
+    types._REGISTRY_VERSION += 1
+    for name in names:
+        VALUE_MEMO.invalidate(name)
+    INFERENCE_CACHE.clear()
+    QUARANTINE.release()
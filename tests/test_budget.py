@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+import percipio
+from percipio.budget import QUARANTINE
+from percipio.types import BaseSemanticType, register_type
+
+DATA = [f"user{i}@example.com" for i in range(3000)]
+
+
+class SlowType(BaseSemanticType):
+    name = "TestSlow"
+    specificity = 0.99
+
+    @classmethod
+    def validate_item(cls, item):
+        time.sleep(0.0005)
+        return True
+
+
+class RaisingType(BaseSemanticType):
+    name = "TestRaising"
+    specificity = 0.99
+
+    @classmethod
+    def validate_item(cls, item):
+        raise ValueError("bad data")
+
+
+@pytest.fixture
+def quarantine(registry):
+    saved = QUARANTINE.strikes, QUARANTINE.cooldown
+    QUARANTINE.release()
+    yield QUARANTINE
+    QUARANTINE.strikes, QUARANTINE.cooldown = saved
+    QUARANTINE.release()
+
+
+def test_raising_type_is_dropped(registry):
+    register_type(RaisingType)
+    result = percipio.infer(DATA)
+    assert result.name == "Email"
+    assert result.stats.dropped["TestRaising"].startswith("raised ValueError")
+
+
+def test_slow_type_is_dropped_then_quarantined(quarantine):
+    register_type(SlowType)
+    for _ in range(quarantine.strikes):
+        result = percipio.infer(DATA, type_budget=0.05)
+        assert result.name == "Email"
+        assert "time budget" in result.stats.dropped["TestSlow"]
+    assert "TestSlow" in quarantine.info()["quarantined"]
+
+    # Quarantined types are skipped even without a budget
+    start = time.perf_counter()
+    result = percipio.infer(DATA)
+    assert time.perf_counter() - start < 1
+    assert result.stats.dropped["TestSlow"].startswith("quarantined")
+
+    quarantine.release("TestSlow")
+    assert percipio.infer(DATA[:20]).name == "TestSlow"
+
+
+def test_quarantine_ends_after_cooldown(quarantine):
+    register_type(SlowType)
+    quarantine.cooldown = 0.0
+    for _ in range(quarantine.strikes):
+        percipio.infer(DATA, type_budget=0.05)
+    assert "TestSlow" in quarantine.info()["quarantined"]
+    assert percipio.infer(DATA[:20]).name == "TestSlow"
+    assert not quarantine.info()["quarantined"]
@@ -0,0 +1,44 @@
+import pytest
+
+import percipio
+from percipio.frame import _column_items, _object_values
+
+
+def test_typed_numpy_column_gives_python_items():
+    np = pytest.importorskip("numpy")
+    items = _object_values(np.array([1, 2, 3]))
+    assert items == [1, 2, 3]
+    assert {type(item) for item in items} == {int}
+
+
+def test_typed_series_column_gives_python_items():
+    pd = pytest.importorskip("pandas")
+    items = _object_values(pd.Series([1, 2, 3]))
+    assert list(items) == [1, 2, 3]
+    assert {type(item) for item in items} == {int}
+
+
+@pytest.mark.parametrize("wrap", ["array", "series"])
+def test_infer_frame_on_typed_columns_matches_infer(wrap):
+    np = pytest.importorskip("numpy")
+    values = [1.5, 2.25, 3.0, 4.75]
+    column = np.array(values)
+    if wrap == "series":
+        column = pytest.importorskip("pandas").Series(column)
+    schema = percipio.infer_frame({"x": column})
+    expected = percipio.infer(values)
+    assert schema["x"].name == expected.name
+    assert schema["x"].stats.valid_count == expected.stats.valid_count
+
+
+def test_unused_categories_are_not_counted():
+    pd = pytest.importorskip("pandas")
+    column = pd.Series(["a", "b", "a"], dtype=pd.CategoricalDtype(["a", "b", "c"]))
+    items, weights = _column_items(column)
+    assert items == ["a", "b"]
+    assert weights == [2, 1]
+
+
+def test_plain_list_column_is_not_copied():
+    column = ["a@example.com", "b@example.com"]
+    assert _object_values(column) is column
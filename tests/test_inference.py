@@ -0,0 +1,110 @@
+"""
+Every inference entry point against `reference_infer` (see conftest.py):
+sharding, deduplication, pruning, the lattice and prefilters must never
+change the winner or its counts.
+"""
+
+import csv
+import json
+
+import pytest
+
+import percipio
+from conftest import DATASETS, assert_matches_reference
+
+
+@pytest.mark.parametrize("deduplicate", [None, True, False])
+def test_infer(column, deduplicate):
+    _, data = column
+    assert_matches_reference(percipio.infer(data, deduplicate=deduplicate), data)
+
+
+@pytest.mark.parametrize("name", ["mixed", "dirty", "low_cardinality"])
+def test_infer_with_workers(name):
+    data = DATASETS[name]
+    assert_matches_reference(percipio.infer(data, workers=2), data)
+
+
+def test_infer_counts(column):
+    _, data = column
+    # Keyed by type too: 1 and True are equal, but not the same value
+    counts = {}
+    for item in data:
+        key = (type(item), item)
+        counts[key] = counts.get(key, 0) + 1
+    values = [value for _, value in counts]
+    assert_matches_reference(percipio.infer_counts(values, list(counts.values())), data)
+
+
+def test_infer_and_clean(column):
+    _, data = column
+    schema, cleaned = percipio.infer_and_clean(data)
+    assert_matches_reference(schema, data)
+    assert cleaned == schema.clean(data)
+
+
+def test_inferrer_in_chunks(column):
+    _, data = column
+    inferrer = percipio.Inferrer()
+    for start in range(0, len(data), 700):
+        inferrer.update(data[start:start + 700])
+    assert_matches_reference(inferrer.result(), data)
+
+
+def test_merged_inferrers(column):
+    _, data = column
+    middle = len(data) // 2
+    first = percipio.Inferrer().update(data[:middle])
+    second = percipio.Inferrer().update(data[middle:])
+    assert_matches_reference(first.merge(second).result(), data)
+
+
+def test_infer_iter(column):
+    _, data = column
+    assert_matches_reference(percipio.infer_iter(iter(data), chunk_size=256), data)
+
+
+def test_infer_mixed_best(column):
+    _, data = column
+    assert_matches_reference(percipio.infer_mixed(data).best, data)
+
+
+def test_infer_frame():
+    names = ["emails", "currency", "mixed", "python_objects"]
+    schema = percipio.infer_frame({name: DATASETS[name] for name in names})
+    assert list(schema) == names
+    for name in names:
+        assert_matches_reference(schema[name], DATASETS[name])
+
+
+def test_infer_frame_with_workers():
+    names = ["emails", "dirty", "low_cardinality"]
+    schema = percipio.infer_frame({name: DATASETS[name] for name in names}, workers=2)
+    for name in names:
+        assert_matches_reference(schema[name], DATASETS[name])
+
+
+def test_infer_csv_file(tmp_path):
+    # CSV holds strings only
+    names = [name for name, data in DATASETS.items() if all(isinstance(item, str) for item in data)]
+    length = min(len(DATASETS[name]) for name in names)
+    path = tmp_path / "columns.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        writer.writerows(zip(*(DATASETS[name][:length] for name in names)))
+
+    schema = percipio.infer_file(str(path), chunk_size=500)
+    assert list(schema) == names
+    for name in names:
+        assert_matches_reference(schema[name], DATASETS[name][:length])
+
+
+def test_infer_jsonl_file(tmp_path):
+    data = DATASETS["with_nones"] + [1, 2.5, True]
+    path = tmp_path / "column.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for item in data:
+            f.write(json.dumps({"value": item}) + "\n")
+
+    assert_matches_reference(percipio.infer_file(str(path), chunk_size=128)["value"], data)
@@ -0,0 +1,56 @@
+import percipio
+from percipio.core import INFERENCE_CACHE
+from percipio.memo import VALUE_MEMO
+from percipio.types import BaseSemanticType, register_type
+
+DATA = ["A-1", "A-2", "B-3", "x"]
+
+
+def _code_type(prefix):
+    class CodeType(BaseSemanticType):
+        name = "TestCode"
+        specificity = 0.95
+
+        @classmethod
+        def validate_item(cls, item):
+            return isinstance(item, str) and item.startswith(prefix)
+
+    return CodeType
+
+
+def test_register_type_invalidates_cached_results(registry):
+    INFERENCE_CACHE.clear()
+    assert percipio.infer(DATA, cache=True).name == "String"
+    hits = INFERENCE_CACHE.hits
+    assert percipio.infer(DATA, cache=True).name == "String"
+    assert INFERENCE_CACHE.hits == hits + 1
+
+    register_type(_code_type(("A", "B")))
+    after = percipio.infer(DATA, cache=True)
+    assert after.name == "TestCode"
+    assert after.stats.valid_count == 3
+
+
+def test_cache_tells_colliding_columns_apart():
+    # hash(-1) == hash(-2) in CPython
+    INFERENCE_CACHE.clear()
+    hits = INFERENCE_CACHE.hits
+    percipio.infer([-1, "x"], cache=True)
+    percipio.infer([-2, "x"], cache=True)
+    assert INFERENCE_CACHE.hits == hits
+    assert len(INFERENCE_CACHE) == 2
+
+
+def test_replacing_a_type_invalidates_its_memoized_verdicts(registry):
+    VALUE_MEMO.enable()
+    try:
+        register_type(_code_type("A"))
+        assert percipio.infer(DATA).stats.valid_count == 2
+        assert VALUE_MEMO.info()["by_type"]["TestCode"]["validate"]["misses"] > 0
+
+        register_type(_code_type(("A", "B")), replace=True)
+        result = percipio.infer(DATA)
+        assert result.name == "TestCode"
+        assert result.stats.valid_count == 3
+    finally:
+        VALUE_MEMO.disable()
@@ -0,0 +1,37 @@
+import pytest
+
+import percipio
+from percipio.types import BaseSemanticType, get_registered_types
+
+from conftest import DATASETS, assert_matches_reference
+
+
+class FlakyType(BaseSemanticType):
+    name = "TestFlaky"
+    specificity = 2.0
+
+    @classmethod
+    def validate_item(cls, item):
+        if item == "boom":
+            raise ValueError("bad data")
+        return True
+
+
+@pytest.mark.parametrize("buffer", [1, 64])
+def test_window_result_matches_infer(buffer):
+    data = DATASETS["dirty"]
+    monitor = percipio.SchemaMonitor(window=1000, buffer=buffer)
+    for item in data:
+        monitor.add(item)
+    assert_matches_reference(monitor.result(), data[-1000:])
+
+
+@pytest.mark.parametrize("buffer", [1, 4])
+def test_type_that_raised_cannot_win_while_in_window(buffer):
+    monitor = percipio.SchemaMonitor(window=4, types=[FlakyType, *get_registered_types()], buffer=buffer)
+    monitor.update(["a@b.com"] * 3 + ["boom"])
+    assert monitor.result().name == "Email"
+
+    for item in ["a@b.com"] * 4:
+        monitor.add(item)
+    assert monitor.result().name == "TestFlaky"
@@ -0,0 +1,40 @@
+import time
+
+import pytest
+
+from percipio.sandbox import ParserSandbox, SandboxError
+
+SLOW = "import time\ndef parse(item):\n    if item == 'slow':\n        time.sleep(60)\n    return {'value': item}\n"
+FAST = "def parse(item):\n    return {'length': len(item)}\n"
+
+
+@pytest.fixture
+def sandbox():
+    with ParserSandbox(processes=2, time_budget=0.5, batch_size=2) as sandbox:
+        yield sandbox
+
+
+def test_overrunning_parser_is_disabled_and_its_worker_killed(sandbox):
+    pids = {worker.process.pid for worker in sandbox._workers}
+    start = time.monotonic()
+    assert sandbox.validate(SLOW, ["a", "slow", "b", "c"]) == [False] * 4
+    assert time.monotonic() - start < 10
+    assert "time budget" in next(iter(sandbox.disabled.values()))
+
+    # The hung worker was replaced, and the pool is back to full size
+    workers = sandbox._workers
+    assert len(workers) == 2
+    assert {worker.process.pid for worker in workers} != pids
+    assert all(worker.process.is_alive() for worker in workers)
+
+    # Other parsers keep running, on every worker
+    assert sandbox.parse(FAST, ["ab", "c", "def", "", "x"]) == [
+        {"length": 2}, {"length": 1}, {"length": 3}, {"length": 0}, {"length": 1}]
+    # The disabled parser stays disabled
+    assert sandbox.validate(SLOW, ["a"]) == [False]
+
+
+def test_failing_item_is_none_and_broken_code_raises(sandbox):
+    assert sandbox.parse(FAST, ["ab", 3, None]) == [{"length": 2}, None, None]
+    with pytest.raises(SandboxError):
+        sandbox.load("def parse(:\n")